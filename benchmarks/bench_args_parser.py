@@ -0,0 +1,35 @@
+"""
+scaling of `args_parser` in argv length
+
+    PYTHONPATH=. python benchmarks/bench_args_parser.py
+
+the cost per token should stay flat as argv grows (linear scaling)
+"""
+from common import measure, positional_argv
+
+from typed_cap.args_parser import args_parser
+
+
+NAMED = [
+    ("flag", ("verbose", "v")),
+    ("option", ("name", "n")),
+    ("option", ("max_depth", "d")),
+]
+SIZES = [1_000, 10_000, 100_000]
+
+
+def main():
+    base = None
+    for size in SIZES:
+        argv = ["-v", "--name", "foo", "--max-depth=3", *positional_argv(size)]
+        sec = measure(lambda: args_parser(argv, NAMED), repeat=3)
+        per_token = sec / len(argv) * 1e9
+        base = per_token if base is None else base
+        print(
+            f"argv={size:>7}  total={sec * 1e3:9.2f}ms  "
+            f"per_token={per_token:7.1f}ns  x{per_token / base:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
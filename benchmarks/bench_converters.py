@@ -0,0 +1,49 @@
+"""
+per-value conversion cost of `ValidVal.extract` against compiled converters
+
+    PYTHONPATH=. python benchmarks/bench_converters.py
+"""
+from enum import Enum
+from typing import List, Literal, Optional, Tuple
+
+from common import measure
+
+from typed_cap.typing import ValidVal
+from typed_cap.typing.default import PREDEFINED_UNITS
+from typed_cap.typing.plan import compile_converter
+from typed_cap.utils.option import Option
+
+
+class Color(Enum):
+    Red = 0
+    Green = 1
+
+
+CASES = [
+    (int, "42"),
+    (Optional[float], "3.14"),
+    (List[int], "1,2,3,4,5,6,7,8"),
+    (Tuple[str, int, float], "foo,1,2.5"),
+    (Literal["fast", "slow"], "fast"),
+    (Color, "green"),
+    (Optional[list[tuple[int, float]]], "1,2.5"),
+]
+NUMBER = 20_000
+
+
+def main():
+    vv = ValidVal(dict(PREDEFINED_UNITS))
+    delimiter = Option[Optional[str]].Some(",")
+    for t, val in CASES:
+        cvt = compile_converter(vv, t, delimiter)
+        assert cvt(val).value == vv.extract(t, val, cvt=True).value
+        before = measure(lambda: vv.extract(t, val, cvt=True), number=NUMBER)
+        after = measure(lambda: cvt(val), number=NUMBER)
+        print(
+            f"{str(t):<50} extract={before * 1e9:8.0f}ns  "
+            f"compiled={after * 1e9:8.0f}ns  x{before / after:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
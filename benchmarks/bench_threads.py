@@ -0,0 +1,128 @@
+"""
+multi-thread stress test of one shared `Cap`: checks every parse result
+and reports the throughput for a growing number of threads
+
+    PYTHONPATH=. python benchmarks/bench_threads.py [--seconds S]
+
+Two `Cap`s with different delimiters also share one validator, which
+raced on the delimiter before parses stopped modifying it. Exits with
+status 1 on any wrong result. On free-threaded builds (3.13t) the
+throughput is expected to grow with the number of threads.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from enum import Enum
+from typing import Any, List, Optional, Tuple
+
+from typed_cap import Cap
+from typed_cap.typing.default import VALIDATOR
+
+
+class Color(Enum):
+    Red = 0
+    Green = 1
+    Blue = 2
+
+
+class Args:
+    depth: int
+    ratio: Optional[float]
+    color: Optional[Color]
+    tags: Optional[List[str]]
+    point: Optional[Tuple[int, int]]
+
+
+THREADS = [1, 2, 4, 8]
+
+
+def make_input(rnd: random.Random, sep: str) -> Tuple[List[str], Any]:
+    depth = rnd.randrange(1000)
+    tags = [f"t{rnd.randrange(100)}" for _ in range(rnd.randrange(1, 5))]
+    color = rnd.choice(list(Color))
+    point = (rnd.randrange(100), rnd.randrange(100))
+    argv = [
+        "--depth",
+        str(depth),
+        "--tags",
+        sep.join(tags),
+        "--color",
+        color.name.lower(),
+        "--point",
+        f"{point[0]}{sep}{point[1]}",
+    ]
+    return argv, (depth, tags, color, point)
+
+
+def worker(
+    jobs: List[Tuple[Cap, Any, str]],
+    deadline: float,
+    seed: int,
+    counts: List[int],
+    errors: List[str],
+) -> None:
+    rnd = random.Random(seed)
+    n = 0
+    while time.perf_counter() < deadline:
+        cap, validator, sep = rnd.choice(jobs)
+        argv, expected = make_input(rnd, sep)
+        args = cap.parse(argv, validator=validator).args
+        got = (args.depth, args.tags, args.color, args.point)
+        if got != expected:
+            errors.append(f"{argv}: {got} != {expected}")
+            return
+        n += 1
+    counts.append(n)
+
+
+def run(n_threads: int, seconds: float) -> Tuple[float, List[str]]:
+    shared = Cap(Args)
+    semicolon = Cap(Args).set_delimiter(";")
+    jobs = [
+        (shared, None, ","),
+        (Cap(Args), VALIDATOR, ","),
+        (semicolon, VALIDATOR, ";"),
+    ]
+    counts: List[int] = []
+    errors: List[str] = []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=worker, args=(jobs, deadline, seed, counts, errors)
+        )
+        for seed in range(n_threads)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(counts) / (time.perf_counter() - t0), errors
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--seconds", type=float, default=1.0)
+    opts = ap.parse_args(argv)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}, GIL enabled: {gil}")
+    base = None
+    failed = False
+    for n in THREADS:
+        rate, errors = run(n, opts.seconds)
+        base = base or rate
+        status = "ok" if not errors else f"FAILED: {errors[0]}"
+        print(
+            f"threads={n:<3} {rate:12.0f} parses/s"
+            f"  x{rate / base:5.2f}  {status}"
+        )
+        failed = failed or bool(errors)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
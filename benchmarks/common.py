@@ -0,0 +1,19 @@
+import time
+from typing import Callable, List
+
+
+def measure(
+    fn: Callable[[], object], repeat: int = 5, number: int = 1
+) -> float:
+    """best wall time of `repeat` rounds, in seconds per call of `fn`"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best
+
+
+def positional_argv(n: int) -> List[str]:
+    return [f"/data/file-{i:06d}.txt" for i in range(n)]
@@ -0,0 +1,269 @@
+"""
+benchmark suite for construction, parsing, validation and help rendering
+
+    PYTHONPATH=. python benchmarks/run.py [--quick] [--filter TEXT] \\
+        [--json PATH]
+
+every case reports the best time per call; `--json` writes the results
+together with environment info for regression tracking
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+from common import positional_argv
+
+from typed_cap import Cap
+from typed_cap.cap import _helper_help_cb
+from typed_cap.typing import ValidVal
+from typed_cap.typing.default import PREDEFINED_BASE
+from typed_cap.typing.valid import UnitRegistry
+from typed_cap.utils import anno_cache, split_by_length
+
+
+Case = Tuple[str, Dict[str, Any], Callable[[], object]]
+
+OPTION_COUNTS = [10, 100, 1000]
+ARGV_SIZES = [10, 1_000, 100_000]
+QUICK_OPTION_COUNTS = [10, 100]
+QUICK_ARGV_SIZES = [10, 1_000]
+
+
+def argstype_source(n: int, based: str) -> str:
+    lns = ["from typing import Optional, TypedDict", ""]
+    base = "TypedDict" if based == "dict" else "object"
+    lns.append(f"class Args({base}):")
+    lns.append('    """generated arguments"""')
+    for i in range(n):
+        if i % 2:
+            lns.append(f"    opt_{i}: Optional[int]")
+        else:
+            lns.append("    # @show_default")
+            lns.append(f"    flag_{i}: Optional[bool]")
+        lns.append(f'    """documentation of option number {i}"""')
+    return "\n".join(lns) + "\n"
+
+
+def load_argstype(tmpdir: str, n: int, based: str) -> type:
+    name = f"_bench_args_{based}_{n}"
+    path = os.path.join(tmpdir, name + ".py")
+    with open(path, "w") as f:
+        f.write(argstype_source(n, based))
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)  # type: ignore
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod.Args
+
+
+def options_argv(n: int) -> List[str]:
+    argv = []
+    for i in range(n):
+        argv += [f"--flag-{i}"] if i % 2 == 0 else [f"--opt-{i}", str(i)]
+    return argv
+
+
+def construction_cases(tmpdir: str, counts: List[int]) -> List[Case]:
+    cases: List[Case] = []
+    for based in ["dict", "object"]:
+        for n in counts:
+            argstype = load_argstype(tmpdir, n, based)
+            params = {"based": based, "options": n}
+
+            def cold(argstype=argstype):
+                anno_cache.set_anno_cache(False)
+                try:
+                    return Cap(argstype)
+                finally:
+                    anno_cache.set_anno_cache(True, tmpdir)
+
+            cases.append(("construct.cold", params, cold))
+            cases.append(("construct.warm", params, lambda a=argstype: Cap(a)))
+            schema = Cap(argstype).compile()
+            cases.append(
+                (
+                    "construct.from_schema",
+                    params,
+                    lambda s=schema: Cap.from_schema(s),
+                )
+            )
+    return cases
+
+
+def parse_cases(
+    tmpdir: str, counts: List[int], sizes: List[int]
+) -> List[Case]:
+    cases: List[Case] = []
+    for n in counts:
+        cap = Cap(load_argstype(tmpdir, n, "object"))
+        argv = options_argv(n)
+        cases.append(
+            ("parse.options", {"options": n}, lambda c=cap, a=argv: c.parse(a))
+        )
+        parsed = cap.parse(argv)
+
+        def materialize(c=cap, a=argv):
+            return c.parse(a).args
+
+        cases.append(("parsed.args", {"options": n}, materialize))
+        cases.append(
+            ("parsed.args.cached", {"options": n}, lambda p=parsed: p.args)
+        )
+
+        def render_help(c=cap):
+            with contextlib.redirect_stdout(io.StringIO()):
+                try:
+                    _helper_help_cb(c, [[True]])
+                except SystemExit:
+                    ...
+
+        cases.append(("help.render", {"options": n}, render_help))
+
+    cap = Cap(load_argstype(tmpdir, 10, "object"))
+    for size in sizes:
+        argv = ["--flag-0", "--opt-1", "1", *positional_argv(size)]
+        cases.append(
+            ("parse.argv", {"tokens": size}, lambda c=cap, a=argv: c.parse(a))
+        )
+    return cases
+
+
+class Color(Enum):
+    Red = 0
+    Green = 1
+
+
+UNIT_VALUES: List[Tuple[str, Any, Any]] = [
+    ("bool", bool, "true"),
+    ("int", int, "42"),
+    ("float", float, "3.14"),
+    ("str", str, "foo"),
+    ("none", type(None), None),
+    ("union", Optional[int], "42"),
+    ("queue", List[int], "1,2,3,4"),
+    ("literal", Literal["fast", "slow"], "fast"),
+    ("enum", Color, "green"),
+]
+if sys.version_info >= (3, 10):
+    UNIT_VALUES.append(("uniontype", int | None, "42"))
+
+
+def validation_cases() -> List[Case]:
+    vv = ValidVal(UnitRegistry.layered(PREDEFINED_BASE))
+    return [
+        (
+            "valid.extract",
+            {"unit": unit},
+            lambda t=t, v=v: vv.extract(t, v, cvt=True),
+        )
+        for unit, t, v in UNIT_VALUES
+    ]
+
+
+WRAP_SIZES = [1_000, 10_000, 100_000]
+QUICK_WRAP_SIZES = [1_000, 10_000]
+
+
+def wrap_cases(sizes: List[int]) -> List[Case]:
+    words = "wrap the help text of an option to the terminal width".split()
+    cases: List[Case] = []
+    for n in sizes:
+        text = " ".join(words[i % len(words)] for i in range(n // 5))[:n]
+        cases.append(
+            (
+                "help.wrap",
+                {"chars": n},
+                lambda t=text: split_by_length(t, 72),
+            )
+        )
+    return cases
+
+
+def run_case(fn: Callable[[], object], min_time: float) -> Dict[str, Any]:
+    fn()  # warm up caches and lazy imports
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    times = [elapsed / number]
+    for _ in range(4):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return {
+        "best": min(times),
+        "mean": sum(times) / len(times),
+        "number": number,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        from typed_cap import __version__
+    except ImportError:
+        __version__ = "unknown"
+    return {
+        "typed_cap": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--quick", action="store_true", help="small series only")
+    ap.add_argument("--filter", default="", help="run cases containing TEXT")
+    ap.add_argument("--json", default=None, help="write results to PATH")
+    ap.add_argument("--min-time", type=float, default=0.05)
+    opts = ap.parse_args(argv)
+
+    counts = QUICK_OPTION_COUNTS if opts.quick else OPTION_COUNTS
+    sizes = QUICK_ARGV_SIZES if opts.quick else ARGV_SIZES
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sys.path.insert(0, tmpdir)
+        anno_cache.set_anno_cache(True, tmpdir)
+        try:
+            cases = [
+                *construction_cases(tmpdir, counts),
+                *parse_cases(tmpdir, counts, sizes),
+                *validation_cases(),
+                *wrap_cases(QUICK_WRAP_SIZES if opts.quick else WRAP_SIZES),
+            ]
+            for name, params, fn in cases:
+                label = name + "".join(f" {k}={v}" for k, v in params.items())
+                if opts.filter not in label:
+                    continue
+                res = run_case(fn, opts.min_time)
+                results.append({"name": name, "params": params, **res})
+                print(f"{label:<45} {res['best'] * 1e6:12.2f}us")
+        finally:
+            anno_cache.set_anno_cache(True)
+            sys.path.remove(tmpdir)
+
+    if opts.json is not None:
+        with open(opts.json, "w") as f:
+            json.dump(
+                {"environment": environment(), "results": results}, f, indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
-from typing import Optional
+from typing import List, Literal, Optional, Tuple
+
+import pytest
 
 from typed_cap import Cap
+from typed_cap.types import ArgsParserKeyError, ArgsParserOptions
+from typed_cap.typing import ValidRes, ValidUnit
 
 from tests import CFG, cmd, get_profile
 
@@ -83,3 +87,308 @@ def test_anno_doc_as_about():
 
     cap = Cap(T)
     assert cap._args["anno"].about == "anno doc for testing"
+
+
+def test_schema_reuse():
+    class T(B):
+        # @alias=d
+        depth: int
+        """depth of search"""
+
+    schema = Cap(T).compile()
+    for argv in ["-d 1", "--depth 2"]:
+        cap = Cap.from_schema(schema)
+        assert cap._args["depth"].about == "depth of search"
+        res = cap.parse(cmd(argv))
+        assert G(res.args, "depth") == int(argv[-1])
+    assert "help" not in schema.options
+
+
+def test_alias_reassign():
+    class T(B):
+        verbose: Optional[bool]
+
+    cap = Cap(T)
+    cap.raw_exception(True)
+    cap.helper({"verbose": {"alias": "v"}})
+    cap.helper({"verbose": {"alias": "x"}})
+    assert cap.parse(cmd("-x -x")).count("verbose") == 2
+    with pytest.raises(ArgsParserKeyError):
+        cap.parse(cmd("-v"))
+
+
+def test_parsed_args_cached():
+    class T(B):
+        message: list[str]
+
+    res = Cap(T).parse(cmd("--message foo,bar --message baz"))
+    assert res.args is res.args
+    assert G(res.args, "message") == ["foo", "bar", "baz"]
+
+
+def test_parsed_lazy_args():
+    class T(B):
+        depth: int
+        silent: Optional[bool]
+
+    res = Cap(T).parse(cmd("--depth 3"))
+    lazy = res.lazy_args
+    assert G(lazy, "depth") == 3
+    assert res._fields == {"depth": 3}
+    assert G(lazy, "silent") is None
+    assert sorted(lazy.keys()) == ["depth", "silent"]
+
+
+def test_lazy_parse_order():
+    class T(B):
+        a: Optional[int]
+        b: Optional[int]
+        c: Optional[int]
+        d: Optional[int]
+
+    def keys(args):
+        return list(args) if isinstance(args, dict) else list(vars(args))
+
+    argv = cmd("--c 3 --a 1 --d 4")
+    eager = keys(Cap(T).parse(argv).args)
+    assert eager == ["c", "a", "d", "b"]
+    for read in ([], ["d"], ["a", "c"]):
+        args = Cap(T).parse(argv, lazy=True).args
+        for key in read:
+            G(args, key)
+        if isinstance(args, dict):
+            assert keys(args) == eager
+        else:
+            # unread fields are only added to `vars` when they are read
+            assert keys(args) == [k for k in eager if k in keys(args)]
+            for key in eager:
+                G(args, key)
+            assert keys(args) == eager
+
+
+def test_lazy_parse():
+    calls = []
+
+    class Upper(str):
+        ...
+
+    def valid_upper(vv, t, val, cvt):
+        calls.append(val)
+        v = ValidRes[Upper]()
+        v.some(Upper(val.upper()))
+        v.valid()
+        return v
+
+    class T(B):
+        name: Upper
+        depth: int
+
+    cap = Cap(
+        T,
+        extra_validator_units={
+            "upper": ValidUnit(
+                exact=Upper, type_of=None, class_of=None, valid_fn=valid_upper
+            )
+        },
+    )
+    cap.raw_exception(True)
+    with pytest.raises(ArgsParserKeyError):
+        cap.parse(cmd("--name foo --unknown"), lazy=True)
+    res = cap.parse(cmd("--name foo --depth x"), lazy=True)
+    args = res.args
+    assert calls == []
+    assert res.count("name") == 1
+    assert G(args, "name") == "FOO"
+    assert G(args, "name") == "FOO"
+    assert calls == ["foo"]
+    with pytest.raises(ValueError):
+        G(args, "depth")
+
+
+def test_subcommands():
+    class Main(B):
+        verbose: Optional[bool]
+
+    class Build(B):
+        """build the project"""
+
+        jobs: int
+
+    class Deploy(B):
+        target: str
+
+    cap = Cap(Main).subcommands({"build": Build, "deploy": Deploy})
+    res = cap.parse(cmd("--verbose build --jobs 2 src"))
+    assert G(res.args, "verbose") is True
+    assert res.command == "build"
+    assert res.argv == []
+    sub = res.subcommand
+    assert sub is not None
+    assert G(sub.args, "jobs") == 2
+    assert sub.argv == ["src"]
+    # only the invoked subcommand is compiled
+    assert cap._subcommands["build"].cap is not None
+    assert cap._subcommands["deploy"].cap is None
+    assert cap._subcommands["build"].about == "build the project"
+
+    res = cap.parse(cmd("--verbose"))
+    assert res.command is None
+    assert res.subcommand is None
+
+
+def test_complete():
+    class T(B):
+        # @alias=v
+        verbose: Optional[bool]
+        version: Optional[bool]
+        mode: Optional[Literal["fast", "slow"]]
+
+    class Sub(B):
+        depth: Optional[int]
+
+    cap = Cap(T).subcommands({"sub": Sub, "serve": Sub})
+    assert cap.complete(["--ver"]) == ["--verbose", "--version"]
+    assert cap.complete(["-"]) == [
+        "-h",
+        "-v",
+        "--help",
+        "--mode",
+        "--verbose",
+        "--version",
+    ]
+    assert cap.complete(["--mode", ""]) == ["fast", "slow"]
+    assert cap.complete(["--mode=f"]) == ["--mode=fast"]
+    assert cap.complete(["-v", "s"]) == ["sub", "serve"]
+    assert cap.complete(["--mode", "sub", "--d"]) == []
+    assert cap.complete(["sub", "--d"]) == ["--depth"]
+
+    # earlier words are resolved like `parse` does
+    assert cap.complete(["--mo", ""]) == ["sub", "serve"]
+    assert cap.complete(["--mo=f"]) == []
+    abbrev: ArgsParserOptions = {"allow_abbrev": True}
+    assert cap.complete(["--mo", ""], abbrev) == ["fast", "slow"]
+    assert cap.complete(["--mo=f"], abbrev) == ["--mo=fast"]
+    assert cap.complete(["sub", "--dep", "3", "--d"], abbrev) == ["--depth"]
+
+
+def test_allow_abbrev():
+    class T(B):
+        verbose: Optional[bool]
+        version: Optional[bool]
+        depth: Optional[int]
+
+    cap = Cap(T)
+    cap.raw_exception(True)
+    opts: ArgsParserOptions = {"allow_abbrev": True}
+    res = cap.parse(cmd("--verb --dep 3"), opts)
+    assert G(res.args, "verbose") is True
+    assert G(res.args, "depth") == 3
+    with pytest.raises(ArgsParserKeyError):
+        cap.parse(cmd("--ver"), opts)
+    with pytest.raises(ArgsParserKeyError):
+        cap.parse(cmd("--verb"))
+
+
+def test_stream(monkeypatch):
+    import io
+    import itertools
+
+    class T(B):
+        depth: Optional[int]
+
+    cap = Cap(T)
+    monkeypatch.setattr("sys.stdin", io.StringIO("a b\nc\n\nd"))
+    res = cap.parse(cmd("x - --depth 2 y"), stream=True)
+    assert G(res.args, "depth") == 2
+    assert list(res.argv) == ["x", "a b", "c", "", "d", "y"]
+
+    # processing starts before the source is exhausted
+    res = cap.parse(cmd("x"), stream=map(str, itertools.count()))
+    it = iter(res.argv)
+    assert next(it) == "x"
+    assert [next(it) for _ in range(3)] == ["0", "1", "2"]
+
+    assert cap.parse(cmd("x -")).argv == ["x", "-"]
+
+
+def test_config(tmp_path, monkeypatch):
+    from typed_cap.types import CapConfigError, CapInvalidValue
+
+    class T(B):
+        depth: int
+        name: Optional[str]
+        tags: Optional[List[str]]
+        point: Optional[Tuple[int, int]]
+        dry_run: Optional[bool]
+
+    cfg = tmp_path / "app.json"
+    cfg.write_text(
+        '{"depth": 1, "name": "file", "tags": ["a", "b"],'
+        ' "point": [1, 2], "dry-run": true, "unknown": {"x": 1}}'
+    )
+    cap = Cap(T).set_config(cfg)
+    res = cap.parse(cmd(""))
+    assert G(res.args, "depth") == 1
+    assert G(res.args, "name") == "file"
+    assert G(res.args, "tags") == ["a", "b"]
+    assert G(res.args, "point") == (1, 2)
+    assert G(res.args, "dry_run") is True
+
+    # precedence: argv > env > file
+    cap.set_env_prefix("app_")
+    monkeypatch.setenv("APP_NAME", "env")
+    monkeypatch.setenv("APP_TAGS", "x,y")
+    res = cap.parse(cmd("--depth 3"))
+    assert G(res.args, "depth") == 3
+    assert G(res.args, "name") == "env"
+    assert G(res.args, "tags") == ["x", "y"]
+    res = cap.parse(cmd("--name cli"))
+    assert G(res.args, "name") == "cli"
+
+    # invalid values fail the parse, or the read in lazy mode
+    cap = Cap(T).set_config({"depth": "x", "name": "n"}).raw_exception(True)
+    assert G(cap.parse(cmd("--depth 2")).args, "depth") == 2
+    with pytest.raises(CapInvalidValue) as err:
+        cap.parse(cmd(""))
+    assert (err.value.key, err.value.args) == ("depth", ("config",))
+    res = cap.parse(cmd(""), lazy=True)
+    assert res.lazy_args["name"] == "n"
+    with pytest.raises(CapInvalidValue):
+        res.lazy_args["depth"]
+
+    toml = tmp_path / "pyproject.toml"
+    toml.write_text('[tool.app]\ndepth = 5\ntags = ["t"]\n')
+    try:
+        cap = Cap(T).set_config(toml, section="tool.app")
+    except CapConfigError:
+        pytest.skip("no TOML reader")
+    res = cap.parse(cmd(""))
+    assert G(res.args, "depth") == 5
+    assert G(res.args, "tags") == ["t"]
+
+    with pytest.raises(CapConfigError):
+        Cap(T).set_config(toml, section="tool.other")
+    with pytest.raises(CapConfigError):
+        Cap(T).set_config(tmp_path / "missing.json")
+
+
+def test_env_flags(monkeypatch):
+    from typed_cap.types import CapInvalidValue
+
+    class T(B):
+        dry_run: Optional[bool]
+
+    cap = Cap(T).set_env_prefix("app_").raw_exception(True)
+    for raw, expected in [("1", True), ("0", False), (" Yes ", True)]:
+        monkeypatch.setenv("APP_DRY_RUN", raw)
+        assert G(cap.parse(cmd("")).args, "dry_run") is expected
+    assert G(cap.parse(cmd("--dry-run")).args, "dry_run") is True
+
+    monkeypatch.setenv("APP_DRY_RUN", "maybe")
+    with pytest.raises(CapInvalidValue) as err:
+        cap.parse(cmd(""))
+    assert err.value.key == "dry_run"
+    assert err.value.args == ("environment variable APP_DRY_RUN",)
+    res = cap.parse(cmd(""), lazy=True)
+    with pytest.raises(CapInvalidValue):
+        res.lazy_args["dry_run"]
@@ -0,0 +1,65 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+from typed_cap import Cap
+from typed_cap.utils import anno_cache, code
+
+
+SRC = '''
+class T:
+    # @alias=d
+    depth: int
+    """{doc}"""
+'''
+
+
+def load_argstype(path: str) -> type:
+    spec = importlib.util.spec_from_file_location("_anno_cache_mod", path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)  # type: ignore
+    return mod.T
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    anno_cache.set_anno_cache(True, str(tmp_path / "cache"))
+    yield tmp_path / "cache"
+    anno_cache.set_anno_cache(True)
+    sys.modules.pop("_anno_cache_mod", None)
+
+
+def test_anno_cache_hit(tmp_path, cache_dir, monkeypatch):
+    path = tmp_path / "mod.py"
+    path.write_text(SRC.format(doc="depth of search"))
+    T = load_argstype(str(path))
+    assert Cap(T)._args["depth"].about == "depth of search"
+    assert len(os.listdir(cache_dir)) == 1
+
+    def _no_parse(c):
+        raise AssertionError("source should not be parsed")
+
+    monkeypatch.setattr(code, "_get_class_annotations", _no_parse)
+    cap = Cap(load_argstype(str(path)))
+    assert cap._args["depth"].about == "depth of search"
+    assert cap._args["depth"].alias == "d"
+
+
+def test_anno_cache_invalidation(tmp_path, cache_dir):
+    path = tmp_path / "mod.py"
+    path.write_text(SRC.format(doc="old"))
+    assert Cap(load_argstype(str(path)))._args["depth"].about == "old"
+    path.write_text(SRC.format(doc="new doc"))
+    assert Cap(load_argstype(str(path)))._args["depth"].about == "new doc"
+
+
+def test_anno_cache_disabled(tmp_path, cache_dir):
+    anno_cache.set_anno_cache(False)
+    path = tmp_path / "mod.py"
+    path.write_text(SRC.format(doc="depth of search"))
+    cap = Cap(load_argstype(str(path)))
+    assert cap._args["depth"].about == "depth of search"
+    assert not cache_dir.exists()
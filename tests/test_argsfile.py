@@ -0,0 +1,75 @@
+from typing import List, Optional
+
+import pytest
+
+from typed_cap import Cap
+from typed_cap.argsfile import expand_argsfiles, read_argsfile
+from typed_cap.types import ArgsParserArgsfileError
+
+
+class Args:
+    name: Optional[str]
+    depth: Optional[int]
+
+
+def test_lines(tmp_path):
+    path = tmp_path / "args"
+    path.write_text("--name\nfoo bar\n\nsrc/a b.txt\r\n")
+    assert list(read_argsfile(str(path))) == [
+        "--name",
+        "foo bar",
+        "src/a b.txt",
+    ]
+    empty = tmp_path / "empty"
+    empty.write_text("")
+    assert list(read_argsfile(str(empty))) == []
+
+
+def test_shell(tmp_path):
+    path = tmp_path / "args"
+    path.write_text(
+        "--name 'foo bar' # comment\n"
+        'x"y z"\\ w "a\\"b" --depth=3#no-comment\n'
+    )
+    assert list(read_argsfile(str(path), "shell")) == [
+        "--name",
+        "foo bar",
+        "xy z w",
+        'a"b',
+        "--depth=3#no-comment",
+    ]
+    bad = tmp_path / "bad"
+    bad.write_text("'unterminated\n")
+    with pytest.raises(ArgsParserArgsfileError):
+        list(read_argsfile(str(bad), "shell"))
+
+
+def test_nested(tmp_path):
+    inner = tmp_path / "inner"
+    outer = tmp_path / "outer"
+    inner.write_text("b\nc\n")
+    outer.write_text(f"a\n@{inner}\nd\n")
+    argv = ["x", f"@{outer}", "@"]
+    assert list(expand_argsfiles(argv)) == ["x", "a", "b", "c", "d", "@"]
+    # cycles are detected, the same file may be included more than once
+    inner.write_text(f"b\n@{outer}\n")
+    with pytest.raises(ArgsParserArgsfileError):
+        list(expand_argsfiles([f"@{outer}"]))
+    inner.write_text("b\n")
+    twice: List[str] = list(expand_argsfiles([f"@{inner}", f"@{inner}"]))
+    assert twice == ["b", "b"]
+
+
+def test_parse(tmp_path):
+    path = tmp_path / "args"
+    path.write_text("--name\nfoo\n--depth\n2\npos\n")
+    cap = Cap(Args)
+    res = cap.parse([f"@{path}", "--depth", "3"], {"expand_argsfiles": True})
+    assert res.args.name == "foo"
+    assert res.args.depth == 3
+    assert res.argv == ["pos"]
+    # opt-in only
+    assert cap.parse([f"@{path}"]).argv == [f"@{path}"]
+    cap.raw_exception(True)
+    with pytest.raises(ArgsParserArgsfileError):
+        cap.parse([f"@{tmp_path / 'missing'}"], {"expand_argsfiles": True})
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+from typed_cap import Cap
+from typed_cap.typing import ValidRes, ValidUnit, ValidVal
+
+
+class ArtifactRef:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class Store:
+    delay = 0.05
+    running = 0
+    peak = 0
+
+
+async def valid_artifact(_vv: ValidVal, _t: Any, val: Any, cvt: bool):
+    v = ValidRes[ArtifactRef]()
+    if isinstance(val, ArtifactRef):
+        v.some(val)
+        v.valid()
+    elif cvt and isinstance(val, str):
+        Store.running += 1
+        Store.peak = max(Store.peak, Store.running)
+        try:
+            await asyncio.sleep(Store.delay)
+        finally:
+            Store.running -= 1
+        if not val.startswith("missing"):
+            v.some(ArtifactRef(val))
+            v.valid()
+    return v
+
+
+UNITS = {"artifact": ValidUnit(ArtifactRef, None, None, valid_artifact)}
+
+
+class Args:
+    refs: Optional[List[ArtifactRef]]
+    main: Optional[ArtifactRef]
+    count: Optional[int]
+
+
+def make_cap() -> Cap:
+    return Cap(Args, extra_validator_units=UNITS)
+
+
+def test_parse_async_concurrent():
+    Store.peak = 0
+    names = [f"a{i}" for i in range(200)]
+    argv = ["--refs", ",".join(names), "--main", "m", "--count", "2"]
+    t0 = time.perf_counter()
+    args = asyncio.run(make_cap().parse_async(argv, concurrency=100)).args
+    elapsed = time.perf_counter() - t0
+    assert args.refs is not None
+    assert [r.name for r in args.refs] == names
+    assert args.main is not None and args.main.name == "m"
+    assert args.count == 2
+    assert Store.peak == 100
+    assert elapsed < 200 * Store.delay / 4
+
+
+def test_parse_async_invalid():
+    with pytest.raises(ValueError):
+        asyncio.run(make_cap().parse_async(["--refs", "a,missing,b"]))
+
+
+def test_parse_async_timeout():
+    cap = make_cap()
+    with pytest.raises(ValueError):
+        asyncio.run(cap.parse_async(["--main", "m"], timeout=0.001))
+    res = asyncio.run(cap.parse_async(["--main", "m"], timeout=5))
+    assert res.args.main.name == "m"
+
+
+def test_parse_sync():
+    args = make_cap().parse(["--refs", "a,b"]).args
+    assert args.refs is not None
+    assert [r.name for r in args.refs] == ["a", "b"]
+
+    async def in_loop() -> None:
+        make_cap().parse(["--main", "m"])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(in_loop())
+
+
+def test_parse_async_subcommand():
+    class Top:
+        main: Optional[ArtifactRef]
+
+    cap = Cap(Top, extra_validator_units=UNITS).subcommands(
+        {"sub": make_cap()}
+    )
+    res = asyncio.run(cap.parse_async(["--main", "x", "sub", "--refs", "y"]))
+    assert res.args.main.name == "x"
+    assert res.subcommand is not None
+    assert [r.name for r in res.subcommand.args.refs] == ["y"]
+
+
+class Tag:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+CALLS: List[str] = []
+
+
+def valid_tag(_vv: ValidVal, _t: Any, val: Any, cvt: bool):
+    v = ValidRes[Tag]()
+    if cvt and isinstance(val, str):
+        CALLS.append(f"tag:{val}")
+        v.some(Tag(val))
+        v.valid()
+    return v
+
+
+class Heavy:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+def valid_heavy(_vv: ValidVal, _t: Any, val: Any, cvt: bool):
+    v = ValidRes[Heavy]()
+    if cvt and isinstance(val, str):
+        CALLS.append(f"heavy:{val}")
+        v.some(Heavy(val))
+        v.valid()
+    return v
+
+
+class Mixed:
+    tag: Optional[Tag]
+    pair: Optional[Tuple[Heavy, ArtifactRef]]
+
+
+def test_parse_async_calls_once():
+    CALLS.clear()
+    units = {
+        **UNITS,
+        "tag": ValidUnit(Tag, None, None, valid_tag),
+        "heavy": ValidUnit(Heavy, None, None, valid_heavy, True),
+    }
+    cap = Cap(Mixed, extra_validator_units=units)
+    args = asyncio.run(cap.parse_async(["--tag", "x", "--pair", "h,a"])).args
+    assert args.tag.name == "x"
+    assert [args.pair[0].name, args.pair[1].name] == ["h", "a"]
+    assert sorted(CALLS) == ["heavy:h", "tag:x"]
+
+
+def test_parse_async_layered(monkeypatch):
+    monkeypatch.setenv("ART_MAIN", "m")
+    cap = make_cap().set_env_prefix("art_").set_config({"refs": ["a", "b"]})
+
+    async def in_loop():
+        # fields are read inside the event loop
+        args = (await cap.parse_async([])).args
+        return args.main.name, [r.name for r in args.refs]
+
+    assert asyncio.run(in_loop()) == ("m", ["a", "b"])
@@ -0,0 +1,93 @@
+import sys
+from typing import List, Optional
+
+import pytest
+
+from typed_cap import Cap
+from typed_cap.types import ArgsParserKeyError, CapInvalidValue
+
+
+class Args:
+    """batch arguments"""
+
+    depth: int
+    verbose: Optional[bool]
+
+
+INPUTS: List[List[str]] = [
+    ["--depth", str(i)] if i % 3 else ["--depth", "x"] for i in range(50)
+]
+INPUTS[7] = ["--unknown"]
+INPUTS[8] = ["--help"]
+INPUTS[9] = ["--version"]
+
+
+def make_cap() -> Cap:
+    return Cap(Args).name("batch").version("1.2", add_helper=True)
+
+
+def check(results, ordered=True):
+    if ordered:
+        assert [r.index for r in results] == list(range(len(INPUTS)))
+    results = sorted(results, key=lambda r: r.index)
+    assert len(results) == len(INPUTS)
+    for r in results:
+        assert r.argv == INPUTS[r.index]
+        if r.index == 7:
+            assert isinstance(r.error, ArgsParserKeyError)
+            assert r.error.key == "unknown"
+        elif r.index == 8:
+            assert isinstance(r.error, SystemExit)
+            assert r.output.startswith("batch arguments\n")
+            assert "--depth" in r.output
+        elif r.index == 9:
+            assert r.output == "batch 1.2\n"
+        elif r.index % 3 == 0:
+            assert isinstance(r.error, ValueError)
+            with pytest.raises(ValueError):
+                r.unwrap()
+        else:
+            assert r.ok and r.output is None
+            assert r.unwrap().args.depth == r.index
+
+
+def test_serial(capsys):
+    cap = make_cap()
+    check(list(cap.parse_many(INPUTS)))
+    # the original `Cap` is left untouched and nothing is printed
+    assert cap._raw_err is False
+    assert capsys.readouterr() == ("", "")
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_threads(ordered):
+    cap = make_cap()
+    results = list(
+        cap.parse_many(INPUTS, workers=4, ordered=ordered, chunksize=4)
+    )
+    check(results, ordered)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="slow process start")
+def test_processes():
+    cap = make_cap()
+    results = list(
+        cap.parse_many(INPUTS, workers=2, pool="process", chunksize=8)
+    )
+    check(results)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="slow process start")
+def test_processes_layered(monkeypatch):
+    inputs = [[], ["--depth", "2"]]
+    monkeypatch.setenv("BATCH_DEPTH", "5")
+    cap = make_cap().set_env_prefix("batch_").set_config({"verbose": True})
+    results = list(cap.parse_many(inputs, workers=2, pool="process"))
+    assert [r.unwrap().args.depth for r in results] == [5, 2]
+    assert all(r.unwrap().args.verbose for r in results)
+
+    # an invalid env value is the error of the inputs which use it
+    monkeypatch.setenv("BATCH_DEPTH", "x")
+    results = list(cap.parse_many(inputs, workers=2, pool="process"))
+    assert isinstance(results[0].error, CapInvalidValue)
+    assert results[1].unwrap().args.depth == 2
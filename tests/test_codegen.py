@@ -0,0 +1,135 @@
+import importlib.util
+import random
+from enum import Enum
+from typing import Any, List, Literal, Optional, Tuple, TypedDict
+
+import pytest
+
+from typed_cap import Cap
+from typed_cap.codegen import generate_module, main
+from typed_cap.types import CapCodegenError
+from typed_cap.typing import ValidRes, ValidUnit
+
+
+class Color(Enum):
+    Red = 0
+    Blue = 1
+
+
+class Args:
+    """demo tool"""
+
+    depth: int
+    """how deep"""
+    ratio: Optional[float] = 0.5
+    color: Optional[Color]
+    tags: Optional[List[str]]
+    point: Optional[Tuple[int, float]]
+    mode: Optional[Literal["a", "b"]]
+    # @alias=v
+    verbose: Optional[bool]
+    # @alias=q
+    quiet: Optional[bool]
+    # @alias=n
+    name: Optional[str]
+
+
+class DictArgs(TypedDict):
+    depth: int
+    tags: Optional[List[str]]
+    verbose: Optional[bool]
+
+
+# fmt: off
+POOL = [
+    "--depth", "3", "x", "1.5", "--ratio", "--color", "red", "BLUE",
+    "--tags", "a,b", "--point", "1,2.5", "1", "--mode", "a", "--verbose",
+    "-q", "-vq", "-qn", "-n", "--name=z", "--depth=4", "--quiet=1",
+    "--unknown", "-z", "foo", "--tags=x,y", "--help",
+]
+# fmt: on
+
+
+def load(tmp_path, cap: Cap, name: str) -> Any:
+    path = tmp_path / f"{name}.py"
+    path.write_text(generate_module(cap))
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def outcome(parse, argv: List[str], capsys) -> Tuple[Any, ...]:
+    try:
+        res = parse(argv)
+    except SystemExit as err:
+        return ("exit", err.code, capsys.readouterr().out)
+    except Exception:
+        return ("error",)
+    args = res.args
+    items = sorted((args if isinstance(args, dict) else vars(args)).items())
+    return ("ok", items, list(res.argv), [res.count(k) for k, _ in items])
+
+
+@pytest.mark.parametrize("argstype", [Args, DictArgs])
+def test_codegen_matches_cap(tmp_path, capsys, argstype):
+    gen = load(tmp_path, Cap(argstype), f"gen_{argstype.__name__}")
+    cap = Cap(argstype).raw_exception(True)
+    rnd = random.Random(0)
+    for _ in range(2000):
+        argv = [rnd.choice(POOL) for _ in range(rnd.randrange(7))]
+        if rnd.random() < 0.8:
+            argv = ["--depth", "1", *argv]
+        expected = outcome(cap.parse, argv, capsys)
+        got = outcome(lambda a: gen.parse(a, raw_err=True), argv, capsys)
+        assert got == expected, argv
+
+
+def test_codegen_module(tmp_path, monkeypatch, capsys):
+    cap = Cap(Args).set_delimiter(";").set_env_prefix("cg_")
+    gen = load(tmp_path, cap, "gen_env")
+    monkeypatch.setenv("CG_TAGS", "a;b")
+    res = gen.parse(["--depth", "2", "--point", "1;2", "x"])
+    assert res.args.tags == ["a", "b"]
+    assert res.args.point == (1, 2.0)
+    assert res.argv == res.arguments == ["x"]
+    assert res.unpack() == (["x"], res.args)
+    assert res.command is None and res.subcommand is None
+    # flags take the env words of `Cap.parse`
+    for raw, expected in [("1", True), ("off", False)]:
+        monkeypatch.setenv("CG_VERBOSE", raw)
+        assert gen.parse(["--depth", "2"]).args.verbose is expected
+    monkeypatch.setenv("CG_VERBOSE", "maybe")
+    with pytest.raises(gen.ParseError) as err:
+        gen.parse(["--depth", "2"], raw_err=True)
+    assert (err.value.kind, err.value.key) == ("invalid", "verbose")
+
+    with pytest.raises(gen.ParseError) as err:
+        gen.parse(["--depth", "x"], raw_err=True)
+    assert (err.value.kind, err.value.key) == ("invalid", "depth")
+    with pytest.raises(SystemExit):
+        gen.parse([])
+    assert "depth:int is required" in capsys.readouterr().err
+    gen.print_help()
+    assert capsys.readouterr().out.startswith("demo tool\n")
+
+
+def test_codegen_unsupported():
+    class Custom:
+        ...
+
+    unit = ValidUnit(Custom, None, None, lambda *_: ValidRes())
+    cap = Cap(DictArgs, extra_validator_units={"c": unit})
+    cap.add_argument("c", Custom)
+    with pytest.raises(CapCodegenError):
+        generate_module(cap)
+    with pytest.raises(CapCodegenError):
+        generate_module(Cap(DictArgs).subcommands({"sub": Args}))
+    with pytest.raises(CapCodegenError):
+        generate_module(Cap(DictArgs).set_config({"depth": 1}))
+
+
+def test_codegen_main(tmp_path):
+    out = tmp_path / "gen_main.py"
+    main([f"{__name__}:Args", "-o", str(out)])
+    assert "def parse(" in out.read_text()
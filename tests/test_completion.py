@@ -0,0 +1,78 @@
+import shutil
+import subprocess
+from enum import Enum
+from typing import List, Literal, Optional
+
+import pytest
+
+from typed_cap import Cap
+from typed_cap.completion import completion_spec, generate_completion
+
+
+class Color(Enum):
+    Red = 0
+    Green = 1
+
+
+class Paint:
+    """paint files"""
+
+    # @alias=c
+    color: Color
+    """color to use"""
+    mode: Optional[Literal["fast", "slow"]]
+    verbose: Optional[bool]
+    files: Optional[List[str]]
+
+
+class Main:
+    debug: Optional[bool]
+
+
+def test_spec():
+    spec = completion_spec(Cap(Paint))
+    opts = {opt.name: opt for opt in spec.options}
+    assert opts["color"].alias == "c"
+    assert opts["color"].choices == ["red", "green"]
+    assert opts["color"].about == "color to use"
+    assert opts["mode"].choices == ["fast", "slow"]
+    assert opts["mode"].takes_value
+    assert not opts["verbose"].takes_value
+    assert opts["files"].takes_value and opts["files"].choices == []
+    assert "help" in opts
+
+
+@pytest.mark.parametrize("shell", ["bash", "zsh", "fish"])
+def test_scripts(shell):
+    cap = Cap(Main).subcommands({"paint": Paint})
+    script = generate_completion(cap, shell, prog="tool")
+    assert "--color" in script or "-l color" in script
+    assert "paint" in script
+    assert "red green" in script
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="requires bash")
+def test_bash_completes():
+    cap = Cap(Main).subcommands({"paint": Paint})
+    script = generate_completion(cap, "bash", prog="tool")
+
+    def complete(*words: str) -> List[str]:
+        cmd = "\n".join(
+            [
+                script,
+                "COMP_WORDS=(" + " ".join(f"'{w}'" for w in words) + ")",
+                f"COMP_CWORD={len(words) - 1}",
+                "_tool_complete",
+                'echo "${COMPREPLY[*]}"',
+            ]
+        )
+        out = subprocess.run(
+            ["bash", "-c", cmd], capture_output=True, text=True, check=True
+        )
+        return out.stdout.split()
+
+    assert complete("tool", "") == ["paint"]
+    assert complete("tool", "--d") == ["--debug"]
+    assert complete("tool", "paint", "--co") == ["--color"]
+    assert complete("tool", "paint", "-c", "g") == ["green"]
+    assert complete("tool", "paint", "--mode", "") == ["fast", "slow"]
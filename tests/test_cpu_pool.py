@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional
+
+import pytest
+
+from typed_cap import Cap
+from typed_cap.typing import UnitNotPicklable, ValidRes, ValidUnit, ValidVal
+
+
+class Digest:
+    def __init__(self, text: str, pid: int) -> None:
+        self.text = text
+        self.pid = pid
+
+
+def valid_digest(_vv: ValidVal, _t: Any, val: Any, cvt: bool):
+    v = ValidRes[Digest]()
+    if isinstance(val, Digest):
+        v.some(val)
+        v.valid()
+    elif cvt and isinstance(val, str) and val.isalpha():
+        v.some(Digest(val.upper(), os.getpid()))
+        v.valid()
+    return v
+
+
+UNITS = {"digest": ValidUnit(Digest, None, None, valid_digest, True)}
+
+
+class Args:
+    one: Optional[Digest]
+    many: Optional[List[Digest]]
+    count: Optional[int]
+
+
+def test_unit_not_picklable():
+    unit = ValidUnit(Digest, None, None, lambda *_: ValidRes(), True)
+    with pytest.raises(UnitNotPicklable):
+        Cap(Args, extra_validator_units={"digest": unit})
+    cap = Cap(Args)
+    with pytest.raises(UnitNotPicklable):
+        cap._val_validator._registry["digest"] = unit
+
+
+def test_cpu_pool():
+    argv = ["--one", "abc", "--many", "x,y,z", "--count", "3"]
+    with ProcessPoolExecutor(2) as pool:
+        cap = Cap(Args, extra_validator_units=UNITS).set_cpu_pool(pool)
+        args = cap.parse(argv).args
+    assert args.one is not None and args.one.text == "ABC"
+    assert args.one.pid != os.getpid()
+    assert args.many is not None
+    assert [d.text for d in args.many] == ["X", "Y", "Z"]
+    assert all(d.pid != os.getpid() for d in args.many)
+    assert args.count == 3
+    with pytest.raises(ValueError):
+        cap.set_cpu_pool(None).parse(["--one", "a1"])
+
+
+def test_cpu_pool_unset():
+    cap = Cap(Args, extra_validator_units=UNITS)
+    args = cap.parse(["--many", "ab,cd"]).args
+    assert args.many is not None
+    assert [d.pid for d in args.many] == [os.getpid()] * 2
+
+
+class Salt:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+def valid_salt(_vv: ValidVal, _t: Any, val: Any, cvt: bool):
+    v = ValidRes[Salt]()
+    if cvt and isinstance(val, str):
+        v.some(Salt(val[::-1]))
+        v.valid()
+    return v
+
+
+def valid_salted(vv: ValidVal, _t: Any, val: Any, cvt: bool):
+    # converts with another custom unit of the `Cap`
+    v = ValidRes[Digest]()
+    salt = vv.extract(Salt, val, cvt)
+    if salt.is_valid():
+        v.some(Digest(salt.value.text, os.getpid()))
+        v.valid()
+    return v
+
+
+class Salted(Digest):
+    ...
+
+
+class SaltedArgs:
+    salted: Optional[Salted]
+
+
+def test_cpu_pool_custom_units():
+    units = {
+        "salt": ValidUnit(Salt, None, None, valid_salt),
+        "salted": ValidUnit(Salted, None, None, valid_salted, True),
+    }
+    with ProcessPoolExecutor(1) as pool:
+        cap = Cap(SaltedArgs, extra_validator_units=units)
+        args = cap.set_cpu_pool(pool).parse(["--salted", "abc"]).args
+    assert args.salted is not None and args.salted.text == "cba"
+    assert args.salted.pid != os.getpid()
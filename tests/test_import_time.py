@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# generous budget (in microseconds) for importing `Cap`, including the
+# bytecode compilation of a fresh checkout
+IMPORT_BUDGET_US = 150_000
+
+HEAVY_MODULES = [
+    "json",
+    "shutil",
+    "hashlib",
+    "typed_cap.help",
+    "typed_cap.schema",
+    "typed_cap.utils.code",
+    "typed_cap.utils.color",
+]
+
+
+def importtime(stmt: str) -> Dict[str, Tuple[int, bool]]:
+    """cumulative import time in us of every module imported by `stmt`"""
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    mods: Dict[str, Tuple[int, bool]] = {}
+    for ln in proc.stderr.splitlines():
+        if not ln.startswith("import time:") or "|" not in ln:
+            continue
+        _, cumulative, name = ln[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            top_level = len(name) - len(name.lstrip()) == 1
+            mods[name.strip()] = (int(cumulative), top_level)
+    return mods
+
+
+def test_import_package_is_lazy():
+    mods = importtime("import typed_cap")
+    assert "typed_cap" in mods
+    assert "typed_cap.cap" not in mods
+
+
+def test_import_cap_budget():
+    mods = importtime("from typed_cap import Cap")
+    for mod in HEAVY_MODULES:
+        assert mod not in mods, f"{mod} imported eagerly"
+    cost = sum(
+        t
+        for name, (t, top_level) in mods.items()
+        if top_level and name.startswith("typed_cap")
+    )
+    assert cost < IMPORT_BUDGET_US
@@ -0,0 +1,146 @@
+import socket
+from enum import Enum
+from typing import List, Optional
+
+import pytest
+
+from typed_cap import Cap
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs unix domain sockets"
+)
+
+
+class Color(Enum):
+    Red = 0
+    Blue = 1
+
+
+class Args:
+    """demo tool"""
+
+    depth: int
+    """how deep"""
+    color: Optional[Color]
+    tags: Optional[List[str]]
+
+
+class Other:
+    name: Optional[str]
+
+
+@pytest.fixture
+def server(tmp_path):
+    from typed_cap.server import serve_in_thread
+
+    path = str(tmp_path / "cap.sock")
+    srv = serve_in_thread(
+        path,
+        {
+            "m:Args": Cap(Args).version("1.2", add_helper=True),
+            "m:Other": Cap(Other).set_env_prefix("other_"),
+        },
+    )
+    yield path
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_server_parse(server):
+    from typed_cap.client import request
+
+    argv = ["--depth", "3", "--color", "red", "x"]
+    res = request("parse", argv, path=server)
+    assert res == {
+        "ok": True,
+        "args": {"depth": 3, "color": "Red", "tags": None},
+        "argv": ["x"],
+    }
+    res = request("parse", ["--name", "n"], cap="m:Other", path=server)
+    assert res["args"] == {"name": "n"}
+
+    res = request("parse", ["--depth", "x"], path=server)
+    assert not res["ok"] and res["error"] == "ValueError"
+    res = request("parse", [], path=server)
+    assert res["error"] == "ArgsParserMissingArgument"
+    assert res["detail"]["key"] == "depth"
+    res = request("parse", ["--bad"], path=server)
+    assert res["error"] == "ArgsParserKeyError"
+    res = request("parse", [], cap="m:Missing", path=server)
+    assert res["error"] == "KeyError"
+
+
+def test_server_ops(server):
+    from typed_cap.client import request
+
+    assert request("validate", ["--depth", "1"], path=server) == {"ok": True}
+    text = request("help", path=server)["text"]
+    assert text.startswith("demo tool\n") and "--depth" in text
+    res = request("parse", ["--help"], path=server)
+    assert res == {"ok": False, "exit": 0, "text": text}
+    res = request("parse", ["--version"], path=server)
+    assert res == {"ok": False, "exit": 0, "text": "1.2\n"}
+    res = request("complete", ["--color", "b"], path=server)
+    assert res == {"ok": True, "candidates": ["blue"]}
+    assert request("nope", path=server)["error"] == "UnknownOp"
+
+
+def test_server_connection_reuse(server):
+    from typed_cap.client import recv_msg, send_msg
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server)
+        for i in range(3):
+            send_msg(sock, {"op": "parse", "argv": ["--depth", str(i)]})
+            res = recv_msg(sock)
+            assert res is not None and res["args"]["depth"] == i
+
+
+def test_server_env(server, monkeypatch):
+    from typed_cap.client import request
+
+    # the environment of the client is used, never the one of the daemon
+    monkeypatch.setenv("OTHER_NAME", "daemon")
+    env = {"OTHER_NAME": "client"}
+    res = request("parse", [], cap="m:Other", path=server, env=env)
+    assert res["args"] == {"name": "client"}
+    res = request("parse", [], cap="m:Other", path=server, env={})
+    assert res["args"] == {"name": None}
+
+
+def test_message_size(server):
+    from typed_cap.client import MAX_MSG_SIZE, _HEADER, recv_msg
+
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(_HEADER.pack(MAX_MSG_SIZE + 1))
+        with pytest.raises(ValueError):
+            recv_msg(b)
+
+    # the daemon drops a connection announcing an oversized message
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server)
+        sock.sendall(_HEADER.pack(MAX_MSG_SIZE + 1))
+        assert recv_msg(sock) is None
+
+
+def test_default_socket_path(tmp_path, monkeypatch):
+    import os
+
+    from typed_cap.client import default_socket_path
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    path = default_socket_path()
+    base = tmp_path / f"typed_cap-{os.getuid()}"
+    assert path == str(base / "typed_cap.sock")
+    assert base.stat().st_mode & 0o777 == 0o700
+    assert default_socket_path() == path
+
+    base.chmod(0o755)
+    with pytest.raises(PermissionError):
+        default_socket_path()
+    base.rmdir()
+    base.symlink_to(tmp_path)
+    with pytest.raises(PermissionError):
+        default_socket_path()
@@ -0,0 +1,51 @@
+import threading
+from typing import List, Optional, Tuple
+
+from typed_cap import Cap
+from typed_cap.typing.default import VALIDATOR
+
+
+class Args:
+    depth: int
+    tags: Optional[List[str]]
+    point: Optional[Tuple[int, int]]
+
+
+def test_shared_validator_threads():
+    comma = Cap(Args)
+    semicolon = Cap(Args).set_delimiter(";")
+    errors: List[str] = []
+
+    def work(seed: int) -> None:
+        for i in range(300):
+            cap, sep = (comma, ",") if (i + seed) % 2 else (semicolon, ";")
+            argv = ["--depth", str(i), "--tags", f"a{sep}b", "--point"]
+            argv.append(f"{i}{sep}{seed}")
+            args = cap.parse(argv, validator=VALIDATOR).args
+            if (args.depth, args.tags, args.point) != (
+                i,
+                ["a", "b"],
+                (i, seed),
+            ):
+                errors.append(repr(argv))
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_validator_not_modified():
+    vv = VALIDATOR
+    delimiter, attributes = vv.delimiter, vv.attributes
+    cap = Cap(Args).set_delimiter(";")
+    res = cap.parse(["--depth", "1", "--tags", "a;b"], validator=vv)
+    assert res.args.tags == ["a", "b"]
+    assert vv.delimiter is delimiter
+    assert vv.attributes is attributes
+    view = vv.bind(cap._delimiter, {"k": 1})
+    assert view.delimiter.unwrap() == ";"
+    assert view.attributes == {"k": 1}
+    assert view.registry is vv.registry
@@ -0,0 +1,86 @@
+from typing import List, Optional, Tuple
+
+from typed_cap import Cap
+from typed_cap.trace import TraceCollector, Tracer, get_tracer, use_tracer
+
+
+class Args:
+    verbose: Optional[bool]
+    count: Optional[int]
+    names: Optional[List[str]]
+
+
+class Recorder(Tracer):
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, str, Optional[str]]] = []
+
+    def on_start(self, phase, detail, t_ns):
+        self.events.append(("start", phase, detail))
+
+    def on_stop(self, phase, detail, t_ns, elapsed_ns):
+        assert elapsed_ns >= 0
+        self.events.append(("stop", phase, detail))
+
+
+def test_phases():
+    rec = Recorder()
+    with use_tracer(rec):
+        cap = Cap(Args)
+        cap.parse(["--verbose", "--count", "3", "--names", "a,b"])
+    phases = [p for ev, p, _ in rec.events if ev == "stop"]
+    for phase in [
+        "init.argstype",
+        "init.anno_details",
+        "init.cmt_params",
+        "init.validator",
+        "parse.tokenize",
+        "parse.resolve",
+        "parse.callbacks",
+        "parse.defaults",
+    ]:
+        assert phase in phases
+    converted = [d for ev, p, d in rec.events if p == "parse.convert"]
+    assert sorted(set(converted)) == ["count", "names", "verbose"]
+    # spans are properly nested
+    stack = []
+    for ev, phase, detail in rec.events:
+        if ev == "start":
+            stack.append((phase, detail))
+        else:
+            assert stack.pop() == (phase, detail)
+    assert stack == []
+
+
+def test_disabled_by_default():
+    assert get_tracer() is None
+    rec = Recorder()
+    with use_tracer(rec):
+        assert get_tracer() is rec
+    assert get_tracer() is None
+    Cap(Args).parse(["--count", "1"])
+    assert rec.events == []
+
+
+def test_collector():
+    col = TraceCollector()
+    cap = Cap(Args)
+    with use_tracer(col):
+        for _ in range(5):
+            cap.parse(["--count", "1"])
+    stats = col.by_phase["parse.tokenize"]
+    assert stats.count == 5
+    assert stats.min_ns <= stats.mean_ns <= stats.max_ns
+    assert col.by_option[("parse.convert", "count")].count == 5
+    assert "parse.tokenize" in col.report()
+    col.clear()
+    assert col.by_phase == {}
+
+
+def test_lazy_conversion_traced():
+    col = TraceCollector()
+    cap = Cap(Args)
+    with use_tracer(col):
+        parsed = cap.parse(["--count", "1"], lazy=True)
+        assert "parse.convert" not in col.by_phase
+        assert parsed.args.count == 1
+    assert col.by_option[("parse.convert", "count")].count == 1
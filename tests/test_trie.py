@@ -0,0 +1,39 @@
+from typed_cap.option_index import OptionIndex
+from typed_cap.utils.trie import PrefixTrie
+
+
+def test_trie():
+    trie: PrefixTrie[int] = PrefixTrie()
+    for i, key in enumerate(["verbose", "version", "very", "depth", "v"]):
+        trie.insert(key, i)
+    assert len(trie) == 5
+    assert trie.keys("ver") == ["verbose", "version", "very"]
+    assert trie.keys("v") == ["v", "verbose", "version", "very"]
+    assert trie.keys("x") == []
+    assert trie.get("very") == 2
+    assert trie.get("ver") is None
+    assert "depth" in trie and "dep" not in trie
+    assert trie.remove("version")
+    assert not trie.remove("version")
+    assert not trie.remove("ver")
+    assert trie.keys("vers") == []
+    assert trie.keys("ver") == ["verbose", "very"]
+    assert len(trie) == 4
+
+
+def test_index_prefix():
+    index = OptionIndex()
+    index.add("verbose", "flag")
+    index.add("version", "flag")
+    index.add("depth", "option")
+    index.set_alias("depth", "d")
+    assert index.match_prefix("verb") == "verbose"
+    assert index.match_prefix("ver") is None
+    assert index.match_prefix("d") == "depth"
+    assert index.match_prefix("de") == "depth"
+    assert index.names("d") == [("d", "depth"), ("depth", "depth")]
+    # the trie follows changes of the index
+    index.remove("verbose")
+    assert index.match_prefix("ver") == "version"
+    index.set_alias("depth", "e")
+    assert index.names("d") == [("depth", "depth")]
@@ -0,0 +1,45 @@
+from typing import List, Optional
+
+from typed_cap.typing import UnitRegistry, ValidRes, ValidUnit, ValidVal
+from typed_cap.typing.default import PREDEFINED_BASE, PREDEFINED_UNITS
+
+
+def _valid_upper(_vv, _t, val, _cvt):
+    v = ValidRes[str]()
+    v.some(str(val).upper())
+    v.valid()
+    return v
+
+
+def test_dispatch_cache():
+    vv = ValidVal(dict(PREDEFINED_UNITS))
+    assert vv.extract(List[int], "1,2", cvt=True).value == [1, 2]
+    assert vv.extract(List[int], "3", cvt=True).value == [3]
+    assert vv.get_unit(int) is PREDEFINED_UNITS["int"]
+    assert vv.get_unit(Optional[int]) is PREDEFINED_UNITS["union"]
+
+
+def test_dispatch_cache_invalidation():
+    vv = ValidVal(dict(PREDEFINED_UNITS))
+    assert vv.extract(str, "foo", cvt=True).value == "foo"
+    vv.registry["upper"] = ValidUnit(
+        exact=str, type_of=None, class_of=None, valid_fn=_valid_upper
+    )
+    assert vv.extract(str, "foo", cvt=True).value == "FOO"
+    vv.registry.pop("upper")
+    assert vv.extract(str, "foo", cvt=True).value == "foo"
+
+
+def test_layered_registry():
+    a = ValidVal(UnitRegistry.layered(PREDEFINED_BASE))
+    b = ValidVal(UnitRegistry.layered(PREDEFINED_BASE))
+    a.registry["upper"] = ValidUnit(
+        exact=str, type_of=None, class_of=None, valid_fn=_valid_upper
+    )
+    assert a.extract(str, "foo", cvt=True).value == "FOO"
+    assert b.extract(str, "foo", cvt=True).value == "foo"
+    # copy-on-write when removing a shared unit
+    del a.registry["int"]
+    assert "int" not in a.registry
+    assert "int" in PREDEFINED_BASE
+    assert b.extract(int, "1", cvt=True).value == 1
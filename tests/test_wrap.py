@@ -0,0 +1,121 @@
+import random
+import re
+from typing import Any, List
+
+import pytest
+
+from typed_cap.utils import split_by_length
+
+
+def _splice(
+    array: List[Any], start: int, delete_count: int, *items: Any
+) -> List[Any]:
+    return [*array[:start], *items, *array[start + delete_count :]]
+
+
+def _split_by_length_ref(
+    text: str,
+    length: int,
+    add_hyphen: bool = True,
+    remove_leading_space: bool = True,
+) -> List[str]:
+    # the former quadratic implementation, kept as reference
+    text_lns = text.split("\n")
+    if len(text_lns) != 1:
+        lns: List[str] = []
+        for ln in text_lns:
+            lns = [
+                *lns,
+                *_split_by_length_ref(
+                    ln, length, add_hyphen, remove_leading_space
+                ),
+            ]
+        return lns
+    if not add_hyphen:
+        return [text[i : i + length] for i in range(0, len(text), length)]
+    lns = []
+    i = 0
+    while i < len(text):
+        sub = text[i : i + length]
+        if len(sub) < length:
+            lns.append(sub)
+            break
+        tail = text[i + length - 2 : i + length + 1]
+        if remove_leading_space and len(tail) == 3 and tail[2] == " ":
+            text = "".join(_splice(list(text), i + length, 1))
+        else:
+            m = re.match(r"(?P<S>\s{1})?\w{2,}", tail)
+            if m is not None:
+                if m.group("S") is not None:
+                    text = "".join(_splice(list(text), i + length - 2, 0, " "))
+                else:
+                    text = "".join(_splice(list(text), i + length - 1, 0, "-"))
+        lns.append(text[i : i + length])
+        i += length
+    return lns
+
+
+def _random_text(rnd: random.Random) -> str:
+    alphabet = "ab  \n\t.-_1"
+    return "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 80)))
+
+
+def test_wrap_same_as_reference():
+    rnd = random.Random(0)
+    for _ in range(5000):
+        text = _random_text(rnd)
+        length = rnd.randint(2, 12)
+        hyphen = rnd.random() < 0.8
+        remove = rnd.random() < 0.8
+        assert split_by_length(
+            text, length, hyphen, remove
+        ) == _split_by_length_ref(text, length, hyphen, remove), (
+            text,
+            length,
+            hyphen,
+            remove,
+        )
+
+
+def test_wrap_words():
+    text = "convert the values of every option before the callbacks run"
+    assert split_by_length(text, 20) == [
+        "convert the values  ",
+        "of every option bef-",
+        "ore the callbacks r-",
+        "un",
+    ]
+    assert split_by_length("one\n\ntwo", 10) == ["one", "two"]
+    assert split_by_length("abcdef", 1) == list("abcdef")
+    with pytest.raises(ValueError):
+        split_by_length("abc", 0)
+
+
+def test_wrap_ansi():
+    red, reset = "\x1b[31m", "\x1b[0m"
+    rnd = random.Random(1)
+    for _ in range(2000):
+        text = _random_text(rnd).replace("\n", "")
+        length = rnd.randint(2, 12)
+        plain = split_by_length(text, length)
+        colored = "".join(
+            red + ch + reset if rnd.random() < 0.3 else ch for ch in text
+        )
+        lns = split_by_length(colored, length)
+        assert [re.sub(r"\x1b\[\d*m", "", ln) for ln in lns] == plain
+        # escape sequences are neither lost nor split across lines
+        assert re.findall(r"\x1b\[\d*m", "".join(lns)) == re.findall(
+            r"\x1b\[\d*m", colored
+        )
+    assert split_by_length(f"{red}abcd{reset} efgh.", 4) == [
+        f"{red}abcd{reset}",
+        "efg-",
+        "h.",
+    ]
+
+
+def test_wrap_linear():
+    text = "lorem ipsum dolor sit amet " * 20000
+    lns = split_by_length(text, 72)
+    assert all(len(ln) <= 72 for ln in lns)
+    assert len(lns) >= len(text) // 72
@@ -1,6 +1,36 @@
-from .anno import annotation_extra
-from .cap import Cap, helpers
+from typing import TYPE_CHECKING, Any, Dict, Tuple
 
-from ._version import version as __version__
+if TYPE_CHECKING:
+    from .anno import annotation_extra
+    from .cap import Cap, helpers
+    from .schema import CapSchema
+
+    from ._version import version as __version__
 
 name = "typed_cap"
+
+# public names are imported on first access to keep `import typed_cap` cheap
+_LAZY_NAMES: Dict[str, Tuple[str, str]] = {
+    "annotation_extra": (".anno", "annotation_extra"),
+    "Cap": (".cap", "Cap"),
+    "helpers": (".cap", "helpers"),
+    "CapSchema": (".schema", "CapSchema"),
+    "__version__": ("._version", "version"),
+}
+
+__all__ = ["annotation_extra", "Cap", "CapSchema", "helpers"]
+
+
+def __getattr__(attr: str) -> Any:
+    target = _LAZY_NAMES.get(attr)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+    from importlib import import_module
+
+    val = getattr(import_module(target[0], __name__), target[1])
+    globals()[attr] = val
+    return val
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_NAMES])
@@ -1,6 +1,8 @@
 import re
 from typing import (
     Dict,
+    Iterable,
+    Iterator,
     List,
     NoReturn,
     Optional,
@@ -17,63 +19,65 @@ from .types import (
     ArgsParserUnexpectedValue,
     ArgsParserResults,
 )
+from .option_index import OptionIndex
 from .utils import none_or
 
 
+TOKEN_REG = re.compile(
+    r"^((-(?P<flags>[a-zA-Z0-9]{2,}))|(-(?P<alias>[a-zA-Z0-9]{1}))|(-{1,2}(?P<option>[a-zA-Z0-9|\-|_]+)))(=(?P<val>[^$|^\n]+))?"
+)
+
+
 def args_parser(
-    argv: List[str],
-    named_args: List[Tuple[ArgTypes, ArgNamed]],
+    argv: Iterable[str],
+    named_args: Union[List[Tuple[ArgTypes, ArgNamed]], OptionIndex],
     parse_options: Optional[ArgsParserOptions] = None,
 ) -> ArgsParserResults:
-    argv = [a for a in argv]
-    parsed: Dict = {"_": []}
+    positional: List[str] = []
+    parsed: Dict[str, List[Union[str, bool]]] = {}
     key: str
-    reg = re.compile(
-        r"^((-(?P<flags>[a-zA-Z0-9]{2,}))|(-(?P<alias>[a-zA-Z0-9]{1}))|(-{1,2}(?P<option>[a-zA-Z0-9|\-|_]+)))(=(?P<val>[^$|^\n]+))?"
-    )
+    match = TOKEN_REG.match
 
     _default_options: ArgsParserOptions = {}
     options: ArgsParserOptions = none_or(parse_options, _default_options)
-    named_flags: List[ArgNamed] = []
-    named_options: List[ArgNamed] = []
-    for at, an in named_args:
-        if at == "flag":
-            named_flags.append(an)
-        elif at == "option":
-            named_options.append(an)
-        else:
-            ...
+    hyphen_conversion = not options.get("disable_hyphen_conversion", False)
+    commands = options.get("subcommands", ())
+    allow_abbrev = options.get("allow_abbrev", False)
+    index = (
+        named_args
+        if isinstance(named_args, OptionIndex)
+        else OptionIndex.from_named(named_args)
+    )
 
-    def get_valid_key(k: str) -> Tuple[str, bool, bool]:
+    def get_valid_key(k: str, long: bool) -> Tuple[str, bool, bool]:
         key = k
         is_flag = False
         is_option = False
+        if hyphen_conversion:
+            # FIXME: checking potential repeated option names
+            k = k.replace("-", "_")
         #
-        _key = get_flag_key(k)
+        _key = index.get_flag_key(k)
         if _key is not None:
             key = _key
             is_flag = True
         #
-        _key = get_option_key(k)
+        _key = index.get_option_key(k)
         if _key is not None:
             key = _key
             is_option = True
+        if allow_abbrev and long and not (is_flag or is_option):
+            _key = index.match_prefix(k)
+            if _key is not None:
+                key = _key
+                is_flag = index.kind(_key) == "flag"
+                is_option = not is_flag
         return key, is_flag, is_option
 
-    def _get_generic_key(k: str, valids: List[ArgNamed]) -> Optional[str]:
-        if not options.get("disable_hyphen_conversion", False):
-            # FIXME: checking potential repeated option names
-            k = k.replace("-", "_")
-        for n, a in valids:
-            if n == k or a == k:
-                return n
-        return None
-
     def get_flag_key(k: str) -> Optional[str]:
-        return _get_generic_key(k, named_flags)
-
-    def get_option_key(k: str) -> Optional[str]:
-        return _get_generic_key(k, named_options)
+        if hyphen_conversion:
+            k = k.replace("-", "_")
+        return index.get_flag_key(k)
 
     def raise_unknown_flag(key: str) -> Union[NoReturn, None]:
         if not (
@@ -89,20 +93,30 @@ def args_parser(
         ):
             raise ArgsParserKeyError(key, "option")
 
-    def is_next_a_value() -> bool:
-        if len(argv) == 0:
-            return False
+    def safe_append(k: str, t: Union[str, bool]):
+        vals = parsed.get(k)
+        if vals is None:
+            parsed[k] = [t]
         else:
-            return reg.match(argv[0]) is None
+            vals.append(t)
 
-    def safe_append(k: str, t: Union[str, bool]):
-        if parsed.get(k) is None:
-            parsed[k] = []
-        parsed[k].append(t)
+    tokens: Iterator[str] = iter(argv)
+    if options.get("expand_argsfiles", False):
+        from .argsfile import expand_argsfiles
+
+        tokens = expand_argsfiles(
+            tokens, options.get("argsfile_format", "lines")
+        )
 
-    while len(argv):
-        arg = argv.pop(0)
-        m = reg.match(arg)
+    # cursor over `tokens` with one token of lookahead; every token is
+    # matched exactly once, the match of the lookahead token is carried
+    # over to the next iteration
+    nxt = next(tokens, None)
+    m = match(nxt) if nxt is not None else None
+    while nxt is not None:
+        arg = nxt
+        nxt = next(tokens, None)
+        next_m = match(nxt) if nxt is not None else None
         if m is not None:
             opt: Optional[str]
             opt = m.group("flags")
@@ -113,6 +127,7 @@ def args_parser(
                         raise_unknown_flag(f)
                     else:
                         safe_append(f_k, True)
+                m = next_m
                 continue
             opt = m.group("alias")
             key = "_"  # checking potential unbound
@@ -128,7 +143,7 @@ def args_parser(
                 """
                 matched option with val (`-o=sth` or `--opt==sth`)
                 """
-                v_key, is_flg, is_opt = get_valid_key(key)
+                v_key, is_flg, is_opt = get_valid_key(key, arg[1] == "-")
                 if not (is_flg or is_opt):
                     raise_unknown_option(key)
                 if is_flg:
@@ -139,15 +154,17 @@ def args_parser(
                 """
                 matched option or flag depends on whether the next argument is a "val"
                 """
-                v_key, is_flg, is_opt = get_valid_key(key)
+                v_key, is_flg, is_opt = get_valid_key(key, arg[1] == "-")
                 if not (is_flg or is_opt):
                     raise_unknown_option(key)
-                if is_next_a_value():
+                if nxt is not None and next_m is None:
                     if is_flg:
                         # TODO: more description here: why assign `True`
                         safe_append(v_key, True)
                     if is_opt:
-                        safe_append(v_key, argv.pop(0))
+                        safe_append(v_key, nxt)
+                        nxt = next(tokens, None)
+                        next_m = match(nxt) if nxt is not None else None
                 else:
                     if is_flg:
                         # TODO: add an option to enable this
@@ -157,17 +174,14 @@ def args_parser(
                         safe_append(v_key, True)
                     if is_opt:
                         raise ArgsParserMissingValue(v_key)
+        elif arg in commands:
+            rest = [] if nxt is None else [nxt]
+            rest.extend(tokens)
+            return ArgsParserResults(
+                argv=positional, options=parsed, command=arg, rest=rest
+            )
         else:
-            safe_append("_", arg)
+            positional.append(arg)
+        m = next_m
 
-    def _extract(k: str, v: List[Union[str, bool]]) -> List[Union[str, bool]]:
-        if not isinstance(v, list):
-            raise Exception(f"val of {k} is not a list")
-        return v
-
-    return ArgsParserResults(
-        argv=parsed.pop("_"),
-        options=dict(
-            map(lambda it: (it[0], _extract(it[0], it[1])), parsed.items())
-        ),
-    )
+    return ArgsParserResults(argv=positional, options=parsed)
@@ -0,0 +1,114 @@
+import mmap
+import os
+import re
+from typing import Iterable, Iterator, List, Literal, Optional
+
+from .types import ArgsParserArgsfileError
+
+
+ArgsfileFormat = Literal["lines", "shell"]
+
+ARGSFILE_PREFIX = "@"
+
+_LINE_REG = re.compile(rb"[^\r\n]+")
+_SHELL_REG = re.compile(
+    rb"""(?P<comment>\#[^\n]*)"""
+    rb"""|(?P<token>(?:[^\s'"\\]+|'[^']*'|"(?:[^"\\]|\\.)*"|\\.)+)"""
+    rb"""|(?P<bad>['"\\])""",
+    re.DOTALL,
+)
+_SHELL_PIECE_REG = re.compile(
+    rb"""[^\s'"\\]+|'(?P<sq>[^']*)'|"(?P<dq>(?:[^"\\]|\\.)*)"|\\(?P<esc>.)""",
+    re.DOTALL,
+)
+_DQ_ESCAPE_REG = re.compile(rb"""\\([\\"$`\n])""")
+
+
+def _decode(b: bytes) -> str:
+    return os.fsdecode(b)
+
+
+def _unquote(token: bytes) -> str:
+    out: List[bytes] = []
+    for m in _SHELL_PIECE_REG.finditer(token):
+        if m.group("sq") is not None:
+            out.append(m.group("sq"))
+        elif m.group("dq") is not None:
+            out.append(_DQ_ESCAPE_REG.sub(rb"\1", m.group("dq")))
+        elif m.group("esc") is not None:
+            esc = m.group("esc")
+            if esc != b"\n":
+                out.append(esc)
+        else:
+            out.append(m.group())
+    return _decode(b"".join(out))
+
+
+def _tokens(
+    buf: mmap.mmap, fmt: ArgsfileFormat, path: str
+) -> Iterator[str]:
+    if fmt == "lines":
+        for m in _LINE_REG.finditer(buf):  # type: ignore[call-overload]
+            yield _decode(m.group())
+    elif fmt == "shell":
+        for m in _SHELL_REG.finditer(buf):  # type: ignore[call-overload]
+            token = m.group("token")
+            if token is not None:
+                yield _unquote(token)
+            elif m.group("bad") is not None:
+                raise ArgsParserArgsfileError(
+                    path, f"unterminated quote or escape at byte {m.start()}"
+                )
+    else:
+        raise ValueError(f"unknown argsfile format {fmt!r}")
+
+
+def read_argsfile(
+    path: str,
+    fmt: ArgsfileFormat = "lines",
+    _stack: Optional[List[str]] = None,
+) -> Iterator[str]:
+    """
+    arguments of the response file at `path`, read through a memory map
+
+    Arguments starting with `@` are expanded recursively; including a file
+    that is being expanded raises `ArgsParserArgsfileError`.
+    """
+    stack = [] if _stack is None else _stack
+    real = os.path.realpath(path)
+    if real in stack:
+        raise ArgsParserArgsfileError(path, "recursive argsfile")
+    try:
+        f = open(path, "rb")
+    except OSError as err:
+        raise ArgsParserArgsfileError(path, err.strerror or str(err))
+    stack.append(real)
+    try:
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                tokens = _tokens(buf, fmt, path)
+                try:
+                    for arg in tokens:
+                        if arg.startswith(ARGSFILE_PREFIX) and len(arg) > 1:
+                            yield from read_argsfile(arg[1:], fmt, stack)
+                        else:
+                            yield arg
+                finally:
+                    # release the buffer exported to the regex scanner
+                    # before the map is closed
+                    tokens.close()
+    finally:
+        stack.pop()
+
+
+def expand_argsfiles(
+    argv: Iterable[str], fmt: ArgsfileFormat = "lines"
+) -> Iterator[str]:
+    """`argv` with every `@path` replaced by the arguments in `path`"""
+    for arg in argv:
+        if arg.startswith(ARGSFILE_PREFIX) and len(arg) > 1:
+            yield from read_argsfile(arg[1:], fmt)
+        else:
+            yield arg
@@ -0,0 +1,269 @@
+import pickle
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import partial
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from .types import ArgsParserOptions
+
+if TYPE_CHECKING:
+    from .cap import Cap, Parsed
+
+
+T = TypeVar("T")
+
+PoolKind = Literal["thread", "process"]
+
+_Chunk = List[Tuple[int, List[str]]]
+
+
+class HelperExit(SystemExit):
+    """
+    raised by the help and version options of worker caps in place of
+    printing `text` and exiting
+    """
+
+    text: str
+
+    def __init__(self, text: str) -> None:
+        super().__init__(0)
+        self.text = text
+
+
+class ParseResult(Generic[T]):
+    """outcome of parsing one input of `Cap.parse_many`"""
+
+    index: int
+    """position of the input in the iterable"""
+    argv: List[str]
+    parsed: Optional["Parsed[T]"]
+    error: Optional[BaseException]
+
+    def __init__(
+        self,
+        index: int,
+        argv: List[str],
+        parsed: Optional["Parsed[T]"] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        self.index = index
+        self.argv = argv
+        self.parsed = parsed
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def output(self) -> Optional[str]:
+        """text of the help or version option given by the input"""
+        if isinstance(self.error, HelperExit):
+            return self.error.text
+        return None
+
+    def unwrap(self) -> "Parsed[T]":
+        """the parsed result, or raise the error of the input"""
+        if self.error is not None:
+            raise self.error
+        return self.parsed  # type: ignore[return-value]
+
+    def __repr__(self) -> str:
+        if self.error is not None:
+            return f"ParseResult({self.index}, error={self.error!r})"
+        return f"ParseResult({self.index}, ok)"
+
+    def __reduce__(self):
+        # errors of this package take their fields as `__init__` arguments
+        # and can't be rebuilt from `args`, so their state is sent instead
+        err = self.error
+        err_state = None
+        if err is not None:
+            err_state = (type(err), err.args, err.__dict__)
+        return (
+            _unpickle_result,
+            (self.index, self.argv, self.parsed, err_state),
+        )
+
+
+def _unpickle_result(
+    index: int,
+    argv: List[str],
+    parsed: Optional["Parsed"],
+    err_state: Optional[Tuple[type, tuple, Dict[str, Any]]],
+) -> ParseResult:
+    err = None
+    if err_state is not None:
+        cls, args, state = err_state
+        err = cls.__new__(cls, *args)
+        err.args = args
+        err.__dict__.update(state)
+    return ParseResult(index, argv, parsed, err)
+
+
+def _help_cb(c: "Cap", v: List[List[bool]]) -> Any:
+    from .help import help_text
+
+    if v[0][0]:
+        raise HelperExit(help_text(c))
+    return v
+
+
+def _version_cb(c: "Cap", v: List[List[bool]]) -> Any:
+    from .cap import version_text
+
+    if v[0][0]:
+        raise HelperExit(version_text(c))
+    return v
+
+
+def worker_cap(cap: "Cap") -> "Cap":
+    """
+    `Cap` built from the schema of `cap` that raises its errors instead of
+    exiting and has its helper options already set up; its help and
+    version options raise `HelperExit` instead of printing
+    """
+    return _prepare(type(cap).from_schema(cap.compile()))
+
+
+def _prepare(worker: "Cap") -> "Cap":
+    from .cap import _helper_help_cb, _helper_version_cb
+
+    worker._raw_err = True
+    worker._before_parse()
+    # the options of a schema are copies, replacing callbacks is safe
+    for opt in worker._args.values():
+        if opt.cb is _helper_help_cb:
+            opt.cb = _help_cb
+        elif opt.cb is _helper_version_cb:
+            opt.cb = _version_cb
+    return worker
+
+
+def _parse_one(
+    cap: "Cap", idx: int, argv: List[str], opts: Optional[ArgsParserOptions]
+) -> ParseResult:
+    try:
+        return ParseResult(idx, argv, parsed=cap.parse(argv, opts))
+    except (Exception, SystemExit) as err:
+        # `SystemExit` is raised by callbacks, `HelperExit` by `--help`
+        return ParseResult(idx, argv, error=err)
+
+
+def _parse_chunk(
+    cap: "Cap", opts: Optional[ArgsParserOptions], chunk: _Chunk
+) -> List[ParseResult]:
+    return [_parse_one(cap, idx, argv, opts) for idx, argv in chunk]
+
+
+_PROCESS_CAP: Optional["Cap"] = None
+_PROCESS_OPTS: Optional[ArgsParserOptions] = None
+
+
+def _process_init(schema: bytes, opts: Optional[ArgsParserOptions]) -> None:
+    from .cap import Cap
+
+    global _PROCESS_CAP, _PROCESS_OPTS
+    _PROCESS_CAP = _prepare(Cap.from_schema(pickle.loads(schema)))
+    _PROCESS_OPTS = opts
+
+
+def _process_chunk(chunk: _Chunk) -> List[ParseResult]:
+    assert _PROCESS_CAP is not None
+    return _parse_chunk(_PROCESS_CAP, _PROCESS_OPTS, chunk)
+
+
+def _chunks(argvs: Iterable[List[str]], size: int) -> Iterator[_Chunk]:
+    it = enumerate(argvs)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _run_pool(
+    pool: Executor,
+    submit: Callable[[_Chunk], List[ParseResult]],
+    chunks: Iterator[_Chunk],
+    window: int,
+    ordered: bool,
+) -> Iterator[ParseResult]:
+    if ordered:
+        queue: Deque[Future] = deque()
+        for chunk in chunks:
+            queue.append(pool.submit(submit, chunk))
+            if len(queue) >= window:
+                yield from queue.popleft().result()
+        while queue:
+            yield from queue.popleft().result()
+    else:
+        pending: Set[Future] = set()
+        for chunk in chunks:
+            pending.add(pool.submit(submit, chunk))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield from fut.result()
+        for fut in wait(pending).done:
+            yield from fut.result()
+
+
+def parse_many(
+    cap: "Cap[Any, T, Any]",
+    argvs: Iterable[List[str]],
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    pool: PoolKind = "thread",
+    chunksize: int = 64,
+    args_parser_options: Optional[ArgsParserOptions] = None,
+) -> Iterator[ParseResult[T]]:
+    """see `Cap.parse_many`"""
+    chunks = _chunks(argvs, max(chunksize, 1))
+    if workers is None or workers <= 1:
+        worker = worker_cap(cap)
+        for chunk in chunks:
+            yield from _parse_chunk(worker, args_parser_options, chunk)
+        return
+    if pool == "thread":
+        submit = partial(_parse_chunk, worker_cap(cap), args_parser_options)
+        with ThreadPoolExecutor(workers) as executor:
+            yield from _run_pool(
+                executor, submit, chunks, 2 * workers, ordered
+            )
+    elif pool == "process":
+        schema = pickle.dumps(cap.compile())
+        with ProcessPoolExecutor(
+            workers,
+            initializer=_process_init,
+            initargs=(schema, args_parser_options),
+        ) as executor:
+            yield from _run_pool(
+                executor, _process_chunk, chunks, 2 * workers, ordered
+            )
+    else:
+        raise ValueError(f"unknown pool kind {pool!r}")
+
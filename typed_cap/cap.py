@@ -1,19 +1,26 @@
 from __future__ import annotations
-import inspect
+import importlib
+import os
 import sys
-from copy import deepcopy
+import threading
+from functools import partial
 from typing import (
     Any,
     Callable,
     Dict,
     Generic,
+    Iterable,
+    Iterator,
     List,
     Literal,
+    Mapping,
+    NamedTuple,
     NoReturn,
     Optional,
     Protocol,
     Tuple,
     Type,
+    TYPE_CHECKING,
     TypeVar,
     TypedDict,
     Union,
@@ -22,15 +29,25 @@ from typing import (
 from .anno import AnnoExtra, argstyping_parse_extra
 from .args_parser import args_parser
 from .cmt_param import parse_anno_cmt_params
+from .config import (
+    ConfigFormat,
+    config_section,
+    env_flag,
+    env_name,
+    load_config,
+)
+from .lazy import LazyDict, create_lazy_object
+from .option_index import OptionIndex
+from .trace import Span, get_tracer, span
 from .types import (
     AliasCandidates,
-    ArgNamed,
     ArgOption,
-    ArgTypes,
+    ArgsParserArgsfileError,
     ArgsParserKeyError,
     ArgsParserMissingArgument,
     ArgsParserMissingValue,
     ArgsParserOptions,
+    ArgsParserResults,
     ArgsParserUndefinedParser,
     ArgsParserUnexpectedValue,
     BasicArgOption,
@@ -46,39 +63,93 @@ from .types import (
 from .typing import (
     BasedType,
     ParsedQueueType,
+    UnitRegistry,
     ValidatorNotFound,
     ValidUnit,
     ValidVal,
     get_based,
     get_optional_candidates,
     get_queue_type,
-    get_type_candidates,
+    get_value_choices,
+    is_flag_type,
     argstyping_parse,
 )
-from .typing.default import PREDEFINED_UNITS
+from .typing.default import PREDEFINED_BASE
+from .typing.plan import (
+    Converter,
+    compile_converter,
+    generic_converter,
+    may_await,
+    remote_conversions,
+    skip_cpu_bound,
+)
 from .utils import (
     flatten,
-    get_terminal_width,
     panic,
-    split_by_length,
     none_or,
 )
-from .utils.code import (
-    get_all_comments_parameters,
-    get_annotations,
-    get_docs_from_annotations,
-)
-from .utils.color import BasicColors, fg
 from .utils.option import Option
+from .utils.trie import PrefixTrie
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .batch import ParseResult
+    from .schema import CapSchema
+
+
+# imported on first use to keep `import typed_cap` cheap
+_LAZY_NAMES: Dict[str, str] = {
+    "get_all_comments_parameters": "utils.code",
+    "get_annotations": "utils.code",
+    "get_docs_from_annotations": "utils.code",
+    "BasicColors": "utils.color",
+    "fg": "utils.color",
+    "get_terminal_width": "utils",
+    "split_by_length": "utils",
+}
+
+
+def __getattr__(name: str) -> Any:
+    mod = _LAZY_NAMES.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{mod}", __package__), name)
 
 
 ArgCallback = Callable[["Cap", List[List]], Union[NoReturn, List[List]]]
 
 
+_PREPARE_LOCK = threading.RLock()
+
+STDIN_ARG = "-"
+"""positional argument standing for the lines of stdin in streaming mode"""
+
+
+def _stream_positionals(
+    argv: List[str], source: Optional[Iterable[str]]
+) -> Iterator[str]:
+    for arg in argv:
+        if arg == STDIN_ARG:
+            for ln in sys.stdin:
+                yield ln[:-1] if ln.endswith("\n") else ln
+        else:
+            yield arg
+    if source is not None:
+        yield from source
+
+
+class _PendingVal(NamedTuple):
+    raw: List[Union[str, bool]]
+    convert: Callable[[List[Union[str, bool]]], List[List[Any]]]
+
+
 class _ParsedVal(TypedDict):
     val: List[List[Any]]
     default_val: Option
     queue_type: ParsedQueueType
+    pending: Optional[_PendingVal]
+    """raw values waiting for conversion in lazy parse mode"""
 
 
 T = TypeVar("T", bound=Union[TypedDict, object])
@@ -101,34 +172,127 @@ class _GVCS(Generic[T]):
             self._gvc.__setattr__(key, val)
 
 
+class LazyArgs(Generic[T]):
+    """
+    read-only view of the parsed arguments that assembles each field only
+    when it is first accessed, by attribute or by key
+    """
+
+    __slots__ = ("_parsed",)
+    _parsed: "Parsed[T]"
+
+    def __init__(self, parsed: "Parsed[T]") -> None:
+        self._parsed = parsed
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._parsed._field(name)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name: str) -> Any:
+        return self._parsed._field(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._parsed._parsed_map
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._parsed._parsed_map)
+
+    def __len__(self) -> int:
+        return len(self._parsed._parsed_map)
+
+    def keys(self) -> List[str]:
+        return list(self._parsed._parsed_map)
+
+
 class Parsed(Generic[T]):
     _argstype: Type[T]
     _args_obj: Optional[T]
-    _args: List[str]
+    _args: Union[List[str], Iterator[str]]
     _parsed_map: Dict[str, _ParsedVal]
+    _fields: Dict[str, Any]
+    """assembled value of every field accessed so far"""
+    _materialized: Option[T]
+    _lazy: bool
+    _command: Optional[str]
+    _subcommand: Optional[Parsed[Any]]
 
     def __init__(
         self,
         argstype: Type[T],
-        args: List[str],
+        args: Union[List[str], Iterator[str]],
         parsed_map: Dict[str, _ParsedVal],
         args_obj: Optional[T],
+        lazy: bool = False,
+        command: Optional[str] = None,
+        subcommand: Optional[Parsed[Any]] = None,
     ) -> None:
         self._argstype = argstype
         self._args = args
         self._parsed_map = parsed_map
         self._args_obj = args_obj
+        self._fields = {}
+        self._materialized = Option.NONE()
+        self._lazy = lazy
+        self._command = command
+        self._subcommand = subcommand
 
     @property
     def arguments(self) -> List[str]:
-        return self._args
+        """positional arguments; a one-shot iterator in streaming mode"""
+        return self._args  # type: ignore[return-value]
+
+    @property
+    def command(self) -> Optional[str]:
+        """name of the invoked subcommand"""
+        return self._command
+
+    @property
+    def subcommand(self) -> Optional[Parsed[Any]]:
+        """parsed arguments of the invoked subcommand"""
+        return self._subcommand
 
     @property
     def argv(self) -> List[str]:
         return self.arguments
 
+    @staticmethod
+    def _convert(parsed: _ParsedVal) -> None:
+        pending = parsed["pending"]
+        if pending is not None:
+            parsed["val"] = pending.convert(pending.raw)
+            parsed["pending"] = None
+
+    def _field(self, key: str) -> Any:
+        try:
+            return self._fields[key]
+        except KeyError:
+            ...
+        parsed = self._parsed_map[key]
+        self._convert(parsed)
+        pv = flatten(parsed["val"])
+        if len(pv) == 0:
+            val = parsed["default_val"].unwrap()
+        elif parsed["queue_type"] is ParsedQueueType.LIST:
+            val = flatten(pv)
+        elif parsed["queue_type"] is ParsedQueueType.TUPLE:
+            val = pv[-1]
+        else:
+            val = pv[-1]
+        self._fields[key] = val
+        return val
+
     @property
     def args(self) -> T:
+        if self._materialized.is_some():
+            return self._materialized.unwrap()
+
+        if self._lazy:
+            val = self._lazy_materialize()
+            self._materialized = Option.Some(val)
+            return val
+
         val: T
         gvc: _GVCS
         t_based = get_based(self._argstype)
@@ -143,18 +307,37 @@ class Parsed(Generic[T]):
         else:
             raise Unhandled()
 
+        for key in self._parsed_map:
+            gvc.setVal(key, self._field(key))
+        self._materialized = Option.Some(val)
+        return val
+
+    def _lazy_materialize(self) -> T:
+        items: Dict[str, Any] = {}
+        pending: List[str] = []
         for key, parsed in self._parsed_map.items():
-            pv = parsed["val"]
-            pv = flatten(pv)
-            if len(pv) == 0:
-                gvc.setVal(key, parsed["default_val"].unwrap())
-            elif parsed["queue_type"] is ParsedQueueType.LIST:
-                gvc.setVal(key, flatten(pv))
-            elif parsed["queue_type"] is ParsedQueueType.TUPLE:
-                gvc.setVal(key, pv[-1])
+            if parsed["pending"] is None:
+                items[key] = self._field(key)
             else:
-                gvc.setVal(key, pv[-1])
-        return val
+                pending.append(key)
+        t_based = get_based(self._argstype)
+        if t_based is BasedType.DICT:
+            return LazyDict(  # type: ignore
+                self._field, items, pending, self._parsed_map
+            )
+        elif t_based is BasedType.OBJECT:
+            return create_lazy_object(
+                self._argstype, self._field, items, pending, self._parsed_map
+            )
+        else:
+            raise Unhandled()
+
+    @property
+    def lazy_args(self) -> LazyArgs[T]:
+        """
+        view of `args` that only assembles the fields which are accessed
+        """
+        return LazyArgs(self)
 
     @property
     def value(self) -> T:
@@ -172,12 +355,15 @@ class Parsed(Generic[T]):
     def count(self, name: str) -> int:
         parsed = self._parsed_map.get(name)
         if parsed is not None:
+            if parsed["pending"] is not None:
+                return len(parsed["pending"].raw)
             return len(parsed["val"])
         else:
             panic(f'Parsed.count: cannot find option with name "{name}"')
 
 
 CAP_ERR = Union[
+    ArgsParserArgsfileError,
     ArgsParserKeyError,
     ArgsParserMissingArgument,
     ArgsParserMissingValue,
@@ -191,72 +377,51 @@ CAP_ERR = Union[
 ]
 
 
-def _helper_help_cb(c: "Cap", v: List[List[bool]]) -> NoReturn:
-    lns: List[Tuple[int, str]] = []
-    INDENT_SIZE = 4
-    if v[0][0]:
-        if c._about is not None:
-            lns.append((0, c._about))
-            lns.append((0, ""))
-        lns.append((0, "OPTIONS:"))
-        arg_lns: List[Tuple[str, str]] = []
-        max_opt_len = 0
-        for key, opt in c._args.items():
-            alias = none_or(opt.alias, "   ")
-            if len(alias) == 1:
-                alias = f"-{alias},"
-            ln = f"{alias}--{key}"
-            max_opt_len = max(len(ln), max_opt_len)
-            arg_lns.append((key, ln))
-
-        MIN_ABOUT_WIDTH: int = 10
-        MAX_WIDTH: int = 100
-        prefix_width: int = max_opt_len + 4
-        width = max(
-            get_terminal_width(MAX_WIDTH) - 1 * INDENT_SIZE,
-            prefix_width + MIN_ABOUT_WIDTH,
-        )
-        remain_width = width - prefix_width
+class _Subcommand:
+    """subcommand entry whose `Cap` is only built once it is invoked"""
 
-        for key, ln in arg_lns:
-            about = []
-            if c._args[key].about is not None:
-                about.append(c._args[key].about)
+    source: Union[Type[Any], "Cap", "CapSchema"]
+    cap: Optional["Cap"]
 
-            if c._args[key].val.is_none():
-                default_val = c._args[key].cls_attr_val
-            else:
-                default_val = c._args[key].val.unwrap()
-            if default_val is not None and c._args[key].show_default:
-                about.append(f"(default: {str(default_val)})")
-
-            about = split_by_length(
-                " ".join(about),
-                remain_width,
-                add_hyphen=True,
-                remove_leading_space=True,
-            )
+    def __init__(
+        self, source: Union[Type[Any], "Cap", "CapSchema"]
+    ) -> None:
+        self.source = source
+        self.cap = source if isinstance(source, Cap) else None
+
+    @property
+    def about(self) -> Optional[str]:
+        """first line of the about text, read without inspecting argstype"""
+        if self.cap is not None:
+            about = self.cap._about
+        elif isinstance(self.source, type):
+            about = self.source.__doc__
+        else:
+            about = self.source.about
+        if about is None:
+            return None
+        about = about.strip()
+        return about.splitlines()[0] if about else None
 
-            if len(about) == 0:
-                about = [""]
-            for i, abt in enumerate(about):
-                if i == 0:
-                    lns.append((1, ln.ljust(max_opt_len + 4) + abt))
-                else:
-                    lns.append((1, "".ljust(prefix_width) + abt))
 
-        for indent, ln in lns:
-            print("".ljust(indent * INDENT_SIZE) + ln)
+def _helper_help_cb(c: "Cap", v: List[List[bool]]) -> NoReturn:
+    if v[0][0]:
+        from .help import print_help
+
+        print_help(c)
     exit(0)
 
 
+def version_text(c: "Cap") -> str:
+    ver = none_or(c._version, "unknown version")
+    if c._name is not None:
+        return f"{c._name} {ver}\n"
+    return ver + "\n"
+
+
 def _helper_version_cb(c: "Cap", v: List[List[bool]]) -> NoReturn:
     if v[0][0]:
-        ver = none_or(c._version, "unknown version")
-        if c._name is not None:
-            print(f"{c._name} {ver}")
-        else:
-            print(ver)
+        sys.stdout.write(version_text(c))
     exit(0)
 
 
@@ -321,6 +486,8 @@ helpers: _Helpers = {
 
 
 def colorize_text_t_type(t: Type) -> str:
+    from .utils.color import BasicColors, fg
+
     tn = ""
     try:
         tn: str = t.__name__
@@ -330,10 +497,14 @@ def colorize_text_t_type(t: Type) -> str:
 
 
 def colorize_text_t_option_name(key: str) -> str:
+    from .utils.color import BasicColors, fg
+
     return str(fg(key, BasicColors.Yellow))
 
 
 def colorize_text_t_value(val: Any) -> str:
+    from .utils.color import BasicColors, fg
+
     try:
         return str(fg(val, BasicColors.Red))
     except Exception as err:
@@ -346,13 +517,23 @@ class Cap(Generic[K, T, U]):
     _attributes: Dict[str, Any]
     _argstype: Type[T]
     _args: Dict[str, ArgOption]
+    _index: OptionIndex
     _about: Optional[str]
     _delimiter: Option[Optional[str]]
     _name: Optional[str]
     _val_validator: ValidVal
+    _converters: Dict[str, Tuple[Tuple[Any, ...], Converter]]
+    """compiled converter of every parsed option and the state it's built on"""
+    _choices: Dict[str, Tuple[Tuple[Any, bool], PrefixTrie[None]]]
+    """value candidates of every completed option and the state of them"""
     _version: Optional[str]
     _raw_err: bool
     _preset_helper_used: bool
+    _subcommands: Dict[str, _Subcommand]
+    _prepared: bool
+    """whether `_before_parse` has run"""
+    _cpu_pool: Optional[Executor]
+    _env_prefix: Optional[str]
     # cap options
     stop_at_type: Optional[type]
     _add_helper_help: bool
@@ -374,19 +555,28 @@ class Cap(Generic[K, T, U]):
         self._attributes = {}
         self._argstype = argstype
         self._args = {}
+        self._index = OptionIndex()
         self._about = None
         self._delimiter = Option[Optional[str]].Some(",")
         self._name = None
         self._version = None
         self._raw_err = False
         self._preset_helper_used = False
+        self._subcommands = {}
+        self._prepared = False
+        self._cpu_pool = None
+        self._env_prefix = None
         #
         self.stop_at_type = stop_at_type
         #
-        self._parse_argstype()
-        self._parse_anno_details()
+        with span("init.argstype"):
+            self._parse_argstype()
+        with span("init.anno_details"):
+            self._parse_anno_details()
 
         if use_cls_doc_as_about:
+            import inspect
+
             self._about = inspect.getdoc(self._argstype)
 
         if use_anno_doc_as_about:
@@ -394,38 +584,87 @@ class Cap(Generic[K, T, U]):
                 self._args[name].about = none_or(opt.about, opt.doc)
 
         if use_anno_cmt_params:
-            named_params = parse_anno_cmt_params(self._args)
-            for name, params in named_params.items():
-                #
-                alias = params.get("alias", None)
-                if alias is not None:
-                    self._set_alias(name, alias)
-                #
-                show_default = params.get("show_default", None)
-                if show_default is not None:
-                    self._args[name].show_default = show_default
-                #
-                delimiter = params.get("delimiter", None)
-                if delimiter is not None:
-                    self._args[name].local_delimiter = delimiter
-                #
-                self._attributes["enum_on_value"] = params.get(
-                    "enum_on_value", False
-                )
+            with span("init.cmt_params"):
+                self._apply_cmt_params()
 
         self._add_helper_help = add_helper_help
 
-        self._val_validator = ValidVal(deepcopy(PREDEFINED_UNITS))
-        if extra_validator_units is not None:
-            self._val_validator._registry.update(extra_validator_units)
+        with span("init.validator"):
+            self._val_validator = ValidVal(
+                UnitRegistry.layered(PREDEFINED_BASE)
+            )
+            self._converters = {}
+            self._choices = {}
+            if extra_validator_units is not None:
+                self._val_validator._registry.update(extra_validator_units)
+
+    def compile(self) -> CapSchema[T]:
+        """
+        snapshot the fully-resolved state of this `Cap` into an immutable
+        `CapSchema`, which can be reused by `Cap.from_schema`
+        """
+        from types import MappingProxyType
+
+        from .schema import CapSchema
+
+        return CapSchema.create(
+            self._argstype,
+            self._args,
+            self._val_validator.registry,
+            self._attributes,
+            about=self._about,
+            name=self._name,
+            version=self._version,
+            delimiter=self._delimiter,
+            stop_at_type=self.stop_at_type,
+            add_helper_help=self._add_helper_help,
+            preset_helper_used=self._preset_helper_used,
+            raw_err=self._raw_err,
+            env_prefix=self._env_prefix,
+            subcommands=MappingProxyType(
+                {k: sub.source for k, sub in self._subcommands.items()}
+            ),
+        )
+
+    @classmethod
+    def from_schema(cls, schema: CapSchema[T]) -> Cap:
+        """
+        create a `Cap` from a compiled schema without inspecting the argstype
+        """
+        cap = cls.__new__(cls)
+        cap._attributes = dict(schema.attributes)
+        cap._argstype = schema.argstype
+        cap._args = schema.copy_options()
+        cap._index = OptionIndex()
+        for key, opt in cap._args.items():
+            cap._index.add(key, "flag" if is_flag_type(opt.type) else "option")
+            cap._index.set_alias(key, opt.alias)
+        cap._about = schema.about
+        cap._delimiter = schema.delimiter
+        cap._name = schema.name
+        cap._version = schema.version
+        cap._raw_err = schema.raw_err
+        cap._preset_helper_used = schema.preset_helper_used
+        cap._subcommands = {
+            k: _Subcommand(source) for k, source in schema.subcommands.items()
+        }
+        cap._prepared = False
+        cap._cpu_pool = None
+        cap._env_prefix = schema.env_prefix
+        cap.stop_at_type = schema.stop_at_type
+        cap._add_helper_help = schema.add_helper_help
+        cap._val_validator = ValidVal(
+            UnitRegistry(dict(schema.units), *schema.base_units)
+        )
+        cap._converters = {}
+        cap._choices = {}
+        return cap
 
     def _get_key(self, name: str) -> Union[NoReturn, str]:
-        for key, opt in self._args.items():
-            if key == name:
-                return key
-            if opt.alias == name:
-                return key
-        raise CapArgKeyNotFound(name)
+        key = self._index.get_key(name)
+        if key is None:
+            raise CapArgKeyNotFound(name)
+        return key
 
     def _set_alias(
         self, key: str, alias: Optional[AliasCandidates]
@@ -443,9 +682,186 @@ class Cap(Generic[K, T, U]):
                 except CapArgKeyNotFound:
                     # self._args[key] = {**opt, **{"alias": alias}}  # type: ignore
                     opt.alias = alias
+                    self._index.set_alias(key, alias)
             else:
                 # self._args[key] = {**opt, **{"alias": None}}  # type: ignore
                 opt.alias = None
+                self._index.set_alias(key, None)
+
+    def _get_converter(self, key: str, opt: ArgOption) -> Converter:
+        delimiter = opt.local_delimiter
+        if delimiter.is_none():
+            delimiter = self._delimiter
+        registry = self._val_validator.registry
+        state = (opt.type, delimiter, registry, registry.version)
+        compiled = self._converters.get(key)
+        if compiled is not None and all(
+            a is b for a, b in zip(compiled[0], state)
+        ):
+            return compiled[1]
+        vv = self._val_validator.bind(self._delimiter, self._attributes)
+        cvt = compile_converter(vv, opt.type, delimiter)
+        self._converters[key] = (state, cvt)
+        return cvt
+
+    def _convert_values(
+        self,
+        key: str,
+        opt: ArgOption,
+        convert: Converter,
+        vals: List[Union[str, bool]],
+        source: Optional[str] = None,
+    ) -> List[List[Any]]:
+        tracer = get_tracer()
+        if tracer is None:
+            return self._convert_each(key, opt, convert, vals, source)
+        with Span(tracer, "parse.convert", key):
+            return self._convert_each(key, opt, convert, vals, source)
+
+    def _convert_each(
+        self,
+        key: str,
+        opt: ArgOption,
+        convert: Converter,
+        vals: List[Union[str, bool]],
+        source: Optional[str],
+    ) -> List[List[Any]]:
+        pool = self._cpu_pool
+        if pool is not None and getattr(convert, "cpu_bound", False):
+            with remote_conversions(pool, convert, vals):
+                return self._convert_local(key, opt, convert, vals, source)
+        return self._convert_local(key, opt, convert, vals, source)
+
+    def _convert_local(
+        self,
+        key: str,
+        opt: ArgOption,
+        convert: Converter,
+        vals: List[Union[str, bool]],
+        source: Optional[str],
+    ) -> List[List[Any]]:
+        # `source` names where layered values come from, e.g. the env var
+        t = opt.type
+        out: List[List[Any]] = []
+        for v in vals:
+            try:
+                res = convert(v)
+                if not res.is_valid() and source is not None:
+                    self._panic(
+                        f"invalid value {colorize_text_t_value(v)} from {source} for option {colorize_text_t_option_name(key)}:{colorize_text_t_type(t)}",
+                        "Cap.parse",
+                        CapInvalidValue(key, t, v, source),
+                    )
+                elif not res.is_valid():
+                    # TODO: err handling
+                    raise res._error.unwrap()
+                valid, v_got, err = res.unwrap()
+            except ValidatorNotFound as err:
+                self._panic(
+                    f"validator for type {colorize_text_t_type(err.type)} not found",
+                    "Cap.parse",
+                    CapInvalidType(err.type),
+                )
+
+            if valid:
+                out.append([v_got])
+            else:
+                self._panic(
+                    f"invalid value {colorize_text_t_value(v)} for option {colorize_text_t_option_name(key)}:{colorize_text_t_type(t)}",
+                    "Cap.default_strict",
+                    CapInvalidValue(key, t, v),
+                )
+        return out
+
+    def _complete_key(
+        self, word: str, args_parser_options: ArgsParserOptions
+    ) -> Optional[str]:
+        # resolved like `args_parser` does with the same options
+        if word.startswith("--"):
+            name = word[2:]
+            if not args_parser_options.get("disable_hyphen_conversion"):
+                name = name.replace("-", "_")
+            key = self._index.get_key(name)
+            if key is None and args_parser_options.get("allow_abbrev"):
+                key = self._index.match_prefix(name)
+            return key
+        elif len(word) == 2:
+            return self._index.get_key(word[1])
+        return None
+
+    def _complete_value(self, key: str, prefix: str) -> List[str]:
+        opt = self._args[key]
+        state = (opt.type, self._attributes.get("enum_on_value", False))
+        cached = self._choices.get(key)
+        if cached is None or cached[0] != state:
+            trie: PrefixTrie[None] = PrefixTrie()
+            for can in get_value_choices(*state):
+                trie.insert(can, None)
+            cached = self._choices[key] = (state, trie)
+        return cached[1].keys(prefix)
+
+    def _complete_name(self, word: str) -> List[str]:
+        if word.startswith("--"):
+            prefix = word[2:].replace("-", "_")
+            return [
+                f"--{name}"
+                for name, key in self._index.names(prefix)
+                if name == key
+            ]
+        elif word == "-":
+            names = self._index.names()
+            return [f"-{name}" for name, key in names if name != key] + [
+                f"--{name}" for name, key in names if name == key
+            ]
+        key = self._index.get_key(word[1:])
+        return [word] if key is not None else []
+
+    def complete(
+        self,
+        argv_prefix: List[str],
+        args_parser_options: Optional[ArgsParserOptions] = None,
+    ) -> List[str]:
+        """
+        completion candidates for the last word of `argv_prefix`: option
+        names, values of `Literal` and `Enum` options or subcommands
+
+        Earlier words are read with the `args_parser_options` that
+        `Cap.parse` is called with, e.g. abbreviations only count with
+        `allow_abbrev`.
+        """
+        self._before_parse()
+        opts: ArgsParserOptions = args_parser_options or {}
+        cur = argv_prefix[-1] if argv_prefix else ""
+        expect: Optional[str] = None
+        """option waiting for its value"""
+        for i, word in enumerate(argv_prefix[:-1]):
+            if expect is not None:
+                expect = None
+            elif word.startswith("-") and len(word) > 1:
+                if "=" in word:
+                    continue
+                key = self._complete_key(word, opts)
+                if key is not None and not is_flag_type(self._args[key].type):
+                    expect = key
+            elif word in self._subcommands:
+                sub = self._get_subcommand(word)
+                return sub.complete(
+                    argv_prefix[i + 1 :],
+                    self._sub_parser_options(args_parser_options),
+                )
+        if expect is not None:
+            return self._complete_value(expect, cur)
+        if cur.startswith("-"):
+            if "=" in cur:
+                name, _, val = cur.partition("=")
+                key = self._complete_key(name, opts)
+                if key is None:
+                    return []
+                return [
+                    f"{name}={can}" for can in self._complete_value(key, val)
+                ]
+            return self._complete_name(cur)
+        return [name for name in self._subcommands if name.startswith(cur)]
 
     def _panic(self, msg: str, alt_title: str, err: CAP_ERR) -> NoReturn:
         if self._raw_err:
@@ -455,7 +871,33 @@ class Cap(Generic[K, T, U]):
             err_msg = f"{title}: {msg}\n\t{err.__class__.__name__}"
             panic(err_msg)
 
+    def _apply_cmt_params(self):
+        named_params = parse_anno_cmt_params(self._args)
+        for name, params in named_params.items():
+            #
+            alias = params.get("alias", None)
+            if alias is not None:
+                self._set_alias(name, alias)
+            #
+            show_default = params.get("show_default", None)
+            if show_default is not None:
+                self._args[name].show_default = show_default
+            #
+            delimiter = params.get("delimiter", None)
+            if delimiter is not None:
+                self._args[name].local_delimiter = delimiter
+            #
+            self._attributes["enum_on_value"] = params.get(
+                "enum_on_value", False
+            )
+
     def _parse_anno_details(self):
+        from .utils.code import (
+            get_all_comments_parameters,
+            get_annotations,
+            get_docs_from_annotations,
+        )
+
         annos = get_annotations(self._argstype, stop_at=self.stop_at_type)
         named_doc = get_docs_from_annotations(annos)
         named_cmt_params = get_all_comments_parameters(annos)
@@ -528,6 +970,7 @@ class Cap(Generic[K, T, U]):
             cls_attr_val=cls_attr_val,
             local_delimiter=Option.NONE(),
         )
+        self._index.add(key, "flag" if is_flag_type(arg_type) else "option")
         if alias is not None:
             try:
                 self._set_alias(key, alias)
@@ -545,6 +988,46 @@ class Cap(Generic[K, T, U]):
         self._delimiter = Option[Optional[str]].Some(delimiter)
         return self
 
+    def set_config(
+        self,
+        source: Union[str, os.PathLike, Mapping[str, Any]],
+        section: Optional[str] = None,
+        fmt: Optional[ConfigFormat] = None,
+    ) -> Cap:
+        """
+        take option values from a JSON or TOML file, or a mapping; `section`
+        is the dotted path of the table holding them, e.g. `tool.app`
+
+        Values apply to options missing from argv and the environment, and
+        are converted by `Cap.parse`, or when their field is read with
+        `lazy=True`. Unknown keys are ignored.
+        """
+        if isinstance(source, Mapping):
+            name, data = "<config>", source
+        else:
+            name, data = os.fspath(source), load_config(source, fmt)
+        for k, v in config_section(data, section, name).items():
+            opt = self._args.get(k.replace("-", "_"))
+            if opt is not None and not opt.hide:
+                opt.file_val = Option.Some(v)
+        return self
+
+    def set_env_prefix(self, prefix: Optional[str]) -> Cap:
+        """
+        take values of options missing from argv from the environment,
+        e.g. `APP_DRY_RUN` for option `dry_run` with prefix `APP_`
+        """
+        self._env_prefix = prefix
+        return self
+
+    def set_cpu_pool(self, pool: Optional[Executor]) -> Cap:
+        """
+        run the units registered with `cpu_bound=True` on `pool`, e.g. a
+        `ProcessPoolExecutor`; the values of one option are sent at once
+        """
+        self._cpu_pool = pool
+        return self
+
     def set_callback(
         self, key: str, callback: ArgCallback, priority: int = 1
     ) -> Cap:
@@ -557,6 +1040,70 @@ class Cap(Generic[K, T, U]):
             )
         return self
 
+    def subcommands(
+        self, commands: Dict[str, Union[Type[Any], Cap, CapSchema]]
+    ) -> Cap:
+        """
+        register subcommands by name; each is given as an argstype, a `Cap`
+        or a `CapSchema`
+
+        Parsing stops at the first positional argument naming a
+        subcommand and the rest of argv is parsed by that subcommand only.
+        The argstype of a subcommand is only inspected once it is invoked.
+        """
+        for name, source in commands.items():
+            self._subcommands[name] = _Subcommand(source)
+        return self
+
+    def _get_subcommand(self, name: str) -> Cap:
+        sub = self._subcommands[name]
+        if sub.cap is not None:
+            return sub.cap
+        with _PREPARE_LOCK:
+            if sub.cap is None:
+                with span("init.subcommand", name):
+                    if isinstance(sub.source, type):
+                        cap = Cap(sub.source)
+                    else:
+                        cap = Cap.from_schema(sub.source)
+                if cap._name is None and self._name is not None:
+                    cap._name = f"{self._name} {name}"
+                cap._raw_err = cap._raw_err or self._raw_err
+                sub.cap = cap
+        return sub.cap
+
+    def parse_many(
+        self,
+        argvs: Iterable[List[str]],
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        pool: Literal["thread", "process"] = "thread",
+        chunksize: int = 64,
+        args_parser_options: Optional[ArgsParserOptions] = None,
+    ) -> Iterator[ParseResult[T]]:
+        """
+        parse every argv of `argvs`, yielding a `ParseResult` per input
+        which holds either the `Parsed` result or the error; never exits
+
+        All inputs are parsed by `Cap`s created from one compiled schema.
+        With `workers` > 1 chunks of `chunksize` inputs are parsed on a
+        thread or process pool; for a process pool the argstype, callbacks
+        and validator units must be picklable. Results are yielded in
+        input order unless `ordered=False`. The text of `--help` and
+        `--version` is returned in `ParseResult.output`, not printed.
+        """
+        from .batch import parse_many
+
+        return parse_many(
+            self,
+            argvs,
+            workers=workers,
+            ordered=ordered,
+            pool=pool,
+            chunksize=chunksize,
+            args_parser_options=args_parser_options,
+        )
+
     def raw_exception(self, tog: bool) -> Cap:
         self._raw_err = tog
         return self
@@ -652,44 +1199,216 @@ class Cap(Generic[K, T, U]):
         return self
 
     def _before_parse(self):
-        if self._add_helper_help:
-            if self._args.get("help") is None:
-                self.helpers()["arg_help"](self, "help")
+        # runs once; parses from other threads wait for it to finish
+        if self._prepared:
+            return
+        with _PREPARE_LOCK:
+            if self._prepared:
+                return
+            if self._add_helper_help:
+                if self._args.get("help") is None:
+                    self.helpers()["arg_help"](self, "help")
+            self._prepared = True
 
     def parse(
         self,
         argv: List[str] = sys.argv[1:],
         args_parser_options: Optional[ArgsParserOptions] = None,
         validator: Optional[ValidVal] = None,
+        lazy: bool = False,
+        stream: Union[bool, Iterable[str]] = False,
+        env: Optional[Mapping[str, str]] = None,
     ) -> Parsed[T]:
-        self._before_parse()
+        """
+        parse `argv` into typed arguments
 
-        if validator is None:
-            validator = self._val_validator
+        With `lazy=True` the syntax of `argv` and required options are
+        still checked here, but values are only converted when their field
+        is first read from `Parsed.args`; the result is memoized.
 
-        validator.delimiter = self._delimiter
-        validator.attributes = self._attributes
+        With `stream=True` (or an iterable of extra positional arguments)
+        `Parsed.argv` is a lazy iterator over the positional arguments in
+        which `-` is replaced by the lines read from stdin, followed by
+        the items of the iterable.
 
-        def _is_flag(t: Type) -> bool:
-            if t == bool:
-                return True
-            try:
-                can = get_type_candidates(t)
-                return bool in can
-            except Exception:
-                return False
+        `env` replaces `os.environ` as the source of `set_env_prefix`.
+        """
+        self._before_parse()
+        validator, use_plans = self._bind_validator(validator)
+        args_parser_options = self._parser_options(args_parser_options)
+        out = self._tokenize(argv, args_parser_options)
+        return self._resolve(
+            out,
+            args_parser_options,
+            validator,
+            use_plans,
+            lazy,
+            stream,
+            env=env,
+        )
 
-        named_args: List[Tuple[ArgTypes, ArgNamed]] = []
+    async def parse_async(
+        self,
+        argv: List[str] = sys.argv[1:],
+        args_parser_options: Optional[ArgsParserOptions] = None,
+        validator: Optional[ValidVal] = None,
+        stream: Union[bool, Iterable[str]] = False,
+        concurrency: int = 64,
+        timeout: Optional[float] = None,
+        env: Optional[Mapping[str, str]] = None,
+    ) -> Parsed[T]:
+        """
+        `Cap.parse` for units with a coroutine `valid_fn`, whose
+        conversions are awaited concurrently instead of one by one
+
+        At most `concurrency` conversions run at once; a conversion taking
+        longer than `timeout` seconds makes its value invalid. The awaitables
+        are collected by a dry run of the options whose type has an async
+        unit, in which cpu-bound units are skipped. `env` is the one of
+        `Cap.parse`.
+        """
+        self._before_parse()
+        validator, use_plans = self._bind_validator(validator)
+        args_parser_options = self._parser_options(args_parser_options)
+        out = self._tokenize(argv, args_parser_options)
+
+        from .typing.aio import AsyncBatch, use_batch
+
+        vals_of: List[Tuple[str, List[Any]]] = [
+            (self._get_key(name), vals) for name, vals in out.options.items()
+        ]
+        # values of the env and config layers of the missing options
+        given = {key for key, _ in vals_of}
         for key, opt in self._args.items():
-            named_args.append(
-                (
-                    "flag" if _is_flag(opt.type) else "option",
-                    (key, opt.alias),
+            if key not in given and not opt.hide:
+                layered = self._layered_val(key, opt, env)
+                if layered is not None:
+                    vals_of.append((key, layered[0]))
+
+        vv = self._val_validator if use_plans else validator
+        batch = AsyncBatch()
+        with use_batch(batch), skip_cpu_bound():
+            # dry run that only collects the awaitables, of the options
+            # whose type has an async unit; errors are raised by the
+            # conversions below
+            for key, vals in vals_of:
+                opt = self._args[key]
+                if not may_await(vv, opt.type):  # type: ignore[arg-type]
+                    continue
+                convert = self._option_converter(
+                    key, opt, validator, use_plans
                 )
+                for v in vals:
+                    try:
+                        convert(v)
+                    except Exception:
+                        ...
+        with span("parse.await"):
+            await batch.run(concurrency, timeout)
+
+        sub_parsed: Optional[Parsed[Any]] = None
+        if out.command is not None:
+            sub_parsed = await self._get_subcommand(
+                out.command
+            ).parse_async(
+                none_or(out.rest, []),
+                self._sub_parser_options(args_parser_options),
+                stream=stream,
+                concurrency=concurrency,
+                timeout=timeout,
+                env=env,
+            )
+        with use_batch(batch):
+            return self._resolve(
+                out,
+                args_parser_options,
+                validator,
+                use_plans,
+                False,
+                stream,
+                sub_parsed,
+                env,
             )
 
+    def _layered_val(
+        self, key: str, opt: ArgOption, env: Optional[Mapping[str, str]]
+    ) -> Optional[Tuple[List[Any], str]]:
+        # raw value of an option missing from argv, by precedence, and
+        # where it comes from
+        if self._env_prefix is not None:
+            if env is None:
+                env = os.environ
+            name = env_name(self._env_prefix, key)
+            raw = env.get(name)
+            if raw is not None:
+                if is_flag_type(opt.type):
+                    raw = env_flag(raw)
+                return [raw], f"environment variable {name}"
+        if opt.file_val.is_none():
+            return None
+        val = opt.file_val.unwrap()
+        if isinstance(val, list) and (
+            get_queue_type(opt.type, allow_optional=True)
+            is ParsedQueueType.TUPLE
+        ):
+            val = tuple(val)
+        return [val], "config"
+
+    def _bind_validator(
+        self, validator: Optional[ValidVal]
+    ) -> Tuple[Optional[ValidVal], bool]:
+        # the validator is never modified, a custom one is bound to the
+        # settings of this `Cap` for this call only
+        use_plans = validator is None or validator is self._val_validator
+        if not use_plans:
+            validator = validator.bind(  # type: ignore[union-attr]
+                self._delimiter, self._attributes
+            )
+        return validator, use_plans
+
+    def _parser_options(
+        self, args_parser_options: Optional[ArgsParserOptions]
+    ) -> Optional[ArgsParserOptions]:
+        if self._subcommands:
+            return {
+                **(args_parser_options or {}),
+                "subcommands": self._subcommands,
+            }
+        return args_parser_options
+
+    @staticmethod
+    def _sub_parser_options(
+        args_parser_options: Optional[ArgsParserOptions],
+    ) -> Optional[ArgsParserOptions]:
+        if args_parser_options is None:
+            return None
+        return {
+            k: v  # type: ignore[misc]
+            for k, v in args_parser_options.items()
+            if k != "subcommands"
+        }
+
+    def _option_converter(
+        self,
+        key: str,
+        opt: ArgOption,
+        validator: Optional[ValidVal],
+        use_plans: bool,
+    ) -> Converter:
+        if use_plans:
+            return self._get_converter(key, opt)
+        return generic_converter(
+            validator, opt.type, opt.local_delimiter  # type: ignore[arg-type]
+        )
+
+    def _tokenize(
+        self,
+        argv: Iterable[str],
+        args_parser_options: Optional[ArgsParserOptions],
+    ) -> ArgsParserResults:
         try:
-            out = args_parser(argv, named_args, args_parser_options)
+            with span("parse.tokenize"):
+                return args_parser(argv, self._index, args_parser_options)
         except ArgsParserKeyError as err:
             self._panic(
                 f"unknown {err.key_type} {colorize_text_t_option_name(err.key)}",
@@ -712,116 +1431,170 @@ class Cap(Generic[K, T, U]):
                 "Cap.parse",
                 err,
             )
+        except ArgsParserArgsfileError as err:
+            self._panic(
+                f"cannot read argsfile {colorize_text_t_value(err.path)}: {err.reason}",
+                "Cap.parse",
+                err,
+            )
 
+    def _resolve(
+        self,
+        out: ArgsParserResults,
+        args_parser_options: Optional[ArgsParserOptions],
+        validator: Optional[ValidVal],
+        use_plans: bool,
+        lazy: bool,
+        stream: Union[bool, Iterable[str]],
+        sub_parsed: Optional[Parsed[Any]] = None,
+        env: Optional[Mapping[str, str]] = None,
+    ) -> Parsed[T]:
         parsed_map: Dict[str, _ParsedVal] = {}
         # extract process
-        for name, val in out.options.items():
-            key = self._get_key(name)
-            parsed: _ParsedVal = parsed_map.get(
-                key,
-                {
-                    "val": [],
-                    "default_val": Option.NONE(),
-                    "queue_type": ParsedQueueType.NONE,
-                },
-            )
-            opt = self._args[key]  # TODO:
-            parsed["queue_type"] = get_queue_type(
-                opt.type, allow_optional=True
-            )
-            for v in val:
-                t = opt.type
-                temp_delimiter = opt.local_delimiter
-
-                try:
-                    res = validator.extract(
-                        t,
-                        v,
-                        cvt=True,
-                        temp_delimiter=temp_delimiter,
-                        leave_scope=True,
-                    )
-                    if not res.is_valid():
-                        # TODO: err handling
-                        raise res._error.unwrap()
-                    valid, v_got, err = res.unwrap()
-                except ValidatorNotFound as err:
-                    self._panic(
-                        f"validator for type {colorize_text_t_type(err.type)} not found",
-                        "Cap.parse",
-                        CapInvalidType(err.type),
+        with span("parse.resolve"):
+            for name, val in out.options.items():
+                key = self._get_key(name)
+                parsed: _ParsedVal = parsed_map.get(
+                    key,
+                    {
+                        "val": [],
+                        "default_val": Option.NONE(),
+                        "queue_type": ParsedQueueType.NONE,
+                        "pending": None,
+                    },
+                )
+                opt = self._args[key]  # TODO:
+                parsed["queue_type"] = get_queue_type(
+                    opt.type, allow_optional=True
+                )
+                convert = self._option_converter(
+                    key, opt, validator, use_plans
+                )
+                if lazy and opt.cb is None:
+                    parsed["pending"] = _PendingVal(
+                        val,
+                        partial(self._convert_values, key, opt, convert),
                     )
-
-                if valid:
-                    parsed["val"].append([v_got])
                 else:
-                    self._panic(
-                        f"invalid value {colorize_text_t_value(v)} for option {colorize_text_t_option_name(key)}:{colorize_text_t_type(t)}",
-                        "Cap.default_strict",
-                        CapInvalidValue(key, t, v),
+                    parsed["val"].extend(
+                        self._convert_values(key, opt, convert, val)
                     )
-            parsed_map[key] = parsed
+                parsed_map[key] = parsed
 
         # callbacks
-        cb_list: List[Tuple[str, int]] = []
-        for key, opt in self._args.items():
-            if opt.cb is not None:
-                cb_list.append((key, opt.cb_idx))
-        cb_list = sorted(cb_list, key=lambda x: x[1])
-        cb_list.reverse()
-        for key, _ in cb_list:
-            _p = parsed_map.get(key)
-            if _p is None:
-                continue
-            else:
-                parsed = _p
-                if len(parsed["val"]) >= 0:
-                    try:
-                        arg = self._args[key]
-                        cb = arg.cb
-                        if cb is not None:
-                            parsed_map[key]["val"] = cb(self, parsed["val"])
-                    except KeyError:
-                        continue
+        with span("parse.callbacks"):
+            cb_list: List[Tuple[str, int]] = []
+            for key, opt in self._args.items():
+                if opt.cb is not None:
+                    cb_list.append((key, opt.cb_idx))
+            cb_list = sorted(cb_list, key=lambda x: x[1])
+            cb_list.reverse()
+            for key, _ in cb_list:
+                _p = parsed_map.get(key)
+                if _p is None:
+                    continue
+                else:
+                    parsed = _p
+                    if len(parsed["val"]) >= 0:
+                        try:
+                            arg = self._args[key]
+                            cb = arg.cb
+                            if cb is not None:
+                                parsed_map[key]["val"] = cb(
+                                    self, parsed["val"]
+                                )
+                        except KeyError:
+                            continue
 
         # assign default value to empty field
-        args_obj: Optional[T] = None
-        t_based = get_based(self._argstype)
-        if t_based is BasedType.OBJECT:
-            args_obj = self._argstype.__new__(self._argstype)
-            # args_obj = self._argstype()
-        for key, opt in self._args.items():
-            if opt.hide:
-                if parsed_map.get(key) is not None:
-                    parsed_map.pop(key)
-            else:
-                if parsed_map.get(key) is None:
-                    parsed_map[key] = {
-                        "val": [],
-                        "default_val": opt.val,  # TODO: checking typeof default value
-                        "queue_type": get_queue_type(
-                            opt.type, allow_optional=True
-                        ),
-                    }
-                    if (
-                        parsed_map[key]["default_val"].is_none()
-                        and t_based is BasedType.OBJECT
-                        and args_obj is not None
-                    ):
-                        try:
-                            parsed_map[key]["default_val"] = Option.Some(
-                                args_obj.__getattribute__(key)
-                            )
-                        except AttributeError:
-                            ...
-                    if parsed_map[key]["default_val"].is_none():
-                        if get_optional_candidates(opt.type) is None:
-                            self._panic(
-                                f"option {colorize_text_t_option_name(key)}:{colorize_text_t_type(opt.type)} is required but it is missing",
-                                "Cap.parse",
-                                ArgsParserMissingArgument(key, opt.type),
+        with span("parse.defaults"):
+            args_obj: Optional[T] = None
+            t_based = get_based(self._argstype)
+            if t_based is BasedType.OBJECT:
+                args_obj = self._argstype.__new__(self._argstype)
+                # args_obj = self._argstype()
+            for key, opt in self._args.items():
+                if opt.hide:
+                    if parsed_map.get(key) is not None:
+                        parsed_map.pop(key)
+                else:
+                    if parsed_map.get(key) is None:
+                        parsed_map[key] = {
+                            "val": [],
+                            "pending": None,
+                            "default_val": opt.val,  # TODO: checking typeof default value
+                            "queue_type": get_queue_type(
+                                opt.type, allow_optional=True
+                            ),
+                        }
+                        if (
+                            parsed_map[key]["default_val"].is_none()
+                            and t_based is BasedType.OBJECT
+                            and args_obj is not None
+                        ):
+                            try:
+                                parsed_map[key][
+                                    "default_val"
+                                ] = Option.Some(args_obj.__getattribute__(key))
+                            except AttributeError:
+                                ...
+                        layered = self._layered_val(key, opt, env)
+                        if layered is not None:
+                            vals, source = layered
+                            convert = self._option_converter(
+                                key, opt, validator, use_plans
                             )
-                        else:
-                            parsed_map[key]["default_val"] = Option.Some(None)
+                            if lazy:
+                                parsed_map[key]["pending"] = _PendingVal(
+                                    vals,
+                                    partial(
+                                        self._convert_values,
+                                        key,
+                                        opt,
+                                        convert,
+                                        source=source,
+                                    ),
+                                )
+                            else:
+                                parsed_map[key]["val"] = self._convert_values(
+                                    key, opt, convert, vals, source
+                                )
+                        if parsed_map[key]["default_val"].is_none():
+                            if (
+                                layered is None
+                                and get_optional_candidates(opt.type) is None
+                            ):
+                                self._panic(
+                                    f"option {colorize_text_t_option_name(key)}:{colorize_text_t_type(opt.type)} is required but it is missing",
+                                    "Cap.parse",
+                                    ArgsParserMissingArgument(key, opt.type),
+                                )
+                            else:
+                                parsed_map[key]["default_val"] = Option.Some(
+                                    None
+                                )
+
+        if out.command is not None and sub_parsed is None:
+            sub_parsed = self._get_subcommand(out.command).parse(
+                none_or(out.rest, []),
+                self._sub_parser_options(args_parser_options),
+                lazy=lazy,
+                stream=stream,
+                env=env,
+            )
 
-        return Parsed(self._argstype, out.argv, parsed_map, args_obj)
+        positional: Union[List[str], Iterator[str]] = out.argv
+        if stream is not False and sub_parsed is None:
+            positional = _stream_positionals(
+                out.argv, None if stream is True else stream
+            )
+
+        return Parsed(
+            self._argstype,
+            positional,
+            parsed_map,
+            args_obj,
+            lazy=lazy,
+            command=out.command,
+            subcommand=sub_parsed,
+        )
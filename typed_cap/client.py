@@ -0,0 +1,153 @@
+"""
+client of the parse daemon of `typed_cap.server`; it only imports the
+standard library, so calling it costs no more than starting Python
+
+    python -m typed_cap.client [--socket PATH] [--cap TARGET] \\
+        parse|validate|help|complete [ARGS...]
+
+Wire format: every message is a 4-byte big-endian length followed by that
+many bytes of compact UTF-8 JSON, at most `MAX_MSG_SIZE` bytes. A request
+is `{"op": ..., "argv": [...], "cap": target, "env": {...}}` (`cap`
+defaults to the first target of the daemon); `env` is the environment of
+the caller, the daemon never reads its own for `Cap.set_env_prefix`. A
+response carries `"ok"` and the fields of the operation, or `"error"` and
+`"detail"`.
+"""
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+from typing import Any, Dict, List, Mapping, Optional
+
+_HEADER = struct.Struct(">I")
+
+MAX_MSG_SIZE = 16 << 20
+
+OPS = ("parse", "validate", "help", "complete")
+
+
+def _private_dir(base: str) -> str:
+    # a directory only the current user can enter, so the socket in it
+    # can't be replaced by another user
+    uid = os.getuid()
+    path = os.path.join(base, f"typed_cap-{uid}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        ...
+    st = os.lstat(path)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != uid
+        or st.st_mode & 0o077
+    ):
+        raise PermissionError(
+            f"{path} is not a directory private to the current user"
+        )
+    return path
+
+
+def default_socket_path() -> str:
+    """
+    socket used when none is given, private to the current user: in
+    `$XDG_RUNTIME_DIR`, or else in a directory of mode 0700 in `$TMPDIR`
+    or `/tmp`
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, f"typed_cap-{os.getuid()}.sock")
+    base = _private_dir(os.environ.get("TMPDIR") or "/tmp")
+    return os.path.join(base, "typed_cap.sock")
+
+
+def send_msg(sock: socket.socket, msg: Dict[str, Any]) -> None:
+    data = json.dumps(msg, separators=(",", ":")).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_msg(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """next message, or None once the peer closed the connection"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_MSG_SIZE:
+        raise ValueError(f"message of {size} bytes exceeds {MAX_MSG_SIZE}")
+    data = _recv_exact(sock, size)
+    if data is None:
+        raise ConnectionError("connection closed inside a message")
+    return json.loads(data.decode("utf-8"))
+
+
+def request(
+    op: str,
+    argv: Optional[List[str]] = None,
+    cap: Optional[str] = None,
+    path: Optional[str] = None,
+    env: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    send one request to the daemon listening on `path`; `env` defaults to
+    the environment of this process
+    """
+    msg: Dict[str, Any] = {
+        "op": op,
+        "argv": [] if argv is None else argv,
+        "env": dict(os.environ if env is None else env),
+    }
+    if cap is not None:
+        msg["cap"] = cap
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(default_socket_path() if path is None else path)
+        send_msg(sock, msg)
+        res = recv_msg(sock)
+    if res is None:
+        raise ConnectionError("daemon closed the connection")
+    return res
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    path: Optional[str] = None
+    cap: Optional[str] = None
+    while args and args[0] in ("--socket", "--cap") and len(args) > 1:
+        if args[0] == "--socket":
+            path = args[1]
+        else:
+            cap = args[1]
+        args = args[2:]
+    if not args or args[0] not in OPS:
+        sys.stderr.write(
+            "usage: python -m typed_cap.client [--socket PATH] "
+            "[--cap TARGET] parse|validate|help|complete [ARGS...]\n"
+        )
+        sys.exit(2)
+    res = request(args[0], args[1:], cap, path)
+    if "text" in res:
+        sys.stdout.write(res["text"])
+    elif "candidates" in res:
+        sys.stdout.write("".join(c + "\n" for c in res["candidates"]))
+    elif "args" in res:
+        del res["ok"]
+        sys.stdout.write(json.dumps(res) + "\n")
+        return
+    if not res["ok"]:
+        if "error" in res:
+            sys.stderr.write(f"{res['error']}: {res.get('detail')}\n")
+        sys.exit(res.get("exit", 2))
+
+
+if __name__ == "__main__":
+    main()
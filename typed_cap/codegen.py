@@ -0,0 +1,571 @@
+"""
+ahead-of-time generation of a standalone parser module for one argstype
+
+    python -m typed_cap.codegen module:Args -o args_parser_gen.py
+
+The generated module only imports `re`, `sys` and, when needed, the
+argstype and the enums it uses. It contains a tokenizer specialized to
+the option table, converters inlined for the declared types, the
+prerendered help text and a `parse` function returning a `Parsed` with
+the interface of `typed_cap.Parsed`.
+"""
+import ast
+import sys
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, get_args, get_origin
+
+from .args_parser import TOKEN_REG
+from .cap import Cap, _helper_help_cb, _helper_version_cb
+from .config import _FLAG_WORDS, env_name
+from .help import render_help
+from .types import ArgOption, CapCodegenError
+from .typing import (
+    BasedType,
+    ParsedQueueType,
+    get_based,
+    get_optional_candidates,
+    get_queue_type,
+    is_flag_type,
+)
+from .typing import default
+from .utils import panic
+from .utils.option import Option
+
+_UNIONS = {default._valid_union}
+if hasattr(default, "_valid_uniontype"):
+    _UNIONS.add(default._valid_uniontype)
+
+_BUILTINS = {
+    default._valid_int: "int",
+    default._valid_float: "float",
+    default._valid_str: "str",
+}
+
+
+def _type_name(t: Any) -> str:
+    return getattr(t, "__name__", None) or str(t)
+
+
+class _Generator:
+    cap: Cap
+    key: str
+    """option whose converter is generated, for error messages"""
+    imports: Dict[Tuple[str, str], str]
+    """(module, qualified name) -> local name"""
+    converters: Dict[Tuple[Any, Optional[str], bool], str]
+    defs: List[str]
+
+    def __init__(self, cap: Cap) -> None:
+        self.cap = cap
+        self.key = ""
+        self.imports = {}
+        self.converters = {}
+        self.defs = []
+        self.vv = cap._val_validator.bind(cap._delimiter, cap._attributes)
+
+    def unsupported(self, reason: str) -> CapCodegenError:
+        return CapCodegenError(self.key, reason)
+
+    def ref(self, obj: Any) -> str:
+        """local name of the class `obj`, imported from its module"""
+        mod, qual = obj.__module__, obj.__qualname__
+        if mod == "__main__" or "<locals>" in qual:
+            raise self.unsupported(f"{qual} can't be imported")
+        name = self.imports.get((mod, qual))
+        if name is None:
+            name = f"_T{len(self.imports)}"
+            self.imports[(mod, qual)] = name
+        return name
+
+    def literal(self, val: Any) -> str:
+        """source of the value `val`"""
+        if isinstance(val, Enum):
+            return f"{self.ref(type(val))}[{val.name!r}]"
+        src = repr(val)
+        try:
+            if ast.literal_eval(src) == val:
+                return src
+        except (ValueError, SyntaxError):
+            ...
+        raise self.unsupported(f"can't write value {src}")
+
+    def converter(self, t: Any, delimiter: Option[Optional[str]]) -> str:
+        """name of the generated converter of `t`, like `compile_converter`"""
+        split = delimiter.is_some()
+        sep = delimiter.unwrap() if split else None
+        ck = (t, sep, split)
+        name = self.converters.get(ck)
+        if name is not None:
+            return name
+        name = f"_c{len(self.converters)}"
+        self.converters[ck] = name
+        unit = self.vv.get_unit(t)
+        fn = None if unit is None else unit.valid_fn
+        body: List[str]
+        if fn is default._valid_none:
+            body = ["return None if v is None else _BAD"]
+        elif fn is default._valid_bool:
+            body = [
+                "if v in (0, 'false', 'False'):",
+                "    return False",
+                "if v in (1, 'true', 'True'):",
+                "    return True",
+                "return _BAD",
+            ]
+        elif fn in _BUILTINS:
+            body = [
+                "try:",
+                f"    return {_BUILTINS[fn]}(v)",
+                "except Exception:",
+                "    return _BAD",
+            ]
+        elif fn in _UNIONS:
+            body = []
+            for opt in get_args(t):
+                body += [
+                    f"r = {self.converter(opt, delimiter)}(v)",
+                    "if r is not _BAD:",
+                    "    return r",
+                ]
+            body.append("return _BAD")
+        elif fn is default._valid_queue:
+            body = self.queue(t, delimiter, sep, split)
+        elif fn is default._valid_literal:
+            types: Dict[type, None] = {}
+            for can in get_args(t):
+                types.pop(type(can), None)
+                types[type(can)] = None
+            cans = [self.converter(can_t, delimiter) for can_t in types]
+            body = ["out = _BAD"]
+            for can in cans:
+                body += [
+                    f"r = {can}(v)",
+                    "if r is not _BAD:",
+                    "    out = r",
+                ]
+            body.append("return out")
+        elif fn is default._valid_enum:
+            body = self.enum(t, delimiter)
+        else:
+            raise self.unsupported(f"no generator for type {t!r}")
+        self.defs.append(
+            f"def {name}(v):  # {_type_name(t)}\n"
+            + "\n".join(f"    {ln}" for ln in body)
+        )
+        return name
+
+    def queue(
+        self,
+        t: Any,
+        delimiter: Option[Optional[str]],
+        sep: Optional[str],
+        split: bool,
+    ) -> List[str]:
+        loc_type = get_origin(t)
+        opts = get_args(t)
+        if loc_type not in (list, tuple) or len(opts) == 0:
+            raise self.unsupported(f"no generator for type {t!r}")
+        if Ellipsis in opts:
+            raise self.unsupported(f"no generator for type {t!r}")
+        elements = [self.converter(opt, delimiter) for opt in opts]
+        loc = loc_type.__name__
+        body = [f"if type(v) is {loc}:", "    arr = v"]
+        if split:
+            body += ["elif isinstance(v, str):", f"    arr = v.split({sep!r})"]
+        body += ["else:", "    return _BAD"]
+        if loc_type is tuple:
+            # like `_valid_queue`, a length mismatch gives an empty tuple
+            body += [f"if len(arr) != {len(elements)}:", "    return ()"]
+            items = []
+            for i, ele in enumerate(elements):
+                body += [
+                    f"r{i} = {ele}(arr[{i}])",
+                    f"if r{i} is _BAD:",
+                    "    return _BAD",
+                ]
+                items.append(f"r{i}")
+            body.append(f"return ({', '.join(items)},)")
+        else:
+            body += [
+                "out = []",
+                "for e in arr:",
+                f"    r = {elements[0]}(e)",
+                "    if r is _BAD:",
+                "        return _BAD",
+                "    out.append(r)",
+                "return out",
+            ]
+        return body
+
+    def enum(self, t: Any, delimiter: Option[Optional[str]]) -> List[str]:
+        cls = self.ref(t)
+        if self.vv.attributes.get("enum_on_value", False):
+            body = ["out = _BAD"]
+            for meb in t:
+                cvt = self.converter(type(meb.value), delimiter)
+                body += [
+                    f"r = {cvt}(v)",
+                    "if r is _BAD:",
+                    "    return out",
+                    f"if r == {cls}[{meb.name!r}].value:",
+                    f"    out = {cls}[{meb.name!r}]",
+                ]
+            body.append("return out")
+            return body
+        names = {meb.name.lower(): meb.name for meb in t}
+        items = ", ".join(f"{k!r}: {cls}[{n!r}]" for k, n in names.items())
+        table = f"_{cls}_names"
+        self.defs.append(f"{table} = {{{items}}}")
+        return [f"return {table}.get(str(v).lower(), _BAD)"]
+
+
+def _callback_kind(key: str, opt: ArgOption) -> Optional[str]:
+    if opt.cb is None:
+        return None
+    elif opt.cb is _helper_help_cb:
+        return "help"
+    elif opt.cb is _helper_version_cb:
+        return "version"
+    raise CapCodegenError(key, "custom callbacks can't be generated")
+
+
+def generate_module(cap: Cap, source: Optional[str] = None) -> str:
+    """source of a standalone parser module equivalent to `cap.parse`"""
+    cap._before_parse()
+    if cap._subcommands:
+        raise CapCodegenError("", "subcommands can't be generated")
+    gen = _Generator(cap)
+    t_based = get_based(cap._argstype)
+    if t_based is BasedType.OBJECT:
+        argstype: Optional[str] = gen.ref(cap._argstype)
+    elif t_based is BasedType.DICT:
+        argstype = None
+    else:
+        raise CapCodegenError("", "unsupported argstype")
+
+    flags: Dict[str, str] = {}
+    options: Dict[str, str] = {}
+    for key, opt in cap._args.items():
+        names = flags if is_flag_type(opt.type) else options
+        names.setdefault(key, key)
+        if opt.alias is not None:
+            names.setdefault(opt.alias, key)
+
+    convert_lns: List[str] = []
+    assign_lns: List[str] = []
+    callbacks: List[Tuple[str, int, str]] = []
+    flag_words = False
+    for key, opt in cap._args.items():
+        gen.key = key
+        if opt.file_val.is_some():
+            raise gen.unsupported("config-file values can't be generated")
+        delimiter = opt.local_delimiter
+        if delimiter.is_none():
+            delimiter = cap._delimiter
+        cvt = gen.converter(opt.type, delimiter)
+        tn = _type_name(opt.type)
+        convert_lns.append(
+            f"    raw = found.get({key!r})\n"
+            f"    if raw is not None:\n"
+            f"        conv[{key!r}] = [_convert({key!r}, {tn!r}, {cvt}, v)"
+            f" for v in raw]\n"
+        )
+        kind = _callback_kind(key, opt)
+        if kind is not None:
+            callbacks.append((key, opt.cb_idx, kind))
+        if opt.hide:
+            continue
+        lns = [
+            f"    # {key}: {tn}",
+            f"    vs = conv.get({key!r}, ())",
+            f"    counts[{key!r}] = len(vs)",
+        ]
+        if get_queue_type(opt.type, True) is ParsedQueueType.LIST:
+            lns += [
+                "    if vs:",
+                f"        set_val({key!r}, [x for c in vs for x in c])",
+            ]
+        else:
+            lns += ["    if vs:", f"        set_val({key!r}, vs[-1])"]
+        if cap._env_prefix is not None:
+            env = env_name(cap._env_prefix, key)
+            raw = f"os.environ[{env!r}]"
+            if is_flag_type(opt.type):
+                if not flag_words:
+                    flag_words = True
+                    gen.defs.append(f"_FLAG_WORDS = {_FLAG_WORDS!r}")
+                raw = f"_FLAG_WORDS.get({raw}.strip().lower(), {raw})"
+            lns += [
+                f"    elif {env!r} in os.environ:",
+                f"        v = _convert({key!r}, {tn!r}, {cvt}, {raw})",
+                f"        set_val({key!r}, v)",
+            ]
+        if opt.val.is_some():
+            lns += [
+                "    else:",
+                f"        set_val({key!r}, {gen.literal(opt.val.unwrap())})",
+            ]
+        else:
+            lns.append("    else:")
+            indent = "        "
+            if argstype is not None:
+                lns += [
+                    f"        v = getattr(obj, {key!r}, _BAD)",
+                    "        if v is not _BAD:",
+                    f"            set_val({key!r}, v)",
+                    "        else:",
+                ]
+                indent = "            "
+            if get_optional_candidates(opt.type) is None:
+                lns.append(
+                    f"{indent}raise ParseError('missing', {key!r}, "
+                    f"'option {key}:{tn} is required but it is missing')"
+                )
+            else:
+                lns.append(f"{indent}set_val({key!r}, None)")
+        assign_lns.append("\n".join(lns) + "\n")
+
+    # same order as `Cap.parse`: sorted by priority, then reversed
+    callbacks = sorted(callbacks, key=lambda x: x[1])
+    callbacks.reverse()
+    cb_lns: List[str] = []
+    for key, _, kind in callbacks:
+        if kind == "help":
+            action = "sys.stdout.write(HELP)"
+        else:
+            ver = cap._version or "unknown version"
+            text = f"{cap._name} {ver}" if cap._name is not None else ver
+            action = f"print({text!r})"
+        cb_lns.append(
+            f"    if {key!r} in conv:\n"
+            f"        if conv[{key!r}][0]:\n"
+            f"            {action}\n"
+            f"        sys.exit(0)\n"
+        )
+
+    help_text = "".join(ln + "\n" for ln in render_help(cap))
+    imports = "".join(
+        f"from {mod} import {qual.split('.')[0]} as {name}\n"
+        if "." not in qual
+        else f"import {mod} as {name}_mod\n{name} = {name}_mod.{qual}\n"
+        for (mod, qual), name in gen.imports.items()
+    )
+    if argstype is not None:
+        new_args = f"    obj = {argstype}.__new__({argstype})\n"
+        set_val = "    set_val = obj.__setattr__\n"
+        result = "obj"
+    else:
+        new_args = "    args = {}\n"
+        set_val = "    set_val = args.__setitem__\n"
+        result = "args"
+    title = cap._name if cap._name is not None else "Cap.parse"
+
+    return _TEMPLATE.format(
+        source=f" for `{source}`" if source else "",
+        env_import="import os\n" if cap._env_prefix is not None else "",
+        imports=imports + "\n" if imports else "",
+        title=repr(title),
+        help=repr(help_text),
+        token=repr(TOKEN_REG.pattern),
+        flags=repr(flags),
+        options=repr(options),
+        converters="\n\n\n".join(gen.defs),
+        convert="".join(convert_lns),
+        callbacks="".join(cb_lns),
+        new_args=new_args,
+        set_val=set_val,
+        assign="".join(assign_lns),
+        result=result,
+    )
+
+
+_TEMPLATE = '''\
+"""
+argument parser{source}, generated by typed_cap.codegen; do not edit
+"""
+{env_import}import re
+import sys
+
+{imports}NAME = {title}
+HELP = {help}
+
+_BAD = object()
+_match = re.compile({token}).match
+_FLAGS = {flags}
+_OPTIONS = {options}
+
+
+class ParseError(Exception):
+    def __init__(self, kind, key, msg):
+        self.kind = kind
+        self.key = key
+        super().__init__(msg)
+
+
+class Parsed:
+    __slots__ = ("_args", "_argv", "_counts")
+
+    def __init__(self, args, argv, counts):
+        self._args = args
+        self._argv = argv
+        self._counts = counts
+
+    @property
+    def args(self):
+        return self._args
+
+    value = val = lazy_args = args
+
+    @property
+    def arguments(self):
+        return self._argv
+
+    argv = arguments
+
+    @property
+    def command(self):
+        return None
+
+    @property
+    def subcommand(self):
+        return None
+
+    def unpack(self):
+        return self._argv, self._args
+
+    def count(self, name):
+        if name not in self._counts:
+            _panic(f'Parsed.count: cannot find option with name "{{name}}"')
+        return self._counts[name]
+
+
+def _panic(msg):
+    sys.stderr.write(msg + "\\n")
+    sys.exit(1)
+
+
+def print_help():
+    sys.stdout.write(HELP)
+
+
+{converters}
+
+
+def _convert(key, type_name, cvt, v):
+    r = cvt(v)
+    if r is _BAD:
+        raise ParseError(
+            "invalid",
+            key,
+            f"invalid value {{v}} for option {{key}}:{{type_name}}",
+        )
+    return r
+
+
+def _tokenize(argv):
+    positional = []
+    found = {{}}
+    n = len(argv)
+    i = 0
+    while i < n:
+        arg = argv[i]
+        i += 1
+        m = _match(arg)
+        if m is None:
+            positional.append(arg)
+            continue
+        flags = m.group("flags")
+        if flags is not None:
+            for f in flags:
+                key = _FLAGS.get(f)
+                if key is None:
+                    raise ParseError("unknown", f, f"unknown flag {{f}}")
+                found.setdefault(key, []).append(True)
+            continue
+        name = m.group("option") or m.group("alias")
+        name_k = name.replace("-", "_")
+        key = _OPTIONS.get(name_k)
+        is_flag = key is None
+        if is_flag:
+            key = _FLAGS.get(name_k)
+            if key is None:
+                raise ParseError("unknown", name, f"unknown option {{name}}")
+        val = m.group("val")
+        if val is not None:
+            if is_flag:
+                raise ParseError(
+                    "unexpected",
+                    key,
+                    f"the value for argument --{{key}} wasn't expected",
+                )
+            found.setdefault(key, []).append(val)
+        elif is_flag:
+            found.setdefault(key, []).append(True)
+        elif i < n and _match(argv[i]) is None:
+            found.setdefault(key, []).append(argv[i])
+            i += 1
+        else:
+            raise ParseError(
+                "missing_value",
+                key,
+                f"the argument --{{key}} requires a value, "
+                "which was not supplied",
+            )
+    return positional, found
+
+
+def _parse(argv):
+    positional, found = _tokenize(argv)
+    conv = {{}}
+{convert}
+{callbacks}
+{new_args}{set_val}    counts = {{}}
+{assign}
+    return Parsed({result}, positional, counts)
+
+
+def parse(argv=None, raw_err=False):
+    """parse `argv`; errors exit the process unless `raw_err` is set"""
+    try:
+        return _parse(list(sys.argv[1:] if argv is None else argv))
+    except ParseError as err:
+        if raw_err:
+            raise
+        _panic(f"{{NAME}}: {{err}}")
+'''
+
+
+class CodegenArgs:
+    """
+    generate a standalone parser module for the argstype, `Cap` or
+    `CapSchema` at `module:attribute`
+    """
+
+    # @alias=o
+    output: Optional[str]
+    """write the module to this file instead of stdout"""
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .completion import load_cap
+
+    cap = Cap(CodegenArgs).name("typed_cap.codegen")
+    parsed = cap.parse(sys.argv[1:] if argv is None else argv)
+    if len(parsed.argv) != 1:
+        panic("typed_cap.codegen: expected one `module:attribute`")
+    sys.path.insert(0, "")
+    target = parsed.argv[0]
+    try:
+        src = generate_module(load_cap(target), target)
+    except CapCodegenError as err:
+        panic(f"typed_cap.codegen: {err}")
+    out = parsed.args.output
+    if out is None:
+        sys.stdout.write(src)
+    else:
+        with open(out, "w") as f:
+            f.write(src)
+
+
+if __name__ == "__main__":
+    main()
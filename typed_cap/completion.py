@@ -0,0 +1,339 @@
+"""
+static shell completion scripts generated from the option table of a `Cap`
+
+    python -m typed_cap.completion module:Args --shell bash|zsh|fish
+
+The generated script is self-contained, completing does not start Python.
+"""
+import importlib
+import re
+import sys
+from typing import (
+    Any,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+)
+
+from .cap import Cap
+from .schema import CapSchema
+from .typing import get_value_choices, is_flag_type
+from .utils import none_or, panic
+
+
+Shell = Literal["bash", "zsh", "fish"]
+SHELLS = ("bash", "zsh", "fish")
+
+
+class CompletionOption(NamedTuple):
+    name: str
+    alias: Optional[str]
+    takes_value: bool
+    choices: List[str]
+    about: str
+
+
+class CompletionSpec(NamedTuple):
+    options: List[CompletionOption]
+    commands: Dict[str, "CompletionSpec"]
+    abouts: Dict[str, str]
+    """first line of the about text of every command"""
+
+
+def _first_line(text: Optional[str]) -> str:
+    text = none_or(text, "").strip()
+    return text.splitlines()[0] if text else ""
+
+
+def completion_spec(c: Cap) -> CompletionSpec:
+    c._before_parse()
+    options = [
+        CompletionOption(
+            name=key,
+            alias=opt.alias,
+            takes_value=not is_flag_type(opt.type),
+            choices=get_value_choices(
+                opt.type, c._attributes.get("enum_on_value", False)
+            ),
+            about=_first_line(opt.about),
+        )
+        for key, opt in c._args.items()
+    ]
+    commands = {
+        name: completion_spec(c._get_subcommand(name))
+        for name in c._subcommands
+    }
+    abouts = {
+        name: _first_line(sub.about) for name, sub in c._subcommands.items()
+    }
+    return CompletionSpec(options, commands, abouts)
+
+
+def _sh_quote(text: str) -> str:
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def _func_name(prog: str) -> str:
+    return "_" + re.sub(r"\W", "_", prog) + "_complete"
+
+
+def _bash_case(spec: CompletionSpec, indent: str) -> List[str]:
+    lns: List[str] = []
+    words: List[str] = []
+    values: List[str] = []
+    for opt in spec.options:
+        names = [f"--{opt.name}"]
+        if opt.alias is not None:
+            names.append(f"-{opt.alias}")
+        words += names
+        if opt.takes_value:
+            reply = "COMPREPLY=()"
+            if opt.choices:
+                reply = (
+                    "COMPREPLY=($(compgen -W "
+                    f"{_sh_quote(' '.join(opt.choices))} -- \"$cur\"))"
+                )
+            values.append(
+                f"{indent}    {'|'.join(names)}) {reply}; return ;;"
+            )
+    if values:
+        lns.append(f'{indent}case "$prev" in')
+        lns += values
+        lns.append(f"{indent}esac")
+    lns += [
+        f'{indent}if [[ "$cur" == -* ]]; then',
+        f"{indent}    COMPREPLY=($(compgen -W {_sh_quote(' '.join(words))}"
+        ' -- "$cur"))',
+        f"{indent}else",
+    ]
+    if spec.commands:
+        cmds = " ".join(spec.commands)
+        lns.append(
+            f"{indent}    COMPREPLY=($(compgen -W {_sh_quote(cmds)}"
+            ' -- "$cur"))'
+        )
+    else:
+        lns.append(f"{indent}    COMPREPLY=()")
+    lns.append(f"{indent}fi")
+    return lns
+
+
+def bash_script(spec: CompletionSpec, prog: str) -> str:
+    func = _func_name(prog)
+    lns = [
+        f"# bash completion for {prog}, generated by typed_cap.completion",
+        f"{func}() {{",
+        "    local cur prev cmd i",
+        '    cur="${COMP_WORDS[COMP_CWORD]}"',
+        '    prev="${COMP_WORDS[COMP_CWORD-1]}"',
+    ]
+    if spec.commands:
+        lns += [
+            '    cmd=""',
+            "    for ((i = 1; i < COMP_CWORD; i++)); do",
+            '        case "${COMP_WORDS[i]}" in',
+            f"            {'|'.join(spec.commands)})",
+            '                cmd="${COMP_WORDS[i]}"',
+            "                break",
+            "                ;;",
+            "        esac",
+            "    done",
+            '    case "$cmd" in',
+        ]
+        for name, sub in spec.commands.items():
+            lns.append(f"        {name})")
+            lns += _bash_case(sub, " " * 12)
+            lns.append("            ;;")
+        lns.append("        *)")
+        lns += _bash_case(spec, " " * 12)
+        lns.append("            ;;")
+        lns.append("    esac")
+    else:
+        lns += _bash_case(spec, " " * 4)
+    lns += ["}", f"complete -o default -F {func} {prog}", ""]
+    return "\n".join(lns)
+
+
+def _zsh_escape(text: str) -> str:
+    text = re.sub(r"([\\\[\]:])", r"\\\1", text)
+    return text.replace("'", "'\\''")
+
+
+def _zsh_specs(spec: CompletionSpec) -> List[str]:
+    specs: List[str] = []
+    for opt in spec.options:
+        about = _zsh_escape(opt.about)
+        action = ""
+        if opt.takes_value:
+            choices = " ".join(_zsh_escape(can) for can in opt.choices)
+            action = f":{opt.name}:" + (
+                f"({choices})" if choices else "_default"
+            )
+        names = [f"--{opt.name}"]
+        if opt.alias is not None:
+            names.append(f"-{opt.alias}")
+        for name in names:
+            specs.append(f"'*{name}[{about}]{action}'")
+    return specs
+
+
+def _zsh_function(spec: CompletionSpec, func: str, lns: List[str]) -> None:
+    subs: List[str] = []
+    for name, sub in spec.commands.items():
+        sub_func = f"{func}_{re.sub(r'[^0-9A-Za-z_]', '_', name)}"
+        _zsh_function(sub, sub_func, lns)
+        subs.append(f"                {name}) {sub_func} ;;")
+    args = _zsh_specs(spec)
+    lns.append(f"{func}() {{")
+    if spec.commands:
+        lns.append('    local curcontext="$curcontext" state line')
+        args += ["'1: :->command'", "'*:: :->args'"]
+        lns.append("    _arguments -C -s \\")
+    else:
+        args.append("'*:argument:_default'")
+        lns.append("    _arguments -s \\")
+    lns += [f"        {arg} \\" for arg in args[:-1]]
+    lns.append(f"        {args[-1]}")
+    if spec.commands:
+        cmds = " ".join(
+            _sh_quote(f"{name}:{spec.abouts.get(name, '')}".rstrip(":"))
+            for name in spec.commands
+        )
+        lns += [
+            "    case $state in",
+            "        command)",
+            "            local -a commands",
+            f"            commands=({cmds})",
+            "            _describe command commands",
+            "            ;;",
+            "        args)",
+            "            case $line[1] in",
+            *subs,
+            "            esac",
+            "            ;;",
+            "    esac",
+        ]
+    lns += ["}", ""]
+
+
+def zsh_script(spec: CompletionSpec, prog: str) -> str:
+    func = _func_name(prog)
+    lns = [
+        f"#compdef {prog}",
+        f"# zsh completion for {prog}, generated by typed_cap.completion",
+        "",
+    ]
+    _zsh_function(spec, func, lns)
+    lns += [f"compdef {func} {prog}", ""]
+    return "\n".join(lns)
+
+
+def _fish_lines(
+    spec: CompletionSpec, prog: str, condition: Optional[str]
+) -> List[str]:
+    lns: List[str] = []
+    base = f"complete -c {prog}"
+    if condition is not None:
+        base += f" -n {_sh_quote(condition)}"
+    for opt in spec.options:
+        ln = f"{base} -l {opt.name}"
+        if opt.alias is not None:
+            ln += f" -s {opt.alias}"
+        if opt.choices:
+            ln += f" -x -a {_sh_quote(' '.join(opt.choices))}"
+        elif opt.takes_value:
+            ln += " -r"
+        if opt.about:
+            ln += f" -d {_sh_quote(opt.about)}"
+        lns.append(ln)
+    for name in spec.commands:
+        ln = f"{base} -f -a {name}"
+        if spec.abouts.get(name):
+            ln += f" -d {_sh_quote(spec.abouts[name])}"
+        lns.append(ln)
+    return lns
+
+
+def fish_script(spec: CompletionSpec, prog: str) -> str:
+    lns = [f"# fish completion for {prog}, generated by typed_cap.completion"]
+    if spec.commands:
+        names = " ".join(spec.commands)
+        lns += _fish_lines(
+            spec, prog, f"not __fish_seen_subcommand_from {names}"
+        )
+        for name, sub in spec.commands.items():
+            lns += _fish_lines(
+                sub, prog, f"__fish_seen_subcommand_from {name}"
+            )
+    else:
+        lns += _fish_lines(spec, prog, None)
+    lns.append("")
+    return "\n".join(lns)
+
+
+def generate_completion(
+    c: Cap, shell: Shell, prog: Optional[str] = None
+) -> str:
+    """completion script of `c` for `shell`, installed for command `prog`"""
+    spec = completion_spec(c)
+    prog = none_or(prog, none_or(c._name, c._argstype.__name__.lower()))
+    if shell == "bash":
+        return bash_script(spec, prog)
+    elif shell == "zsh":
+        return zsh_script(spec, prog)
+    elif shell == "fish":
+        return fish_script(spec, prog)
+    raise ValueError(f"unsupported shell {shell!r}, expected one of {SHELLS}")
+
+
+def load_cap(target: str) -> Cap:
+    """load `module:attr`, an argstype, a `Cap` or a `CapSchema`"""
+    mod_name, _, attr = target.partition(":")
+    if not attr:
+        raise ValueError(f"expected `module:attribute`, got {target!r}")
+    obj: Any = importlib.import_module(mod_name)
+    for name in attr.split("."):
+        obj = getattr(obj, name)
+    if isinstance(obj, Cap):
+        return obj
+    elif isinstance(obj, CapSchema):
+        return Cap.from_schema(obj)
+    return Cap(obj)
+
+
+class CompletionArgs:
+    """
+    generate a static shell completion script for the argstype, `Cap` or
+    `CapSchema` at `module:attribute`
+    """
+
+    shell: Literal["bash", "zsh", "fish"] = "bash"
+    """target shell"""
+    prog: Optional[str]
+    """name of the completed command, defaults to the name of the `Cap`"""
+    # @alias=o
+    output: Optional[str]
+    """write the script to this file instead of stdout"""
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    cap = Cap(CompletionArgs).name("typed_cap.completion")
+    parsed = cap.parse(sys.argv[1:] if argv is None else argv)
+    args = parsed.args
+    if len(parsed.argv) != 1:
+        panic("typed_cap.completion: expected one `module:attribute`")
+    sys.path.insert(0, "")
+    script = generate_completion(
+        load_cap(parsed.argv[0]), args.shell, args.prog
+    )
+    if args.output is None:
+        sys.stdout.write(script)
+    else:
+        with open(args.output, "w") as f:
+            f.write(script)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+from typing import Any, Dict, Literal, Mapping, Optional, Union
+
+from .types import CapConfigError
+
+
+ConfigFormat = Literal["json", "toml"]
+
+_SUFFIXES: Dict[str, ConfigFormat] = {".json": "json", ".toml": "toml"}
+
+
+def _load_toml(data: bytes) -> Dict[str, Any]:
+    try:
+        import tomllib  # type: ignore[import-not-found]
+    except ImportError:  # python < 3.11
+        import tomli as tomllib  # type: ignore[import-not-found, no-redef]
+    return tomllib.loads(data.decode("utf-8"))
+
+
+def load_config(
+    path: Union[str, "os.PathLike[str]"],
+    fmt: Optional[ConfigFormat] = None,
+) -> Dict[str, Any]:
+    """
+    read the config file at `path`; the format is taken from the suffix
+    of `path` unless `fmt` is given
+    """
+    name = os.fspath(path)
+    if fmt is None:
+        fmt = _SUFFIXES.get(os.path.splitext(name)[1].lower())
+        if fmt is None:
+            raise CapConfigError(name, "unknown config format")
+    try:
+        with open(name, "rb") as f:
+            data = f.read()
+    except OSError as err:
+        raise CapConfigError(name, err.strerror or str(err))
+    try:
+        if fmt == "json":
+            import json
+
+            loaded = json.loads(data)
+        elif fmt == "toml":
+            loaded = _load_toml(data)
+        else:
+            raise CapConfigError(name, f"unknown config format {fmt!r}")
+    except ImportError:
+        raise CapConfigError(name, "reading TOML requires tomllib or tomli")
+    except ValueError as err:
+        # `json.JSONDecodeError` and `tomllib.TOMLDecodeError`
+        raise CapConfigError(name, str(err))
+    if not isinstance(loaded, dict):
+        raise CapConfigError(name, "top level is not a table")
+    return loaded
+
+
+def config_section(
+    data: Mapping[str, Any], section: Optional[str], source: str = "<config>"
+) -> Mapping[str, Any]:
+    """the table at the dotted path `section` of `data`, e.g. `tool.app`"""
+    if section is None:
+        return data
+    for part in section.split("."):
+        data = data.get(part)  # type: ignore[assignment]
+        if not isinstance(data, Mapping):
+            raise CapConfigError(source, f"no table {section!r}")
+    return data
+
+
+def env_name(prefix: str, key: str) -> str:
+    """environment variable read for option `key`, e.g. `APP_DRY_RUN`"""
+    return (prefix + key).upper()
+
+
+_FLAG_WORDS = {
+    "1": "true",
+    "yes": "true",
+    "on": "true",
+    "true": "true",
+    "0": "false",
+    "no": "false",
+    "off": "false",
+    "false": "false",
+}
+
+
+def env_flag(raw: str) -> str:
+    """env value of a flag option in the words of the bool unit"""
+    return _FLAG_WORDS.get(raw.strip().lower(), raw)
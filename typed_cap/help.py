@@ -0,0 +1,93 @@
+import sys
+from typing import TYPE_CHECKING, List, Tuple
+
+from .utils import get_terminal_width, none_or, split_by_length
+
+if TYPE_CHECKING:
+    from .cap import Cap
+
+
+INDENT_SIZE = 4
+MIN_ABOUT_WIDTH: int = 10
+MAX_WIDTH: int = 100
+
+
+def render_help(c: "Cap") -> List[str]:
+    lns: List[Tuple[int, str]] = []
+    if c._about is not None:
+        lns.append((0, c._about))
+        lns.append((0, ""))
+    lns.append((0, "OPTIONS:"))
+    arg_lns: List[Tuple[str, str]] = []
+    max_opt_len = 0
+    for key, opt in c._args.items():
+        alias = none_or(opt.alias, "   ")
+        if len(alias) == 1:
+            alias = f"-{alias},"
+        ln = f"{alias}--{key}"
+        max_opt_len = max(len(ln), max_opt_len)
+        arg_lns.append((key, ln))
+
+    prefix_width: int = max_opt_len + 4
+    width = max(
+        get_terminal_width(MAX_WIDTH) - 1 * INDENT_SIZE,
+        prefix_width + MIN_ABOUT_WIDTH,
+    )
+    remain_width = width - prefix_width
+
+    for key, ln in arg_lns:
+        about = []
+        if c._args[key].about is not None:
+            about.append(c._args[key].about)
+
+        if c._args[key].val.is_none():
+            default_val = c._args[key].cls_attr_val
+        else:
+            default_val = c._args[key].val.unwrap()
+        if default_val is not None and c._args[key].show_default:
+            about.append(f"(default: {str(default_val)})")
+
+        about = split_by_length(
+            " ".join(about),
+            remain_width,
+            add_hyphen=True,
+            remove_leading_space=True,
+        )
+
+        if len(about) == 0:
+            about = [""]
+        for i, abt in enumerate(about):
+            if i == 0:
+                lns.append((1, ln.ljust(max_opt_len + 4) + abt))
+            else:
+                lns.append((1, "".ljust(prefix_width) + abt))
+
+    if c._subcommands:
+        lns.append((0, ""))
+        lns.append((0, "COMMANDS:"))
+        max_cmd_len = max(len(name) for name in c._subcommands)
+        cmd_width = max(width - max_cmd_len - 4, MIN_ABOUT_WIDTH)
+        for name, sub in c._subcommands.items():
+            about = split_by_length(
+                none_or(sub.about, ""),
+                cmd_width,
+                add_hyphen=True,
+                remove_leading_space=True,
+            )
+            if len(about) == 0:
+                about = [""]
+            for i, abt in enumerate(about):
+                ln = name if i == 0 else ""
+                lns.append((1, ln.ljust(max_cmd_len + 4) + abt))
+
+    return ["".ljust(indent * INDENT_SIZE) + ln for indent, ln in lns]
+
+
+def help_text(c: "Cap") -> str:
+    return "".join(ln + "\n" for ln in render_help(c))
+
+
+def print_help(c: "Cap") -> None:
+    # one write for the whole screen instead of one per line
+    sys.stdout.write(help_text(c))
+    sys.stdout.flush()
@@ -0,0 +1,216 @@
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+
+T = TypeVar("T")
+
+Resolver = Callable[[str], Any]
+
+
+def _reorder(d: Dict[str, Any], order: Iterable[str]) -> None:
+    # keys of `d` in `order`, followed by the others in their own order;
+    # only the methods of `dict` are used, so nothing is resolved
+    items = dict(dict.items(d))
+    dict.clear(d)
+    for key in order:
+        if key in items:
+            dict.__setitem__(d, key, items.pop(key))
+    dict.update(d, items)
+
+
+class LazyDict(Dict[str, Any]):
+    """
+    `dict` whose pending keys are resolved on first access; any operation
+    over all items resolves the remaining keys first, then iterates in
+    the order of `order`
+    """
+
+    _resolve: Resolver
+    _pending: Dict[str, None]
+    _order: List[str]
+    _ordered: bool
+
+    def __init__(
+        self,
+        resolve: Resolver,
+        items: Dict[str, Any],
+        pending: Iterable[str],
+        order: Optional[Iterable[str]] = None,
+    ) -> None:
+        super().__init__(items)
+        self._resolve = resolve
+        self._pending = dict.fromkeys(pending)
+        self._order = (
+            [*items, *self._pending] if order is None else list(order)
+        )
+        self._ordered = not self._pending
+
+    def _load(self, key: str) -> Any:
+        val = self._resolve(key)
+        self._settle(key)
+        super().__setitem__(key, val)
+        return val
+
+    def _force(self) -> None:
+        for key in list(self._pending):
+            self._load(key)
+        if not self._ordered:
+            # resolved keys were appended, move them to their place
+            _reorder(self, self._order)
+            self._ordered = True
+
+    def __missing__(self, key: str) -> Any:
+        if key in self._pending:
+            return self._load(key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._pending or super().__contains__(key)
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self._pending)
+
+    def __iter__(self) -> Iterator[str]:
+        self._force()
+        return super().__iter__()
+
+    def __repr__(self) -> str:
+        self._force()
+        return super().__repr__()
+
+    def __eq__(self, other: object) -> bool:
+        self._force()
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def _settle(self, key: str) -> None:
+        # a pending key is set by the caller instead of resolved
+        if key in self._pending:
+            del self._pending[key]
+            self._ordered = False
+
+    def __setitem__(self, key: str, val: Any) -> None:
+        self._settle(key)
+        super().__setitem__(key, val)
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._pending:
+            del self._pending[key]
+        else:
+            super().__delitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._pending:
+            return self._load(key)
+        return super().get(key, default)
+
+    def keys(self):  # type: ignore[override]
+        self._force()
+        return super().keys()
+
+    def values(self):  # type: ignore[override]
+        self._force()
+        return super().values()
+
+    def items(self):  # type: ignore[override]
+        self._force()
+        return super().items()
+
+    def copy(self) -> Dict[str, Any]:  # type: ignore[override]
+        self._force()
+        return dict(self)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self._pending:
+            self._load(key)
+        return super().pop(key, *default)
+
+    def popitem(self) -> Tuple[str, Any]:
+        self._force()
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self._pending:
+            return self._load(key)
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        items = dict(*args, **kwargs)
+        for key in items:
+            self._settle(key)
+        super().update(items)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class _LazyField:
+    """data descriptor resolving a field of a lazy args object on first read"""
+
+    name: str
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Any = None) -> Any:
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            ...
+        val = obj._typed_cap_resolve(self.name)
+        obj.__dict__[self.name] = val
+        # keep `vars(obj)` in the order of an eagerly built object
+        _reorder(obj.__dict__, obj._typed_cap_order)
+        return val
+
+    def __set__(self, obj: Any, val: Any) -> None:
+        obj.__dict__[self.name] = val
+
+    def __delete__(self, obj: Any) -> None:
+        del obj.__dict__[self.name]
+
+
+@lru_cache(maxsize=128)
+def lazy_object_type(argstype: Type[T], keys: Tuple[str, ...]) -> Type[T]:
+    """
+    subclass of an object-based argstype whose fields in `keys` are
+    resolved on first read
+    """
+    ns: Dict[str, Any] = {k: _LazyField(k) for k in keys}
+    ns["__slots__"] = ("_typed_cap_resolve", "_typed_cap_order")
+    ns["__module__"] = argstype.__module__
+    ns["__qualname__"] = argstype.__qualname__
+    ns["__doc__"] = argstype.__doc__
+    return type(argstype.__name__, (argstype,), ns)
+
+
+def create_lazy_object(
+    argstype: Type[T],
+    resolve: Resolver,
+    items: Dict[str, Any],
+    pending: Iterable[str],
+    order: Optional[Iterable[str]] = None,
+) -> T:
+    pending = tuple(pending)
+    cls = lazy_object_type(argstype, pending)
+    obj = cls.__new__(cls)
+    obj._typed_cap_resolve = resolve  # type: ignore[attr-defined]
+    obj._typed_cap_order = (  # type: ignore[attr-defined]
+        [*items, *pending] if order is None else list(order)
+    )
+    obj.__dict__.update(items)
+    return obj
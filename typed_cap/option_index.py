@@ -0,0 +1,138 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .types import ArgNamed, ArgTypes
+from .utils.trie import PrefixTrie
+
+
+class OptionIndex:
+    """
+    hash index resolving long names and aliases to the canonical option key
+
+    Names are looked up with one dict access. Hyphen conversion
+    (`max-depth` -> `max_depth`) is applied to the looked-up name since it
+    depends on the options of each parse.
+    """
+
+    _kinds: Dict[str, ArgTypes]
+    """canonical key -> kind"""
+    _aliases: Dict[str, str]
+    """canonical key -> alias"""
+    _names: Dict[str, str]
+    """long name or alias -> canonical key"""
+    _flags: Dict[str, str]
+    _options: Dict[str, str]
+    _trie: Optional[PrefixTrie[str]]
+    """prefix trie over `_names`, built on first prefix lookup"""
+
+    def __init__(self) -> None:
+        self._kinds = {}
+        self._aliases = {}
+        self._names = {}
+        self._flags = {}
+        self._options = {}
+        self._trie = None
+
+    @classmethod
+    def from_named(
+        cls, named_args: Iterable[Tuple[ArgTypes, ArgNamed]]
+    ) -> "OptionIndex":
+        index = cls()
+        for kind, (key, alias) in named_args:
+            if kind not in ("flag", "option") or key in index._kinds:
+                continue
+            index.add(key, kind)
+            if alias is not None and alias not in index._by_kind(kind):
+                index.set_alias(key, alias)
+        return index
+
+    def _by_kind(self, kind: ArgTypes) -> Dict[str, str]:
+        return self._flags if kind == "flag" else self._options
+
+    def add(self, key: str, kind: ArgTypes) -> None:
+        if key in self._kinds:
+            self.remove(key)
+        self._trie = None
+        self._kinds[key] = kind
+        self._names.setdefault(key, key)
+        self._by_kind(kind).setdefault(key, key)
+
+    def remove(self, key: str) -> None:
+        self.set_alias(key, None)
+        kind = self._kinds.pop(key, None)
+        if kind is None:
+            return
+        self._trie = None
+        if self._names.get(key) == key:
+            self._names.pop(key)
+        by_kind = self._by_kind(kind)
+        if by_kind.get(key) == key:
+            by_kind.pop(key)
+
+    def set_alias(self, key: str, alias: Optional[str]) -> None:
+        kind = self._kinds.get(key)
+        if kind is None:
+            return
+        by_kind = self._by_kind(kind)
+        self._trie = None
+        prev = self._aliases.pop(key, None)
+        if prev is not None and self._names.get(prev) == key:
+            self._names.pop(prev)
+            by_kind.pop(prev, None)
+        if alias is not None:
+            self._aliases[key] = alias
+            self._names.setdefault(alias, key)
+            by_kind.setdefault(alias, key)
+
+    def get_key(self, name: str) -> Optional[str]:
+        """canonical key of a long name or alias of any kind"""
+        return self._names.get(name)
+
+    def get_flag_key(self, name: str) -> Optional[str]:
+        return self._flags.get(name)
+
+    def get_option_key(self, name: str) -> Optional[str]:
+        return self._options.get(name)
+
+    def _get_trie(self) -> PrefixTrie[str]:
+        trie = self._trie
+        if trie is None:
+            trie = PrefixTrie()
+            for name, key in self._names.items():
+                trie.insert(name, key)
+            # published only once complete, for concurrent readers
+            self._trie = trie
+        return trie
+
+    def names(self, prefix: str = "") -> List[Tuple[str, str]]:
+        """(name, canonical key) of long names and aliases with `prefix`"""
+        return list(self._get_trie().items(prefix))
+
+    def match_prefix(self, prefix: str) -> Optional[str]:
+        """
+        canonical key of the only option whose long name starts with
+        `prefix`, e.g. `verb` -> `verbose`
+        """
+        key = self._names.get(prefix)
+        if key is not None:
+            return key
+        found: Optional[str] = None
+        for name, key in self._get_trie().items(prefix):
+            if name != key:
+                # alias
+                continue
+            if found is not None:
+                return None
+            found = key
+        return found
+
+    def kind(self, key: str) -> Optional[ArgTypes]:
+        return self._kinds.get(key)
+
+    def alias(self, key: str) -> Optional[str]:
+        return self._aliases.get(key)
+
+    def named_args(self) -> List[Tuple[ArgTypes, ArgNamed]]:
+        return [
+            (kind, (key, self._aliases.get(key)))
+            for key, kind in self._kinds.items()
+        ]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from copy import copy
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from .types import ArgOption
+from .typing import UnitRegistry, ValidUnit
+from .typing.default import PREDEFINED_BASE
+from .utils.option import Option
+
+
+T = TypeVar("T", bound=Union[Dict[str, Any], object])
+
+
+def copy_arg_option(opt: ArgOption) -> ArgOption:
+    """shallow copy of `opt` that does not share its mutable fields"""
+    cp = copy(opt)
+    cp.cmt_params = dict(opt.cmt_params)
+    return cp
+
+
+@dataclass(frozen=True)
+class CapSchema(Generic[T]):
+    """
+    fully-resolved and immutable snapshot of a `Cap`
+
+    A schema is built once with `Cap.compile` and can be turned into any
+    number of `Cap` instances with `Cap.from_schema`, none of which will
+    re-inspect the argstype (type hints, source docs, comment parameters).
+    """
+
+    argstype: Type[T]
+    options: Mapping[str, ArgOption]
+    """resolved option table including aliases, docs and comment params"""
+    units: Mapping[str, ValidUnit]
+    """validator units added on top of `base_units`"""
+    base_units: Tuple[Mapping[str, ValidUnit], ...]
+    """shared lower layers of the validator registry, e.g. predefined units"""
+    attributes: Mapping[str, Any]
+    about: Optional[str]
+    name: Optional[str]
+    version: Optional[str]
+    delimiter: Option[Optional[str]]
+    stop_at_type: Optional[type]
+    add_helper_help: bool
+    preset_helper_used: bool
+    raw_err: bool
+    env_prefix: Optional[str] = None
+    subcommands: Mapping[str, Any] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    """subcommand sources by name, compiled when invoked"""
+
+    @classmethod
+    def create(
+        cls,
+        argstype: Type[T],
+        options: Dict[str, ArgOption],
+        units: UnitRegistry,
+        attributes: Dict[str, Any],
+        **kwargs: Any,
+    ) -> CapSchema[T]:
+        return cls(
+            argstype=argstype,
+            options=MappingProxyType(
+                {k: copy_arg_option(opt) for k, opt in options.items()}
+            ),
+            units=MappingProxyType(dict(units.maps[0])),
+            base_units=tuple(units.maps[1:]),
+            attributes=MappingProxyType(dict(attributes)),
+            **kwargs,
+        )
+
+    def copy_options(self) -> Dict[str, ArgOption]:
+        return {k: copy_arg_option(opt) for k, opt in self.options.items()}
+
+    def __reduce__(self):
+        # mapping proxies can't be pickled; the shared predefined units are
+        # pickled by reference
+        state = {f.name: getattr(self, f.name) for f in fields(self)}
+        for k in _MAPPING_FIELDS:
+            state[k] = dict(state[k])
+        state["base_units"] = tuple(
+            None if m is PREDEFINED_BASE else dict(m) for m in self.base_units
+        )
+        return (_unpickle_schema, (type(self), state))
+
+
+_MAPPING_FIELDS = ("options", "units", "attributes", "subcommands")
+
+
+def _unpickle_schema(
+    cls: Type[CapSchema], state: Dict[str, Any]
+) -> CapSchema:
+    for k in _MAPPING_FIELDS:
+        state[k] = MappingProxyType(state[k])
+    state["base_units"] = tuple(
+        PREDEFINED_BASE if m is None else MappingProxyType(m)
+        for m in state["base_units"]
+    )
+    return cls(**state)
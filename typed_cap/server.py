@@ -0,0 +1,199 @@
+"""
+daemon keeping compiled `Cap`s resident, answering parse, validate, help
+and complete requests over a Unix domain socket
+
+    python -m typed_cap.server module:Args [module:Other ...] [--socket PATH]
+
+Callers use `typed_cap.client`, which skips importing and building the
+`Cap` on every invocation; the wire format is described there.
+"""
+import os
+import socketserver
+import sys
+import threading
+from enum import Enum
+from typing import Any, Dict, List, NoReturn, Optional
+
+from .batch import HelperExit, worker_cap
+from .cap import Cap, Parsed
+from .client import default_socket_path, recv_msg, send_msg
+from .completion import load_cap
+from .help import help_text
+from .utils import panic
+
+
+def to_wire(val: Any) -> Any:
+    """`val` as a JSON value; enum members are sent by name"""
+    if val is None or isinstance(val, (bool, int, float, str)):
+        return val
+    elif isinstance(val, Enum):
+        return val.name
+    elif isinstance(val, (list, tuple)):
+        return [to_wire(v) for v in val]
+    elif isinstance(val, dict):
+        return {str(k): to_wire(v) for k, v in val.items()}
+    return str(val)
+
+
+def _parsed_to_wire(parsed: Parsed[Any]) -> Dict[str, Any]:
+    res: Dict[str, Any] = {
+        "args": {k: to_wire(parsed._field(k)) for k in parsed._parsed_map},
+        "argv": list(parsed.argv),
+    }
+    if parsed.command is not None and parsed.subcommand is not None:
+        res["command"] = parsed.command
+        res["sub"] = _parsed_to_wire(parsed.subcommand)
+    return res
+
+
+def _error(err: BaseException) -> Dict[str, Any]:
+    detail = {k: str(v) for k, v in vars(err).items()}
+    return {
+        "ok": False,
+        "error": type(err).__name__,
+        "detail": detail or str(err),
+    }
+
+
+class Target:
+    """a resident `Cap` and its prerendered help text"""
+
+    cap: Cap
+    _help: Optional[str]
+
+    def __init__(self, cap: Cap) -> None:
+        self.cap = worker_cap(cap)
+        self._help = None
+
+    @property
+    def help(self) -> str:
+        if self._help is None:
+            self._help = help_text(self.cap)
+        return self._help
+
+    def handle(
+        self, op: str, argv: List[str], env: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        answer a request; `env` is the environment of the client, used in
+        place of the one of the daemon
+        """
+        if op == "help":
+            return {"ok": True, "text": self.help}
+        elif op == "complete":
+            return {"ok": True, "candidates": self.cap.complete(argv)}
+        elif op in ("parse", "validate"):
+            try:
+                parsed = self.cap.parse(argv, env=env)
+                res = {"ok": True}
+                if op == "parse":
+                    res.update(_parsed_to_wire(parsed))
+                else:
+                    # converts the values of every field
+                    parsed.args
+                return res
+            except HelperExit as err:
+                # `--help` or `--version`
+                return {"ok": False, "exit": 0, "text": err.text}
+            except SystemExit as err:
+                code = err.code if isinstance(err.code, int) else 1
+                return {"ok": False, "exit": code, "error": "SystemExit"}
+            except Exception as err:
+                return _error(err)
+        return {"ok": False, "error": "UnknownOp", "detail": op}
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "ParseServer"
+
+    def handle(self) -> None:
+        # a connection may send any number of requests
+        while True:
+            try:
+                msg = recv_msg(self.request)
+            except (ConnectionError, ValueError):
+                return
+            if msg is None:
+                return
+            try:
+                target = self.server.get_target(msg.get("cap"))
+                env = msg.get("env")
+                res = target.handle(
+                    msg.get("op", ""),
+                    msg.get("argv", []),
+                    env if isinstance(env, dict) else {},
+                )
+            except Exception as err:
+                res = _error(err)
+            send_msg(self.request, res)
+
+
+class ParseServer(socketserver.ThreadingUnixStreamServer):
+    """serves the `Cap`s of `targets`, keyed by their `module:attr`"""
+
+    daemon_threads = True
+    targets: Dict[str, Target]
+    default: str
+
+    def __init__(self, path: str, targets: Dict[str, Cap]) -> None:
+        if not targets:
+            raise ValueError("no target to serve")
+        self.targets = {k: Target(cap) for k, cap in targets.items()}
+        self.default = next(iter(targets))
+        if os.path.exists(path):
+            os.unlink(path)
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def get_target(self, name: Optional[str]) -> Target:
+        target = self.targets.get(self.default if name is None else name)
+        if target is None:
+            raise KeyError(name)
+        return target
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)  # type: ignore[arg-type]
+        except OSError:
+            ...
+
+
+def serve_in_thread(path: str, targets: Dict[str, Cap]) -> ParseServer:
+    """start a `ParseServer` on a daemon thread; stop it with `shutdown`"""
+    server = ParseServer(path, targets)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class ServerArgs:
+    """
+    serve the argstypes, `Cap`s or `CapSchema`s at `module:attribute` over
+    a Unix domain socket
+    """
+
+    socket: Optional[str]
+    """path of the socket, defaults to one private to the current user"""
+
+
+def main(argv: Optional[List[str]] = None) -> NoReturn:
+    cap = Cap(ServerArgs).name("typed_cap.server")
+    parsed = cap.parse(sys.argv[1:] if argv is None else argv)
+    if not parsed.argv:
+        panic("typed_cap.server: expected at least one `module:attribute`")
+    sys.path.insert(0, "")
+    targets = {target: load_cap(target) for target in parsed.argv}
+    path = parsed.args.socket or default_socket_path()
+    with ParseServer(path, targets) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            ...
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
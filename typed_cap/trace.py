@@ -0,0 +1,160 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter_ns
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class Tracer:
+    """
+    receives start/stop events of the phases of `Cap` construction and
+    `Cap.parse`; `detail` names the option of per-option phases
+
+    Timestamps are taken from `time.perf_counter_ns`.
+    """
+
+    def on_start(self, phase: str, detail: Optional[str], t_ns: int) -> None:
+        ...
+
+    def on_stop(
+        self, phase: str, detail: Optional[str], t_ns: int, elapsed_ns: int
+    ) -> None:
+        ...
+
+
+_TRACER: ContextVar[Optional[Tracer]] = ContextVar(
+    "typed_cap_tracer", default=None
+)
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _TRACER.get()
+
+
+@contextmanager
+def use_tracer(tracer: Tracer) -> Iterator[Tracer]:
+    """enable `tracer` for the current context (thread or task)"""
+    token = _TRACER.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _TRACER.reset(token)
+
+
+class Span:
+    __slots__ = ("_tracer", "_phase", "_detail", "_t0")
+
+    def __init__(
+        self, tracer: Tracer, phase: str, detail: Optional[str]
+    ) -> None:
+        self._tracer = tracer
+        self._phase = phase
+        self._detail = detail
+        self._t0 = 0
+
+    def __enter__(self) -> None:
+        self._t0 = perf_counter_ns()
+        self._tracer.on_start(self._phase, self._detail, self._t0)
+
+    def __exit__(self, *_: object) -> None:
+        t1 = perf_counter_ns()
+        self._tracer.on_stop(self._phase, self._detail, t1, t1 - self._t0)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        ...
+
+    def __exit__(self, *_: object) -> None:
+        ...
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(phase: str, detail: Optional[str] = None):
+    """context manager timing `phase`; a shared no-op without a tracer"""
+    tracer = _TRACER.get()
+    if tracer is None:
+        return _NO_SPAN
+    return Span(tracer, phase, detail)
+
+
+class PhaseStats:
+    count: int
+    total_ns: int
+    min_ns: int
+    max_ns: int
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def add(self, elapsed_ns: int) -> None:
+        if self.count == 0 or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+
+class TraceCollector(Tracer):
+    """
+    tracer aggregating the timings of every phase across many parses;
+    safe to share between threads
+    """
+
+    by_phase: Dict[str, PhaseStats]
+    by_option: Dict[Tuple[str, str], PhaseStats]
+    """stats of per-option phases, by (phase, option)"""
+    _lock: Lock
+
+    def __init__(self) -> None:
+        self.by_phase = {}
+        self.by_option = {}
+        self._lock = Lock()
+
+    def on_stop(
+        self, phase: str, detail: Optional[str], t_ns: int, elapsed_ns: int
+    ) -> None:
+        with self._lock:
+            stats = self.by_phase.get(phase)
+            if stats is None:
+                stats = self.by_phase[phase] = PhaseStats()
+            stats.add(elapsed_ns)
+            if detail is not None:
+                stats = self.by_option.get((phase, detail))
+                if stats is None:
+                    stats = self.by_option[(phase, detail)] = PhaseStats()
+                stats.add(elapsed_ns)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.by_phase.clear()
+            self.by_option.clear()
+
+    def report(self) -> str:
+        lns: List[str] = [
+            f"{'phase':<24}{'count':>8}"
+            f"{'total(ms)':>12}{'mean(us)':>12}{'max(us)':>12}"
+        ]
+        with self._lock:
+            rows = sorted(
+                self.by_phase.items(), key=lambda it: -it[1].total_ns
+            )
+            for phase, s in rows:
+                lns.append(
+                    f"{phase:<24}{s.count:>8}{s.total_ns / 1e6:>12.3f}"
+                    f"{s.mean_ns / 1e3:>12.2f}{s.max_ns / 1e3:>12.2f}"
+                )
+        return "\n".join(lns)
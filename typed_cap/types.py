@@ -1,7 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import (
     Any,
     Callable,
+    Collection,
     Dict,
     List,
     Literal,
@@ -107,6 +108,8 @@ class ArgOption(BasicArgOption):
     cls_attr_val: Optional[Any]
     """value defined in class attribute"""
     local_delimiter: Option[Optional[str]]
+    file_val: Option = field(default_factory=Option.NONE)
+    """raw value read from a config file, converted when it is used"""
 
 
 ArgTypes = Literal["flag", "option"]
@@ -118,11 +121,23 @@ class ArgsParserOptions(TypedDict, total=False):
     ignore_unknown_flags: bool
     ignore_unknown_options: bool
     disable_hyphen_conversion: bool
+    allow_abbrev: bool
+    """accept unambiguous prefixes of long names, e.g. `--verb`"""
+    expand_argsfiles: bool
+    """replace `@path` by the arguments read from the file at `path`"""
+    argsfile_format: Literal["lines", "shell"]
+    """one argument per line (default) or shell-quoted arguments"""
+    subcommands: Collection[str]
+    """positional values that stop the parsing, e.g. subcommand names"""
 
 
 class ArgsParserResults(NamedTuple):
     argv: List[str]
     options: Dict[str, List[Union[str, bool]]]
+    command: Optional[str] = None
+    """subcommand that stopped the parsing"""
+    rest: Optional[List[str]] = None
+    """arguments after `command`, left unparsed"""
 
 
 class ArgsParserKeyError(Exception):
@@ -176,6 +191,37 @@ class ArgsParserUnexpectedValue(Exception):
         super().__init__(*args)
 
 
+class ArgsParserArgsfileError(Exception):
+    path: str
+    reason: str
+
+    def __init__(self, path: str, reason: str, *args: object) -> None:
+        self.path = path
+        self.reason = reason
+        super().__init__(f"{reason}: '{path}'", *args)
+
+
+class CapConfigError(Exception):
+    path: str
+    reason: str
+
+    def __init__(self, path: str, reason: str, *args: object) -> None:
+        self.path = path
+        self.reason = reason
+        super().__init__(f"{reason}: '{path}'", *args)
+
+
+class CapCodegenError(Exception):
+    key: str
+    reason: str
+
+    def __init__(self, key: str, reason: str, *args: object) -> None:
+        self.key = key
+        self.reason = reason
+        msg = f"option '{key}': {reason}" if key else reason
+        super().__init__(msg, *args)
+
+
 class _CapInvalidValue(Exception):
     key: str
     type_class: Type
@@ -1,4 +1,11 @@
-from .valid import ValidatorNotFound, ValidRes, ValidVal, Unit as ValidUnit
+from .valid import (
+    UnitNotPicklable,
+    UnitRegistry,
+    ValidatorNotFound,
+    ValidRes,
+    ValidVal,
+    Unit as ValidUnit,
+)
 from .utils import (
     BasedType,
     ParsedQueueType,
@@ -7,4 +14,6 @@ from .utils import (
     get_based,
     get_queue_type,
     get_type_candidates,
+    get_value_choices,
+    is_flag_type,
 )
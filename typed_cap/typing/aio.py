@@ -0,0 +1,104 @@
+"""
+support of units with a coroutine `valid_fn`
+
+`ValidVal.extract` hands the awaitable returned by such a unit to the
+batch of the current context. `Cap.parse_async` fills a batch with a dry
+run of the conversions which may await, awaits the collected awaitables
+concurrently and converts again with the results. Outside of a batch the
+awaitable is run to completion with `asyncio.run`.
+"""
+import asyncio
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, Optional
+
+from .collect import CollectingBatch, hashable
+from .valid import ValidRes
+
+
+class AsyncBatch(CollectingBatch[Awaitable[ValidRes]]):
+    """conversions of async units collected for, or awaited by, a parse"""
+
+    async def run(self, limit: int, timeout: Optional[float]) -> None:
+        """
+        await the collected conversions, at most `limit` at once; one
+        running longer than `timeout` seconds becomes an invalid result
+        """
+        self.collecting = False
+        if not self.jobs:
+            return
+        sem = asyncio.Semaphore(max(limit, 1))
+
+        async def one(key: Any, aw: Awaitable[ValidRes]) -> None:
+            async with sem:
+                try:
+                    self.results[key] = await asyncio.wait_for(aw, timeout)
+                except asyncio.TimeoutError as err:
+                    res = ValidRes()
+                    res.error(err)
+                    self.results[key] = res
+
+        tasks = [
+            asyncio.ensure_future(one(key, aw))
+            for key, aw in self.jobs.items()
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # on the first failure the others are cancelled, and the
+            # awaitables that were never started are closed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for aw in self.jobs.values():
+                _close(aw)
+
+
+_BATCH: ContextVar[Optional[AsyncBatch]] = ContextVar(
+    "typed_cap_async", default=None
+)
+
+
+@contextmanager
+def use_batch(batch: AsyncBatch) -> Iterator[AsyncBatch]:
+    token = _BATCH.set(batch)
+    try:
+        yield batch
+    finally:
+        _BATCH.reset(token)
+
+
+def _close(aw: Awaitable[Any]) -> None:
+    if (
+        inspect.iscoroutine(aw)
+        and inspect.getcoroutinestate(aw) == inspect.CORO_CREATED
+    ):
+        aw.close()
+
+
+async def _await(aw: Awaitable[ValidRes]) -> ValidRes:
+    return await aw
+
+
+def resolve_awaitable(key: Any, aw: Awaitable[ValidRes]) -> ValidRes:
+    """result of the awaitable `aw` returned by a unit for `key`"""
+    batch = _BATCH.get()
+    if batch is not None and hashable(key):
+        if batch.collecting:
+            if key in batch.jobs:
+                _close(aw)
+            return batch.collect(key, aw)
+        res = batch.result(key)
+        if res is not None:
+            _close(aw)
+            return res
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await(aw))
+    _close(aw)
+    raise RuntimeError(
+        "async validator unit called in a running event loop, "
+        "use `Cap.parse_async`"
+    )
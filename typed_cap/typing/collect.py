@@ -0,0 +1,49 @@
+"""
+conversions collected by a dry run of a converter and run at once
+
+While its batch is collecting, a deferred conversion records a job and
+returns an optimistic placeholder. The jobs are then run together, by the
+subclass, and the real run of the converter replays their results.
+"""
+from typing import Any, Dict, Generic, Optional, TypeVar
+
+from .valid import ValidRes
+
+J = TypeVar("J")
+
+
+def placeholder() -> ValidRes:
+    # optimistic, so containers pass on all of their elements
+    v = ValidRes()
+    v.some(None)
+    v.valid()
+    return v
+
+
+def hashable(key: Any) -> bool:
+    try:
+        hash(key)
+    except TypeError:
+        return False
+    return True
+
+
+class CollectingBatch(Generic[J]):
+    """jobs keyed by their inputs, and the results once they have run"""
+
+    collecting: bool
+    jobs: Dict[Any, J]
+    results: Dict[Any, ValidRes]
+
+    def __init__(self) -> None:
+        self.collecting = True
+        self.jobs = {}
+        self.results = {}
+
+    def collect(self, key: Any, job: J) -> ValidRes:
+        """record `job` unless one is known for `key`, see `placeholder`"""
+        self.jobs.setdefault(key, job)
+        return placeholder()
+
+    def result(self, key: Any) -> Optional[ValidRes]:
+        return self.results.get(key)
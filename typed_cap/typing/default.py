@@ -1,17 +1,18 @@
 import sys
 from enum import EnumMeta, Enum
-from types import GenericAlias
+from types import GenericAlias, MappingProxyType
 from typing import (
     Any,
     Dict,
     List,
+    Mapping,
     Tuple,
     Union,
     get_args,
     get_origin,
 )
 
-from .valid import ValidVal, ValidRes, Unit
+from .valid import UnitRegistry, ValidVal, ValidRes, Unit
 from .types import LiteralTType, NoneType, QueueTType, UnionTType
 
 
@@ -261,4 +262,7 @@ if sys.version_info >= (3, 10):
         }
     )
 
-VALIDATOR = ValidVal(PREDEFINED_UNITS)
+PREDEFINED_BASE: Mapping[str, Unit] = MappingProxyType(PREDEFINED_UNITS)
+"""read-only view of `PREDEFINED_UNITS` shared as the base layer of registries"""
+
+VALIDATOR = ValidVal(UnitRegistry.layered(PREDEFINED_BASE))
@@ -0,0 +1,392 @@
+import inspect
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum, EnumMeta
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from . import default
+from .collect import CollectingBatch, hashable
+from .valid import Unit, UnitRegistry, ValidRes, ValidVal
+from ..utils.option import Option
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+Converter = Callable[[Any], ValidRes]
+"""converts a raw value, same as `ValidVal.extract(t, val, cvt=True)`"""
+
+_Planner = Callable[[ValidVal, Any, Option[Optional[str]]], Converter]
+
+_FALSE_VALS = [0, "false", "False"]
+_TRUE_VALS = [1, "true", "True"]
+
+
+def generic_converter(
+    vv: ValidVal, t: Any, delimiter: Option[Optional[str]]
+) -> Converter:
+    bound = vv.bind(delimiter=delimiter)
+
+    def convert(val: Any) -> ValidRes:
+        return bound.extract(t, val, cvt=True)
+
+    return convert
+
+
+def _is_cpu_bound(*converters: Converter) -> bool:
+    return any(getattr(c, "cpu_bound", False) for c in converters)
+
+
+class _RemoteBatch(
+    CollectingBatch[Tuple[bytes, Unit, Any, Any, Option[Optional[str]]]]
+):
+    """conversions of cpu-bound units collected for, or run on, a pool"""
+
+    def run(self, pool: "Executor") -> None:
+        self.collecting = False
+        futures = [
+            (key, pool.submit(_remote_valid, *job))
+            for key, job in self.jobs.items()
+        ]
+        for key, fut in futures:
+            self.results[key] = fut.result()
+
+
+_REMOTE: ContextVar[Optional[_RemoteBatch]] = ContextVar(
+    "typed_cap_remote", default=None
+)
+
+
+def _remote_payload(vv: ValidVal) -> bytes:
+    # the units of `vv` besides the predefined ones and its attributes,
+    # for worker processes; units which can't be pickled are left out
+    import pickle
+
+    units: Dict[str, Unit] = {}
+    for name, unit in vv.registry.items():
+        if default.PREDEFINED_BASE.get(name) is unit:
+            continue
+        try:
+            pickle.dumps(unit)
+        except Exception:
+            continue
+        units[name] = unit
+    return pickle.dumps((units, dict(vv.attributes)))
+
+
+@lru_cache(maxsize=16)
+def _remote_validator(payload: bytes) -> ValidVal:
+    import pickle
+
+    units, attributes = pickle.loads(payload)
+    vv = ValidVal(UnitRegistry.layered(default.PREDEFINED_BASE, units))
+    vv.attributes = attributes
+    return vv
+
+
+def _remote_valid(
+    payload: bytes,
+    unit: Unit,
+    t: Any,
+    val: Any,
+    delimiter: Option[Optional[str]],
+) -> ValidRes:
+    vv = _remote_validator(payload).bind(delimiter)
+    return unit.valid_fn(vv, t, val, True)
+
+
+def _plan_cpu_bound(
+    vv: ValidVal, t: Any, delimiter: Option[Optional[str]], unit: Unit
+) -> Converter:
+    bound = vv.bind(delimiter=delimiter)
+    payload: Optional[bytes] = None
+
+    def convert(val: Any) -> ValidRes:
+        nonlocal payload
+        batch = _REMOTE.get()
+        key = (unit, t, val)
+        if batch is not None and hashable(key):
+            if batch.collecting:
+                if payload is None:
+                    payload = _remote_payload(bound)
+                job = (payload, unit, t, val, bound.delimiter)
+                return batch.collect(key, job)
+            res = batch.result(key)
+            if res is not None:
+                return res
+        return unit.valid_fn(bound, t, val, True)
+
+    convert.cpu_bound = True  # type: ignore[attr-defined]
+    return convert
+
+
+@contextmanager
+def remote_conversions(
+    pool: "Executor", convert: Converter, vals: Iterable[Any]
+) -> Iterator[None]:
+    """
+    run the conversions of cpu-bound units `convert` needs for `vals` on
+    `pool` at once; calls of `convert` in this context use the results
+
+    A dry run of `convert` collects the inputs of the cpu-bound units,
+    conversions it didn't foresee run in the current process.
+    """
+    batch = _RemoteBatch()
+    token = _REMOTE.set(batch)
+    try:
+        for val in vals:
+            convert(val)
+        batch.run(pool)
+        yield
+    finally:
+        _REMOTE.reset(token)
+
+
+@contextmanager
+def skip_cpu_bound() -> Iterator[None]:
+    """cpu-bound units only return placeholders in this context"""
+    token = _REMOTE.set(_RemoteBatch())
+    try:
+        yield
+    finally:
+        _REMOTE.reset(token)
+
+
+def may_await(vv: ValidVal, t: Any) -> bool:
+    """
+    whether converting to type `t` may call a unit with a coroutine
+    `valid_fn`, either for `t` or for one of its type arguments
+    """
+    unit = vv.get_unit(t)
+    if unit is not None and inspect.iscoroutinefunction(unit.valid_fn):
+        return True
+    if isinstance(t, EnumMeta):
+        args: Iterable[Any] = {str, *(type(m.value) for m in t)}
+    elif get_origin(t) is Literal:
+        args = {type(can) for can in get_args(t)}
+    else:
+        args = get_args(t)
+    return any(may_await(vv, arg) for arg in args)
+
+
+def _plan_none(
+    _vv: ValidVal, t: Any, _delimiter: Option[Optional[str]]
+) -> Converter:
+    def convert(val: Any) -> ValidRes:
+        v = ValidRes()
+        if type(val) == t:
+            v.some(None)
+            v.valid()
+        return v
+
+    return convert
+
+
+def _plan_bool(
+    _vv: ValidVal, _t: Any, _delimiter: Option[Optional[str]]
+) -> Converter:
+    def convert(val: Any) -> ValidRes:
+        v = ValidRes()
+        if val in _FALSE_VALS:
+            v.some(False)
+            v.valid()
+        elif val in _TRUE_VALS:
+            v.some(True)
+            v.valid()
+        return v
+
+    return convert
+
+
+def _plan_builtin(fn: Callable[[Any], Any]) -> _Planner:
+    def planner(
+        _vv: ValidVal, _t: Any, _delimiter: Option[Optional[str]]
+    ) -> Converter:
+        def convert(val: Any) -> ValidRes:
+            v = ValidRes()
+            try:
+                v.some(fn(val))
+                v.valid()
+            except Exception as err:
+                v.error(err)
+            return v
+
+        return convert
+
+    return planner
+
+
+def _plan_union(
+    vv: ValidVal, t: Any, delimiter: Option[Optional[str]]
+) -> Converter:
+    opts = [compile_converter(vv, opt, delimiter) for opt in get_args(t)]
+
+    def convert(val: Any) -> ValidRes:
+        for opt in opts:
+            v_got = opt(val)
+            if v_got.is_valid():
+                return v_got
+        return ValidRes()
+
+    convert.cpu_bound = _is_cpu_bound(*opts)  # type: ignore[attr-defined]
+    return convert
+
+
+def _plan_queue(
+    vv: ValidVal, t: Any, delimiter: Option[Optional[str]]
+) -> Converter:
+    loc_type = get_origin(t)
+    opts = get_args(t)
+    if loc_type not in (list, tuple) or len(opts) == 0:
+        return generic_converter(vv, t, delimiter)
+    is_tuple = loc_type is tuple
+    elements = [compile_converter(vv, opt, delimiter) for opt in opts]
+    split = delimiter.is_some()
+    sep = delimiter.unwrap() if split else None
+
+    def convert_elements(val: Union[List, Tuple]) -> ValidRes:
+        v = ValidRes()
+        arr: Optional[List] = []
+        if is_tuple:
+            if len(elements) == len(val):
+                for opt, ele in zip(elements, val):
+                    v_got = opt(ele)
+                    if not v_got.is_valid():
+                        arr = None
+                        break
+                    arr.append(v_got.value)  # type: ignore[union-attr]
+        else:
+            opt = elements[0]
+            for ele in val:
+                v_got = opt(ele)
+                if not v_got.is_valid():
+                    arr = None
+                    break
+                arr.append(v_got.value)  # type: ignore[union-attr]
+        if arr is not None:
+            v.valid()
+            v.some(tuple(arr) if is_tuple else arr)
+        return v
+
+    def convert(val: Any) -> ValidRes:
+        if type(val) == loc_type:
+            return convert_elements(val)
+        elif split and isinstance(val, str):
+            arr = val.split(sep)
+            return convert_elements(tuple(arr) if is_tuple else arr)
+        return ValidRes()
+
+    convert.cpu_bound = _is_cpu_bound(*elements)  # type: ignore[attr-defined]
+    return convert
+
+
+def _plan_literal(
+    vv: ValidVal, t: Any, delimiter: Option[Optional[str]]
+) -> Converter:
+    # only the last valid conversion counts, so each candidate type is
+    # tried once, in the order of its last appearance
+    types: Dict[type, None] = {}
+    for can in get_args(t):
+        types.pop(type(can), None)
+        types[type(can)] = None
+    cans = [compile_converter(vv, can_t, delimiter) for can_t in types]
+
+    def convert(val: Any) -> ValidRes:
+        v = ValidRes()
+        for can in cans:
+            cvt_res = can(val)
+            if cvt_res.is_valid():
+                v._data = cvt_res._data
+                v.valid()
+        return v
+
+    return convert
+
+
+def _plan_enum(
+    vv: ValidVal, t: EnumMeta, delimiter: Option[Optional[str]]
+) -> Converter:
+    mebs: List[Enum] = list(t)  # type: ignore
+    to_str = compile_converter(vv, str, delimiter)
+    by_value = [
+        (meb, compile_converter(vv, type(meb.value), delimiter))
+        for meb in mebs
+    ]
+    by_name = [(meb, meb.name.lower()) for meb in mebs]
+
+    def convert(val: Any) -> ValidRes:
+        v = ValidRes()
+        try:
+            # eval member on value or name
+            if vv.attributes.get("enum_on_value", False):
+                for meb, cvt in by_value:
+                    if cvt(val).value == meb.value:
+                        v.some(meb)
+                        v.valid()
+            else:
+                v_got = to_str(val)
+                for meb, name in by_name:
+                    if v_got.value.lower() == name:
+                        v.some(meb)
+                        v.valid()
+        except Exception as err:
+            v.error(err)
+        return v
+
+    return convert
+
+
+PLANNERS: Dict[Callable, _Planner] = {
+    default._valid_none: _plan_none,
+    default._valid_bool: _plan_bool,
+    default._valid_int: _plan_builtin(int),
+    default._valid_float: _plan_builtin(float),
+    default._valid_str: _plan_builtin(str),
+    default._valid_union: _plan_union,
+    default._valid_queue: _plan_queue,
+    default._valid_literal: _plan_literal,
+    default._valid_enum: _plan_enum,
+}
+"""specialized planners for the `valid_fn` of predefined units"""
+
+if sys.version_info >= (3, 10):
+    PLANNERS[default._valid_uniontype] = _plan_union
+
+
+def compile_converter(
+    vv: ValidVal,
+    t: Any,
+    delimiter: Option[Optional[str]] = Option.NONE(),
+) -> Converter:
+    """
+    compile type `t` into a converter closure tree, resolving units and
+    type arguments once instead of on every conversion
+
+    Types handled by units without a specialized planner (e.g. custom
+    units) are converted through `vv.extract`.
+    """
+    if delimiter.is_none():
+        delimiter = vv.delimiter
+    unit = vv.get_unit(t)
+    if unit is not None and unit.cpu_bound:
+        return _plan_cpu_bound(vv, t, delimiter, unit)
+    planner = None if unit is None else PLANNERS.get(unit.valid_fn)
+    if planner is None:
+        return generic_converter(vv, t, delimiter)
+    return planner(vv, t, delimiter)
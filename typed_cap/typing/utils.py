@@ -1,9 +1,10 @@
-import inspect
 import sys
 from enum import Enum, auto
 from typing import (
+    Any,
     Dict,
     Iterable,
+    List,
     Literal,
     Optional,
     Tuple,
@@ -38,7 +39,7 @@ class ParsedQueueType(Enum):
 
 # FIXME: potential issues
 def get_based(x) -> BasedType:
-    if not inspect.isclass(x):
+    if not isinstance(x, type):
         return BasedType.NONE
     if type(x) is TypedDictTType:
         return BasedType.DICT
@@ -82,6 +83,33 @@ def get_type_candidates(t: Type[T]) -> Tuple[Type[T]]:
         raise TypeError()  # TODO:
 
 
+def is_flag_type(t: Type) -> bool:
+    """whether an option of type `t` is parsed as a flag (takes no value)"""
+    if t == bool:
+        return True
+    try:
+        can = get_type_candidates(t)
+        return bool in can
+    except Exception:
+        return False
+
+
+def get_value_choices(t: Any, enum_on_value: bool = False) -> List[str]:
+    """candidate values of type `t`, from `Literal` and `Enum` types"""
+    if isinstance(t, type) and issubclass(t, Enum):
+        if enum_on_value:
+            return [str(meb.value) for meb in t]
+        return [meb.name.lower() for meb in t]
+    if get_origin(t) is Literal:
+        return [str(can) for can in get_args(t)]
+    choices: List[str] = []
+    for arg in get_args(t):
+        for can in get_value_choices(arg, enum_on_value):
+            if can not in choices:
+                choices.append(can)
+    return choices
+
+
 def get_optional_candidates(t: Type) -> Optional[Tuple]:
     try:
         can = list(get_type_candidates(t))
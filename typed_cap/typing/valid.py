@@ -1,11 +1,13 @@
 from __future__ import annotations
+from collections import ChainMap
 from dataclasses import dataclass
-import json
 from typing import (
     Any,
+    Awaitable,
     Callable,
     Dict,
     Generic,
+    Mapping,
     NamedTuple,
     Optional,
     Tuple,
@@ -24,6 +26,8 @@ class ValidatorNotFound(Exception):
     type: Any
 
     def __str__(self) -> str:
+        import json
+
         info = {
             "type": self.type,
             "type.__class__": self.type.__class__,
@@ -32,6 +36,15 @@ class ValidatorNotFound(Exception):
         return "debug" + json.dumps(info, indent=4, default=str)
 
 
+@dataclass
+class UnitNotPicklable(Exception):
+    name: str
+    reason: str
+
+    def __str__(self) -> str:
+        return f"cpu-bound unit {self.name!r} can't be pickled: {self.reason}"
+
+
 class ValidRes(Generic[T]):
     _valid: bool
     _data: Option[T]
@@ -69,6 +82,8 @@ class ValidRes(Generic[T]):
         return self._valid, self.value, self._error
 
     def __str__(self) -> str:
+        import json
+
         return json.dumps(
             {
                 "valid": self._valid,
@@ -79,7 +94,10 @@ class ValidRes(Generic[T]):
         )
 
 
-ValidFunc = Callable[["ValidVal", Type[T], Any, bool], ValidRes[T]]
+ValidFunc = Callable[
+    ["ValidVal", Type[T], Any, bool],
+    Union[ValidRes[T], Awaitable[ValidRes[T]]],
+]
 
 
 class Unit(NamedTuple):
@@ -93,22 +111,115 @@ class Unit(NamedTuple):
     """the base or superclass type that the target is expected to be an instance of"""
 
     valid_fn: ValidFunc
-    """the function that will be called to validate the target"""
+    """
+    the function that will be called to validate the target; coroutine
+    functions are awaited concurrently by `Cap.parse_async`
+    """
+
+    cpu_bound: bool = False
+    """
+    whether `valid_fn` is expensive enough to run on the process pool set
+    by `Cap.set_cpu_pool`; the unit and its types must be picklable, as
+    must be the other units `valid_fn` converts with through `vv.extract`
+    """
+
+
+def check_unit(name: str, unit: Unit) -> None:
+    """check that a cpu-bound unit can be sent to worker processes"""
+    if not unit.cpu_bound:
+        return
+    import pickle
+
+    for field in ("exact", "type_of", "class_of", "valid_fn"):
+        try:
+            pickle.dumps(getattr(unit, field))
+        except Exception as err:
+            raise UnitNotPicklable(name, f"{field}: {err}") from err
+
+
+class UnitRegistry(ChainMap):
+    """
+    layered mapping of units which counts its mutations
+
+    Writes go to the first (overlay) layer, so the layers below it, e.g.
+    the predefined units, are shared instead of copied. Deleting a unit
+    which only exists in a lower layer copies the layers into the overlay
+    first.
+    """
+
+    version: int
+
+    def __init__(self, *maps: Mapping[str, Unit]) -> None:
+        super().__init__(*maps)  # type: ignore[arg-type]
+        self.version = 0
+        for name, unit in self.maps[0].items():
+            check_unit(name, unit)
+
+    @classmethod
+    def layered(
+        cls,
+        base: Mapping[str, Unit],
+        overlay: Optional[Mapping[str, Unit]] = None,
+    ) -> UnitRegistry:
+        return cls({} if overlay is None else dict(overlay), base)
+
+    def _touch(self) -> None:
+        self.version += 1
+
+    def _own(self, key: str) -> None:
+        if key not in self.maps[0] and key in self:
+            self.maps = [dict(self)]
+
+    def __setitem__(self, key: str, unit: Unit) -> None:
+        check_unit(key, unit)
+        super().__setitem__(key, unit)
+        self._touch()
+
+    def __delitem__(self, key: str) -> None:
+        self._own(key)
+        super().__delitem__(key)
+        self._touch()
+
+    def pop(self, key: str, *args: Any) -> Any:
+        self._own(key)
+        res = super().pop(key, *args)
+        self._touch()
+        return res
+
+    def popitem(self) -> Tuple[str, Unit]:
+        self.maps = [dict(self)]
+        res = self.maps[0].popitem()
+        self._touch()
+        return res
+
+    def clear(self) -> None:
+        self.maps = [{}]
+        self._touch()
+
+
+_MISSING = object()
 
 
 class ValidVal:
+    """
+    converts and validates values with the registered units
+
+    Conversions never modify the validator; per-call settings such as the
+    delimiter are applied to a view of it created by `bind`, so one
+    validator can be used from many threads at once.
+    """
+
     attributes: Dict[str, Any]
-    _registry: Dict[str, Unit]
+    _registry: UnitRegistry
     _delimiter: Option[Optional[str]]
+    _dispatch: Dict[Any, Optional[Unit]]
+    """resolved unit of every seen type, valid for `_dispatch_version`"""
+    _dispatch_version: int
 
-    # temp only
-    _temp_delimiter: Option[Optional[str]]
-
-    def __init__(self, units: Dict[str, Unit]) -> None:
+    def __init__(self, units: Mapping[str, Unit]) -> None:
         self.attributes = {}
-        self._registry = units
+        self.registry = units
         self._delimiter = Option[Optional[str]].Some(",")
-        self._temp_delimiter = Option.NONE()
 
     @staticmethod
     def _class_of(obj: Any) -> Optional[Any]:
@@ -119,12 +230,65 @@ class ValidVal:
         except Exception as e:
             raise e
 
+    @property
+    def registry(self) -> UnitRegistry:
+        return self._registry
+
+    @registry.setter
+    def registry(self, units: Mapping[str, Unit]) -> None:
+        if not isinstance(units, UnitRegistry):
+            units = UnitRegistry(units)
+        self._registry = units
+        self._dispatch = {}
+        self._dispatch_version = units.version
+
+    def _resolve_unit(self, t: Any) -> Optional[Unit]:
+        found = None
+        # the last matched unit wins, which lets later units shadow others
+        for t_inf in self._registry.values():
+            if (
+                t == t_inf.exact
+                or type(t) == t_inf.type_of
+                or self._class_of(t) == t_inf.class_of
+            ):
+                found = t_inf
+        return found
+
+    def get_unit(self, t: Any) -> Optional[Unit]:
+        """registered unit responsible for type `t`"""
+        if self._dispatch_version != self._registry.version:
+            self._dispatch = {}
+            self._dispatch_version = self._registry.version
+        try:
+            key = (type(t), t)
+            unit = self._dispatch.get(key, _MISSING)
+        except TypeError:
+            return self._resolve_unit(t)
+        if unit is _MISSING:
+            unit = self._resolve_unit(t)
+            self._dispatch[key] = unit
+        return unit  # type: ignore[return-value]
+
+    def bind(
+        self,
+        delimiter: Option[Optional[str]] = Option.NONE(),
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> ValidVal:
+        """
+        view of this validator with its own delimiter and attributes,
+        sharing the units and the dispatch cache
+        """
+        view = object.__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        if delimiter.is_some():
+            view._delimiter = delimiter
+        if attributes is not None:
+            view.attributes = attributes
+        return view
+
     @property
     def delimiter(self) -> Option[Optional[str]]:
-        if self._temp_delimiter.is_some():
-            return self._temp_delimiter
-        else:
-            return self._delimiter
+        return self._delimiter
 
     @delimiter.setter
     def delimiter(self, delimiter: Option[Optional[str]]) -> None:
@@ -160,32 +324,28 @@ class ValidVal:
         temp_delimiter: Option[Optional[str]] = Option.NONE(),
         leave_scope: bool = False,
     ) -> ValidRes[T]:
-        # apply all temporal settings
+        # temporal settings apply to the nested extractions of this call
+        # only; `leave_scope` is kept for compatibility
+        vv = self
         if temp_delimiter.is_some():
-            self._temp_delimiter = temp_delimiter
+            vv = self.bind(delimiter=temp_delimiter)
 
         res: Optional[ValidRes[T]] = None
         if isinstance(t, str):
-            if self._registry.get(t) is not None:
-                res = self._registry[t].valid_fn(
-                    self, self._registry[t].exact, val, cvt
-                )
+            unit = self._registry.get(t)
+            t_got = None if unit is None else unit.exact
         else:
-            for _, t_inf in self._registry.items():
-                if (
-                    t == t_inf.exact
-                    or type(t) == t_inf.type_of
-                    or self._class_of(t) == t_inf.class_of
-                ):
-                    res = t_inf.valid_fn(self, t, val, cvt)
-                else:
-                    continue
-
-        # remove all temporal settings
-        if leave_scope:
-            self._temp_delimiter = Option.NONE()
-
-        if res is None:
+            unit = self.get_unit(t)
+            t_got = t
+        if unit is not None:
+            res = unit.valid_fn(vv, t_got, val, cvt)  # type: ignore[arg-type]
+
+        if res is None or unit is None:
             raise ValidatorNotFound(t)
+        elif not isinstance(res, ValidRes):
+            # returned by a coroutine `valid_fn`
+            from .aio import resolve_awaitable
+
+            return resolve_awaitable((unit.valid_fn, t_got, val, cvt), res)
         else:
             return res
@@ -1,11 +1,11 @@
 import re
-import shutil
 from sys import stderr
 from typing import (
     Any,
     List,
     NoReturn,
     Optional,
+    Tuple,
     TypeVar,
 )
 
@@ -14,13 +14,12 @@ T = TypeVar("T")
 
 
 def flatten(a: List[List]) -> List:
-    f = []
-    for c in a:
-        f = [*f, *c]
-    return f
+    return [x for c in a for x in c]
 
 
 def get_terminal_width(max_width: int) -> int:
+    import shutil
+
     s = shutil.get_terminal_size((999, 999))
     w = s.columns
     return min(w, max_width)
@@ -41,63 +40,118 @@ def splice(
     return [*array[:start], *items, *array[start + delete_count :]]
 
 
+_ANSI_REG = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+_TAIL_REG = re.compile(r"(?P<S>\s{1})?\w{2,}")
+
+_Chunk = Tuple[int, int, str, int, bool]
+
+
+def _wrap_line(
+    text: str, length: int, add_hyphen: bool, remove_leading_space: bool
+) -> List[_Chunk]:
+    """
+    chunks of one line as `(start, mid, insert, end, dropped)`, each is
+    `text[start:mid] + insert + text[mid:end]`; `dropped` tells that the
+    space at `end` is left out
+    """
+    n = len(text)
+    if not add_hyphen or length < 2:
+        return [
+            (p, min(p + length, n), "", min(p + length, n), False)
+            for p in range(0, n, length)
+        ]
+    chunks: List[_Chunk] = []
+    p = 0
+    while p < n:
+        brk = p + length
+        if brk > n:
+            chunks.append((p, n, "", n, False))
+            break
+        if remove_leading_space and brk < n and text[brk] == " ":
+            chunks.append((p, brk, "", brk, True))
+            p = brk + 1
+            continue
+        # a word which would start on the last column moves to the next
+        # line, a word crossing the break is hyphenated
+        m = _TAIL_REG.match(text, brk - 2, min(brk + 1, n))
+        if m is None:
+            chunks.append((p, brk, "", brk, False))
+            p = brk
+        elif m.group("S") is not None:
+            chunks.append((p, brk - 2, " ", brk - 1, False))
+            p = brk - 1
+        else:
+            chunks.append((p, brk - 1, "-", brk - 1, False))
+            p = brk - 1
+    return chunks
+
+
+def _wrap_ansi(
+    ln: str, length: int, add_hyphen: bool, remove_leading_space: bool
+) -> List[str]:
+    # wrap the visible characters; the escape sequences in front of a
+    # character stay with it, the trailing ones with the last line
+    visible: List[str] = []
+    pos: List[int] = []
+    starts: List[int] = []
+    pending: Optional[int] = None
+
+    def take(i: int, j: int) -> None:
+        nonlocal pending
+        for k in range(i, j):
+            visible.append(ln[k])
+            pos.append(k)
+            starts.append(k if pending is None else pending)
+            pending = None
+
+    i = 0
+    for m in _ANSI_REG.finditer(ln):
+        take(i, m.start())
+        if pending is None:
+            pending = m.start()
+        i = m.end()
+    take(i, len(ln))
+    starts.append(len(ln))
+    lns: List[str] = []
+    n = len(visible)
+    for start, mid, insert, end, dropped in _wrap_line(
+        "".join(visible), length, add_hyphen, remove_leading_space
+    ):
+        if not dropped:
+            tail = ln[starts[mid] : starts[end]]
+        elif end + 1 == n:
+            # the escapes after a dropped trailing space are kept
+            tail = ln[starts[mid] : pos[end]] + ln[pos[end] + 1 :]
+        else:
+            tail = ln[starts[mid] : pos[end]]
+        lns.append(ln[starts[start] : starts[mid]] + insert + tail)
+    return lns
+
+
 def split_by_length(
     text: str,
     length: int,
     add_hyphen: bool = True,
     remove_leading_space: bool = True,
 ) -> List[str]:
-    text_lns = text.split("\n")
-    if len(text_lns) != 1:
-        lns = []
-        for ln in text_lns:
-            lns = [
-                *lns,
-                *split_by_length(
-                    ln,
-                    length,
-                    add_hyphen,
-                    remove_leading_space,
-                ),
-            ]
-        return lns
-    else:
-        idx = range(0, len(text), length)
-        if not add_hyphen:
-            return [text[i : i + length] for i in idx]
-        else:
-            lns = []
-            i = 0
-            while i < len(text):
-                sub = text[i : i + length]
-                if len(sub) < length:
-                    lns.append(sub)
-                    break
-                else:
-                    # FIXME: potential issue
-                    tail = text[i + length - 2 : i + length + 1]
-                    if (
-                        remove_leading_space
-                        and len(tail) == 3
-                        and tail[2] == " "
-                    ):
-                        text = join(splice(list(text), i + length, 1), "")
-                    else:
-                        m = re.match(r"(?P<S>\s{1})?\w{2,}", tail)
-                        if m is not None:
-                            if m.group("S") is not None:
-                                text = join(
-                                    splice(list(text), i + length - 2, 0, " "),
-                                    "",
-                                )
-                            else:
-                                text = join(
-                                    splice(list(text), i + length - 1, 0, "-"),
-                                    "",
-                                )
-                    lns.append(text[i : i + length])
-                    i += length
-            return lns
+    """
+    wrap every line of `text` to `length` columns in linear time, ANSI
+    escape sequences take no column; empty lines are dropped
+    """
+    if length < 1:
+        raise ValueError("`length` should be at least 1")
+    lns: List[str] = []
+    for ln in text.split("\n"):
+        if "\x1b" in ln:
+            lns.extend(
+                _wrap_ansi(ln, length, add_hyphen, remove_leading_space)
+            )
+            continue
+        for start, mid, insert, end, _ in _wrap_line(
+            ln, length, add_hyphen, remove_leading_space
+        ):
+            lns.append(ln[start:mid] + insert + ln[mid:end])
+    return lns
 
 
 def none_or(val: Optional[T], alt: T) -> T:
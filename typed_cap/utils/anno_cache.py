@@ -0,0 +1,132 @@
+import hashlib
+import marshal
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+
+CACHE_FORMAT = 1
+ENV_DISABLE = "TYPED_CAP_NO_ANNO_CACHE"
+ENV_DIR = "TYPED_CAP_ANNO_CACHE_DIR"
+
+# (doc, comment) for every annotated name of a class
+ClassAnnos = Dict[str, Tuple[Optional[str], Optional[str]]]
+
+
+class _Config:
+    enabled: bool
+    cache_dir: Optional[str]
+
+    def __init__(self) -> None:
+        self.enabled = os.environ.get(ENV_DISABLE, "") in ["", "0"]
+        self.cache_dir = os.environ.get(ENV_DIR) or None
+
+
+_CFG = _Config()
+
+
+def set_anno_cache(enabled: bool = True, cache_dir: Optional[str] = None):
+    """
+    enable or disable the annotation cache, e.g. for read-only deployments;
+    entries are written to `cache_dir` if given, otherwise to the
+    `__pycache__` directory next to the source file
+    """
+    _CFG.enabled = enabled
+    _CFG.cache_dir = cache_dir
+
+
+def is_enabled() -> bool:
+    return _CFG.enabled
+
+
+def _cache_path(src_path: str) -> str:
+    tag = sys.implementation.cache_tag or "python"
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    name = f"{stem}.typed_cap.{tag}.cache"
+    if _CFG.cache_dir is not None:
+        digest = hashlib.sha1(src_path.encode()).hexdigest()[:16]
+        return os.path.join(_CFG.cache_dir, f"{digest}.{name}")
+    return os.path.join(os.path.dirname(src_path), "__pycache__", name)
+
+
+class SourceEntry:
+    """
+    cached annotation details of all classes found in one source file;
+    loaded entries are only used while the mtime, size and content hash of
+    the source file still match
+    """
+
+    src_path: str
+    classes: Dict[str, ClassAnnos]
+    _key: Tuple[int, int, str]
+    _dirty: bool
+
+    def __init__(self, src_path: str) -> None:
+        self.src_path = src_path
+        with open(src_path, "rb") as f:
+            data = f.read()
+        st = os.stat(src_path)
+        self._key = (
+            st.st_mtime_ns,
+            st.st_size,
+            hashlib.sha1(data).hexdigest(),
+        )
+        self.classes = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(_cache_path(self.src_path), "rb") as f:
+                blob = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if (
+            isinstance(blob, dict)
+            and blob.get("format") == CACHE_FORMAT
+            and blob.get("path") == self.src_path
+            and tuple(blob.get("key", ())) == self._key
+        ):
+            self.classes = blob["classes"]
+
+    def get(self, qualname: str) -> Optional[ClassAnnos]:
+        return self.classes.get(qualname)
+
+    def set(self, qualname: str, annos: ClassAnnos) -> None:
+        self.classes[qualname] = annos
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        path = _cache_path(self.src_path)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                marshal.dump(
+                    {
+                        "format": CACHE_FORMAT,
+                        "path": self.src_path,
+                        "key": self._key,
+                        "classes": self.classes,
+                    },
+                    f,
+                )
+            os.replace(tmp, path)
+            self._dirty = False
+        except OSError:
+            # read-only locations are not an error, just no caching
+            try:
+                os.remove(tmp)
+            except OSError:
+                ...
+
+
+def open_entry(src_path: Optional[str]) -> Optional[SourceEntry]:
+    if not _CFG.enabled or src_path is None:
+        return None
+    try:
+        return SourceEntry(os.path.abspath(src_path))
+    except OSError:
+        return None
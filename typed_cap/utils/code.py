@@ -4,6 +4,9 @@ import re
 import sys
 from typing import Dict, Optional, TypedDict, Union
 
+from . import anno_cache
+from .anno_cache import ClassAnnos
+
 
 class _ParsedAnno:
     lineno: int
@@ -59,6 +62,28 @@ def get_doc_from_ast(
         last = i
 
 
+def _get_class_annotations(c: type) -> ClassAnnos:
+    src = inspect.getsource(c)
+    src = reset_indent(src)
+    parsed = ast.parse(src)
+
+    local_anno: Dict[str, _ParsedAnno] = {}
+    get_doc_from_ast(parsed, local_anno)
+
+    src_lns = src.split("\n")
+    annos: ClassAnnos = {}
+    for name, anno in local_anno.items():
+        comment = None
+        try:
+            ln = src_lns[anno.lineno - 2].lstrip()
+            if ln.startswith("#"):
+                comment = ln
+        except IndexError:
+            ...
+        annos[name] = (anno.doc, comment)
+    return annos
+
+
 def get_annotations(
     c: type, stop_at: Optional[type] = None
 ) -> Dict[str, AnnoDetail]:
@@ -76,28 +101,39 @@ def get_annotations(
     except TypeError:
         ...
 
+    entries: Dict[str, Optional[anno_cache.SourceEntry]] = {}
     for c in bases:
-        src = inspect.getsource(c)
-        src = reset_indent(src)
-        parsed = ast.parse(src)
-
-        local_anno: Dict[str, _ParsedAnno] = {}
-        get_doc_from_ast(parsed, local_anno)
-
-        for name, anno in local_anno.items():
+        entry: Optional[anno_cache.SourceEntry] = None
+        if anno_cache.is_enabled():
+            try:
+                src_path = inspect.getsourcefile(c)
+            except (OSError, TypeError):
+                src_path = None
+            if src_path is not None:
+                if src_path not in entries:
+                    entries[src_path] = anno_cache.open_entry(src_path)
+                entry = entries[src_path]
+
+        local_anno = None if entry is None else entry.get(c.__qualname__)
+        if local_anno is None:
+            local_anno = _get_class_annotations(c)
+            if entry is not None:
+                entry.set(c.__qualname__, local_anno)
+
+        for name, (doc, comment) in local_anno.items():
             if named_anno.get(name) is None:
                 named_anno[name] = {
                     "doc": None,
                     "comment": None,
                 }
-            if anno.doc is not None:
-                named_anno[name]["doc"] = anno.doc
-            try:
-                comment = src.split("\n")[anno.lineno - 2].lstrip()
-                if comment.startswith("#"):
-                    named_anno[name]["comment"] = comment
-            except IndexError:
-                ...
+            if doc is not None:
+                named_anno[name]["doc"] = doc
+            if comment is not None:
+                named_anno[name]["comment"] = comment
+
+    for entry in entries.values():
+        if entry is not None:
+            entry.save()
 
     return named_anno
 
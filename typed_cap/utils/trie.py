@@ -0,0 +1,105 @@
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+
+V = TypeVar("V")
+
+
+class _Node(Generic[V]):
+    __slots__ = ("children", "value", "has_value")
+
+    children: Dict[str, "_Node[V]"]
+    value: Optional[V]
+    has_value: bool
+
+    def __init__(self) -> None:
+        self.children = {}
+        self.value = None
+        self.has_value = False
+
+
+class PrefixTrie(Generic[V]):
+    """
+    character trie mapping strings to values
+
+    Prefix lookups cost the length of the prefix plus the number of
+    matched entries, independent of the total number of entries.
+    """
+
+    _root: _Node[V]
+    _size: int
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        node = self._find(key)
+        return node is not None and node.has_value
+
+    def _find(self, prefix: str) -> Optional[_Node[V]]:
+        node = self._root
+        for ch in prefix:
+            nxt = node.children.get(ch)
+            if nxt is None:
+                return None
+            node = nxt
+        return node
+
+    def insert(self, key: str, value: V) -> None:
+        node = self._root
+        for ch in key:
+            nxt = node.children.get(ch)
+            if nxt is None:
+                nxt = node.children[ch] = _Node()
+            node = nxt
+        if not node.has_value:
+            self._size += 1
+        node.value = value
+        node.has_value = True
+
+    def remove(self, key: str) -> bool:
+        path: List[Tuple[_Node[V], str]] = []
+        node = self._root
+        for ch in key:
+            nxt = node.children.get(ch)
+            if nxt is None:
+                return False
+            path.append((node, ch))
+            node = nxt
+        if not node.has_value:
+            return False
+        node.value = None
+        node.has_value = False
+        self._size -= 1
+        # prune branches left empty
+        for parent, ch in reversed(path):
+            child = parent.children[ch]
+            if child.has_value or child.children:
+                break
+            del parent.children[ch]
+        return True
+
+    def get(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        node = self._find(key)
+        if node is None or not node.has_value:
+            return default
+        return node.value
+
+    def items(self, prefix: str = "") -> Iterator[Tuple[str, V]]:
+        """entries starting with `prefix`, in lexicographic order"""
+        node = self._find(prefix)
+        if node is None:
+            return
+        stack: List[Tuple[str, _Node[V]]] = [(prefix, node)]
+        while stack:
+            key, node = stack.pop()
+            if node.has_value:
+                yield key, node.value  # type: ignore[misc]
+            for ch in sorted(node.children, reverse=True):
+                stack.append((key + ch, node.children[ch]))
+
+    def keys(self, prefix: str = "") -> List[str]:
+        return [key for key, _ in self.items(prefix)]